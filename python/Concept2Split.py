@@ -6,49 +6,187 @@ or a value in seconds (rounded to one decimal place).
 Ref. https://www.concept2.co.uk/training/watts-calculator.
 The class optionally accepts a list of total distances and calculates the total
 times when rowing at the split rate.
+Internally a split is a whole number of tenths of a second, so that arithmetic and
+ranges of splits are exact (repeatedly subtracting a float increment drifts).
+A Split is an immutable value - it is hashable, ordered by its time and supports
+arithmetic in seconds. The display string and watts are only calculated when first
+used, and splits with the same distances share one tuple of them.
+The inverse calculations give the slowest split (to 0.1 seconds) that produces a power
+output or achieves a target time for a distance.
+A SplitTable holds a whole table of splits column by column - the splits, watts and
+total times are arrays calculated in one pass, and rows are only formatted when they
+are rendered.
+A SplitIndex is a sorted table of splits at 0.1 second resolution for fast (bisection)
+inverse lookups.
 """
 
+import math
 import re
 
+from bisect import bisect_right
+
+from array import array
+from functools import total_ordering
+from numbers import Real
+
+@total_ordering
 class Split(object):
     COLUMN_WIDTH = 13     # display tabulation
     SPLIT_DISTANCE = 500  # meters i.e. the split is time per 500m
     SPLIT_DISPLAY_REGEX = '^(\\d)+:(\\d){1,2}(\\.)?(\\d)?$' # e.g. '1:45.1'
+    SPLIT_DISPLAY_PATTERN = re.compile(SPLIT_DISPLAY_REGEX)
+    MAX_SHARED_DISTANCES = 1024 # distinct distance tuples kept for sharing
 
-    def __init__(self, split:float, distances):
-        self.split = split
-        self.split_display = self._seconds_to_display_string(self.split)
-        self.watts = self.calculate_watts()
+    __slots__ = ('tenths', 'distances', '_split_display', '_watts')
+    _shared_distances = {}
 
-        #Split.verify_distances(distances)
-        if distances:
-            self.distances = list(map(int, distances))
-        else:
-            self.distances = []
+    def __init__(self, split:float, distances = None):
+        # Immutable - attributes can only be set here, bypassing __setattr__
+        object.__setattr__(self, 'tenths', Split.seconds_to_tenths(split))
+        object.__setattr__(self, 'distances', Split.shared_distances(distances))
+        object.__setattr__(self, '_split_display', None)
+        object.__setattr__(self, '_watts', None)
 
     @classmethod
     def seconds(cls, seconds:float, distances = None):
         return cls(seconds, distances)
 
+    @classmethod
+    def from_tenths(cls, tenths:int, distances = None):
+        return cls(tenths / 10, distances)
+
     @classmethod
     def display(cls, display:str, distances = None):
         Split.verify_split(display)
         return cls(cls.split_display_string_to_seconds(display), distances)
 
+    @classmethod
+    def from_watts(cls, watts:float, distances = None):
+        return cls(cls.watts_to_seconds(watts), distances)
+
+    @classmethod
+    def for_target_time(cls, distance:int, seconds:float, distances = None):
+        return cls(cls.target_time_to_seconds(distance, seconds), distances)
+
     def __repr__(self):
         return 'A %dm split of %s (%d seconds) requires a power output of %0.1f watts' % (self.SPLIT_DISTANCE, self.split_display, self.split, self.watts)
 
+    def __setattr__(self, name, value):
+        raise AttributeError('A Split is immutable - cannot set "%s"' % name)
+
+    def __delattr__(self, name):
+        raise AttributeError('A Split is immutable - cannot delete "%s"' % name)
+
+    def __reduce__(self):
+        return (Split, (self.split, self.distances))
+
+    def __eq__(self, other):
+        if not isinstance(other, Split):
+            return NotImplemented
+        return self.tenths == other.tenths and self.distances == other.distances
+
+    def __lt__(self, other):
+        if not isinstance(other, Split):
+            return NotImplemented
+        return (self.tenths, self.distances) < (other.tenths, other.distances)
+
+    def __hash__(self):
+        return hash((self.tenths, self.distances))
+
+    # Arithmetic is in seconds - a split plus or minus seconds, scaled by a factor,
+    # or the difference (in seconds) and ratio of two splits
+    def __add__(self, seconds):
+        if not isinstance(seconds, Real):
+            return NotImplemented
+        return Split(self.split + seconds, self.distances)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, Split):
+            return (self.tenths - other.tenths) / 10
+        if not isinstance(other, Real):
+            return NotImplemented
+        return Split(self.split - other, self.distances)
+
+    def __mul__(self, factor):
+        if not isinstance(factor, Real):
+            return NotImplemented
+        return Split(self.split * factor, self.distances)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if isinstance(other, Split):
+            return self.tenths / other.tenths
+        if not isinstance(other, Real):
+            return NotImplemented
+        return Split(self.split / other, self.distances)
+
+    @property
+    def split(self):
+        # The split in seconds
+        return self.tenths / 10
+
+    @property
+    def split_display(self):
+        if self._split_display is None:
+            object.__setattr__(self, '_split_display', self._seconds_to_display_string(self.split))
+        return self._split_display
+
+    @property
+    def watts(self):
+        if self._watts is None:
+            object.__setattr__(self, '_watts', self.calculate_watts())
+        return self._watts
+
+    @classmethod
+    def shared_distances(cls, distances):
+        # Splits with the same distances share one (verified) tuple of them
+        if not distances:
+            return ()
+        key = tuple(distances)
+        shared = cls._shared_distances.get(key)
+        if shared is None:
+            shared = Split.verify_distances(distances)
+            if len(cls._shared_distances) >= cls.MAX_SHARED_DISTANCES:
+                cls._shared_distances.clear()
+            cls._shared_distances[key] = shared
+        return shared
+
     @staticmethod
     def verify_split(split):
-        compiled_pattern = re.compile(Split.SPLIT_DISPLAY_REGEX)
-        if not re.match(compiled_pattern, split):
+        if not Split.SPLIT_DISPLAY_PATTERN.match(split):
+            raise ValueError('The string "%s" is not a valid format for a split' % split)
+
+    @staticmethod
+    def parse_display(split):
+        # A fast, hand-written equivalent of verify_split followed by split_display_string_to_seconds
+        minutes, colon, rest = split.partition(':')
+        whole, point, tenths = rest.partition('.')
+        if not (colon and minutes.isascii() and minutes.isdigit() and whole.isascii() and whole.isdigit()
+                and len(whole) <= 2 and len(tenths) <= 1 and (not tenths or tenths.isdigit())):
             raise ValueError('The string "%s" is not a valid format for a split' % split)
+        return int(minutes) * 60 + float(rest)
+
+    @staticmethod
+    def verify_distances(distances):
+        # Returns the distances as a tuple of positive integers
+        verified = tuple(map(int, distances))
+        for d in verified:
+            if d <= 0:
+                raise ValueError('A distance must be a positive number of metres; %d is invalid' % d)
+        return verified
 
     @staticmethod
     def verify_increment(increment):
         if increment < 0.1:
             raise ValueError('The increment must be at least 0.1; %s is invalid' % str(increment))
 
+    @staticmethod
+    def seconds_to_tenths(seconds):
+        return round(seconds * 10)
+
     @staticmethod
     def split_display_string_to_seconds(split):
         minutes = int(split.split(':')[0])
@@ -56,12 +194,53 @@ class Split(object):
         return minutes * 60 + seconds
 
     def calculate_watts(self):
-        pace =self.split / self.SPLIT_DISTANCE
+        return Split.seconds_to_watts(self.split)
+
+    @staticmethod
+    def seconds_to_watts(split):
+        pace = split / Split.SPLIT_DISTANCE
 
         watts = 2.8 / pace ** 3
 
         return round(watts, 1)
 
+    @staticmethod
+    def tenths_to_watts(tenths_values):
+        # Watts for a column of splits in tenths, in one pass - the same expression as seconds_to_watts
+        split_distance = Split.SPLIT_DISTANCE
+        return array('d', [round(2.8 / (tenths / 10 / split_distance) ** 3, 1) for tenths in tenths_values])
+
+    @staticmethod
+    def watts_to_seconds(watts):
+        # The slowest split (in tenths of a second) whose displayed watts are at least the target
+        if watts <= 0:
+            raise ValueError('The power output must be positive; %s is invalid' % str(watts))
+        tenths = max(1, math.floor(Split.SPLIT_DISTANCE * (2.8 / watts) ** (1 / 3) * 10))
+        # Correct for rounding - the displayed watts are rounded to 0.1
+        while Split.seconds_to_watts((tenths + 1) / 10) >= watts:
+            tenths += 1
+        while tenths > 1 and Split.seconds_to_watts(tenths / 10) < watts:
+            tenths -= 1
+        if Split.seconds_to_watts(tenths / 10) < watts:
+            raise ValueError('The power output is beyond the fastest split of 0:00.1; %s is invalid' % str(watts))
+        return tenths / 10
+
+    @staticmethod
+    def target_time_to_seconds(distance, seconds):
+        # The slowest split (in tenths of a second) that covers the distance within the target time
+        if distance <= 0 or seconds <= 0:
+            raise ValueError('The distance and time must be positive; %s and %s are invalid' % (str(distance), str(seconds)))
+        # A tiny allowance so that exact targets (e.g. 7:00 for 2000m) are not floored a tenth too far
+        return math.floor(seconds * Split.SPLIT_DISTANCE / distance * 10 + 1e-9) / 10
+
+    @staticmethod
+    def watts_array_to_seconds(watts_values):
+        return array('d', map(Split.watts_to_seconds, watts_values))
+
+    @staticmethod
+    def target_times_to_seconds(distance, times):
+        return array('d', [Split.target_time_to_seconds(distance, seconds) for seconds in times])
+
     def get_row(self):
         # split column
         fmt_template = '%s'
@@ -105,3 +284,115 @@ class Split(object):
         minutes, seconds = divmod(split, 60)
         display_string = '%d:%04.1f' % (int(minutes), float(seconds))
         return display_string
+
+
+class SplitTable(object):
+
+    def __init__(self, splits, distances = None):
+        # Splits are given in seconds, and rounded to tenths like a Split
+        self.tenths = array('l', map(Split.seconds_to_tenths, splits))
+        self.splits = array('d', [tenths / 10 for tenths in self.tenths])
+        self.distances = Split.shared_distances(distances)
+
+        # Column calculations - the same expressions as Split, applied to the whole column at once
+        self.watts = Split.tenths_to_watts(self.tenths)
+        self.times = self._times()
+
+    @classmethod
+    def from_tenths(cls, tenths, distances = None):
+        return cls([t / 10 for t in tenths], distances)
+
+    @staticmethod
+    def range_tenths(high, low, increment):
+        # The splits (in tenths) from the high (slowest) split down to the low (fastest), in steps of the increment
+        step = Split.seconds_to_tenths(increment)
+        if step < 1:
+            raise ValueError('The increment must be at least 0.1; %s is invalid' % str(increment))
+        return range(Split.seconds_to_tenths(high), Split.seconds_to_tenths(low) - 1, -step)
+
+    @classmethod
+    def range(cls, high, low, increment, distances = None):
+        # Splits from the high (slowest) split down to the low (fastest), in steps of the increment
+        return cls.from_tenths(cls.range_tenths(high, low, increment), distances)
+
+    @classmethod
+    def chunks(cls, high, low, increment, distances = None, size = 4096):
+        # The same splits as range, as a series of tables of at most size rows
+        tenths = cls.range_tenths(high, low, increment)
+        for start in range(0, len(tenths), size):
+            yield cls.from_tenths(tenths[start:start + size], distances)
+
+    def slice(self, start, stop, step = 1, distances = None):
+        # Rows start:stop:step as a new table with its own distances - the watts are copied, not recalculated
+        table = SplitTable.__new__(SplitTable)
+        table.tenths = self.tenths[start:stop:step]
+        table.splits = self.splits[start:stop:step]
+        table.watts = self.watts[start:stop:step]
+        table.distances = Split.shared_distances(distances)
+        table.times = table._times()
+        return table
+
+    def _times(self):
+        split_distance = Split.SPLIT_DISTANCE
+        return [array('d', [split * (d / split_distance) for split in self.splits]) for d in self.distances]
+
+    def __len__(self):
+        return len(self.splits)
+
+    def __iter__(self):
+        for split in self.splits:
+            yield Split(split, self.distances)
+
+    def get_header_row(self):
+        return Split.get_header_row(self.distances)
+
+    def get_row(self, index):
+        width = Split.COLUMN_WIDTH
+        display = Split._seconds_to_display_string
+        columns = [display(self.splits[index]).center(width), str(self.watts[index]).center(width)]
+        columns.extend(display(times[index]).center(width) for times in self.times)
+        return ''.join(columns)
+
+    def rows(self):
+        # Rows are formatted one at a time, as they are consumed
+        for index in range(len(self.splits)):
+            yield self.get_row(index)
+
+
+class SplitIndex(object):
+    DEFAULT_HIGH = 300.0  # 5:00
+    DEFAULT_LOW = 60.0    # 1:00
+
+    def __init__(self, high = DEFAULT_HIGH, low = DEFAULT_LOW):
+        # Splits in tenths of a second, fastest first, so the watts are in descending order
+        self.tenths = array('l', range(round(low * 10), round(high * 10) + 1))
+        self.watts = array('d', [Split.seconds_to_watts(t / 10) for t in self.tenths])
+        self._negative_watts = array('d', [-w for w in self.watts])
+        # The watts of the next split slower than the index - anything this low is out of range
+        self._beyond_watts = Split.seconds_to_watts((self.tenths[-1] + 1) / 10)
+
+    def __len__(self):
+        return len(self.tenths)
+
+    def split_for_watts(self, watts):
+        # The slowest split whose watts are at least the target, or None if it is outside the index
+        if watts <= self._beyond_watts:
+            return None
+        index = bisect_right(self._negative_watts, -watts) - 1
+        return self.tenths[index] / 10 if index >= 0 else None
+
+    def split_for_target_time(self, distance, seconds):
+        # The slowest split that covers the distance within the target time, or None if it is outside the index
+        if distance <= 0:
+            raise ValueError('The distance must be positive; %s is invalid' % str(distance))
+        target = seconds * Split.SPLIT_DISTANCE / distance * 10 + 1e-9
+        if target >= self.tenths[-1] + 1:
+            return None
+        index = bisect_right(self.tenths, target) - 1
+        return self.tenths[index] / 10 if index >= 0 else None
+
+    def splits_for_watts(self, watts_values):
+        return [self.split_for_watts(watts) for watts in watts_values]
+
+    def splits_for_target_times(self, distance, times):
+        return [self.split_for_target_time(distance, seconds) for seconds in times]
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+
+"""
+Tables of arithmetic functions for every integer up to a limit - the smallest prime
+factor, Euler's totient phi(n), the number of divisors d(n) and their sum sigma(n) -
+held in compact array.array buffers and indexed by n. Any n up to the limit is then
+factored in O(log n) by following the smallest prime factor links.
+
+The smallest prime factors are sieved by slice assignment, the largest primes first so
+that the smallest prime of each number is written last. The functions then take a
+single linear pass (as in Euler's linear sieve), each n from m = n/p and r, the part of
+n coprime to its smallest prime p:
+    phi(n) = phi(m) * p if p divides m, else phi(m) * (p - 1)
+    d(n) = d(m) + d(r)
+    sigma(n) = p * sigma(m) + sigma(r)
+Tables can be saved to a file and memory-mapped back, so a later job starts instantly
+without sieving again - only the pages that are read are loaded.
+"""
+
+import argparse
+import json
+import logging
+import mmap
+import os
+import sys
+import time
+
+from array import array
+from math import isqrt
+
+from factorization import Factorization
+
+TABLES = ('spf', 'phi', 'divisor_count', 'divisor_sum')
+FILE_MAGIC = b'ARTB'
+FILE_VERSION = 1
+# Table data starts on a multiple of this many bytes
+FILE_ALIGNMENT = 8
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('limit', type=int, help='Largest integer in the tables')
+    parser.add_argument('numbers', metavar='N', type=int, nargs='*', help='Numbers to look up in the tables')
+    parser.add_argument('-f', '--file', help='Load the tables from this file if it covers the limit, otherwise sieve and save them to it')
+    parser.add_argument('-t', '--tables', help='Tables to build [all]', choices=TABLES, nargs='+', default=list(TABLES))
+    parser.add_argument('-q', '--quiet', help='Quiet mode', action='store_true')
+    parser.add_argument('-v', '--verbose', help='Verbose mode', action='store_true')
+    return parser.parse_args()
+
+
+def configure_logging(args):
+    log_level = logging.INFO
+    if args.quiet:
+        log_level = logging.WARNING
+    elif args.verbose:
+        log_level = logging.DEBUG
+
+    logging.basicConfig(level=log_level, format='%(levelname)s: %(message)s')
+
+
+def index_typecode(limit):
+    # Unsigned 32-bit integers unless the values can be larger
+    return 'I' if limit < 1 << 32 else 'Q'
+
+
+def smallest_prime_factors(limit):
+    # spf[n] for 0 <= n <= limit, where spf[0] = 0 and spf[1] = 1
+    typecode = index_typecode(limit)
+    spf = array(typecode, range(limit + 1))
+    composite = bytearray(isqrt(limit) + 1)
+    primes = []
+    for p in range(2, isqrt(limit) + 1):
+        if not composite[p]:
+            primes.append(p)
+            composite[p * p::p] = b'\x01' * len(range(p * p, len(composite), p))
+    # The smallest prime of each composite is the last to be written
+    for p in reversed(primes):
+        spf[p * p::p] = array(typecode, [p]) * len(range(p * p, limit + 1, p))
+    return spf
+
+
+class ArithmeticTables(object):
+
+    def __init__(self, limit, tables = TABLES):
+        if limit < 1:
+            raise ValueError('The limit must be at least 1; %d is invalid' % limit)
+        unknown = set(tables) - set(TABLES)
+        if unknown:
+            raise ValueError('Unknown tables %s - must be from %s' % (', '.join(sorted(unknown)), ', '.join(TABLES)))
+
+        self.limit = limit
+        self.tables = tuple(name for name in TABLES if name == 'spf' or name in tables)
+        self._mmap = None
+        self._views = []
+        self.spf = smallest_prime_factors(limit)
+        self.phi = self.divisor_count = self.divisor_sum = None
+        self._fill(self.tables)
+
+    def _fill(self, tables):
+        # One pass over n, each from n / spf(n) (and the part coprime to spf(n)) which are already known
+        limit = self.limit
+        typecode = index_typecode(limit)
+        spf = self.spf
+        phi = array(typecode, bytes(array(typecode).itemsize * (limit + 1))) if 'phi' in tables else None
+        d = array(typecode, bytes(array(typecode).itemsize * (limit + 1))) if 'divisor_count' in tables else None
+        sigma = array('Q', bytes(8 * (limit + 1))) if 'divisor_sum' in tables else None
+        # The part of n coprime to its smallest prime, only needed for d(n) and sigma(n)
+        rest = array(typecode, bytes(array(typecode).itemsize * (limit + 1))) if d is not None or sigma is not None else None
+        for table in (phi, d, sigma, rest):
+            if table is not None:
+                table[1] = 1
+
+        for n in range(2, limit + 1):
+            p = spf[n]
+            m = n // p
+            same = spf[m] == p
+            if phi is not None:
+                phi[n] = phi[m] * p if same else phi[m] * (p - 1)
+            if rest is not None:
+                r = rest[n] = rest[m] if same else m
+                if d is not None:
+                    d[n] = d[m] + d[r]
+                if sigma is not None:
+                    sigma[n] = p * sigma[m] + sigma[r]
+
+        self.phi, self.divisor_count, self.divisor_sum = phi, d, sigma
+
+    @classmethod
+    def load(cls, path):
+        # Maps the tables saved in the file into memory - they are read-only until closed
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        views = []
+        try:
+            if mapped[:len(FILE_MAGIC)] != FILE_MAGIC:
+                raise ValueError('%s is not an arithmetic tables file' % path)
+            header_length = int.from_bytes(mapped[len(FILE_MAGIC):len(FILE_MAGIC) + 4], 'little')
+            start = len(FILE_MAGIC) + 4
+            header = json.loads(mapped[start:start + header_length])
+            if header['version'] != FILE_VERSION or header['byteorder'] != sys.byteorder:
+                raise ValueError('%s was saved by an incompatible version or machine' % path)
+
+            tables = cls.__new__(cls)
+            tables.limit = header['limit']
+            tables.tables = tuple(entry['name'] for entry in header['tables'])
+            tables.spf = tables.phi = tables.divisor_count = tables.divisor_sum = None
+            tables._mmap = mapped
+            tables._views = views
+            base = memoryview(mapped)
+            views.append(base)
+            for entry in header['tables']:
+                if array(entry['typecode']).itemsize != entry['itemsize']:
+                    raise ValueError('%s was saved by an incompatible machine' % path)
+                view = base[entry['offset']:entry['offset'] + entry['itemsize'] * (tables.limit + 1)].cast(entry['typecode'])
+                views.append(view)
+                setattr(tables, entry['name'], view)
+            return tables
+        except Exception:
+            for view in reversed(views):
+                view.release()
+            mapped.close()
+            raise
+
+    @classmethod
+    def open(cls, path, limit, tables = TABLES):
+        # Loads the tables from the file if it has them up to the limit, otherwise builds and saves them
+        if os.path.exists(path):
+            loaded = cls.load(path)
+            if loaded.limit >= limit and set(tables) <= set(loaded.tables):
+                return loaded
+            loaded.close()
+        built = cls(limit, tables)
+        built.save(path)
+        return built
+
+    def save(self, path):
+        # A small JSON header, then each table's native bytes - written to a temporary file and renamed
+        entries = None
+        prefix = len(FILE_MAGIC) + 4
+        header = b''
+        # The header's length depends on the offsets, which depend on the header's length
+        while entries is None or entries[0]['offset'] != prefix + len(header):
+            offset = _align(prefix + len(header))
+            entries = []
+            for name in self.tables:
+                table = getattr(self, name)
+                itemsize = table.itemsize
+                entries.append({'name': name, 'typecode': _typecode(table), 'itemsize': itemsize, 'offset': offset})
+                offset = _align(offset + itemsize * len(table))
+            header = json.dumps({'version': FILE_VERSION, 'byteorder': sys.byteorder, 'limit': self.limit,
+                                 'tables': entries}).encode()
+            header += b' ' * (_align(prefix + len(header)) - prefix - len(header))
+
+        temporary = path + '.tmp'
+        with open(temporary, 'wb') as f:
+            f.write(FILE_MAGIC + len(header).to_bytes(4, 'little') + header)
+            for entry in entries:
+                f.write(bytes(entry['offset'] - f.tell()))
+                f.write(memoryview(getattr(self, entry['name'])).cast('B'))
+        os.replace(temporary, path)
+
+    def close(self):
+        if self._mmap is not None:
+            for view in reversed(self._views):
+                view.release()
+            self._views = []
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.limit + 1
+
+    def _check(self, n):
+        if not 1 <= n <= self.limit:
+            raise ValueError('%d is outside the tables (1 to %d)' % (n, self.limit))
+
+    def is_prime(self, n):
+        self._check(n)
+        return n > 1 and self.spf[n] == n
+
+    def primes(self):
+        spf = self.spf
+        return (n for n in range(2, self.limit + 1) if spf[n] == n)
+
+    def factorize(self, n):
+        # Follows the smallest prime factor links - one step per prime factor
+        self._check(n)
+        spf = self.spf
+        pairs = []
+        while n > 1:
+            p = spf[n]
+            exponent = 0
+            while n > 1 and spf[n] == p:
+                n //= p
+                exponent += 1
+            pairs.append((p, exponent))
+        return Factorization(pairs)
+
+
+def _align(offset):
+    return -(-offset // FILE_ALIGNMENT) * FILE_ALIGNMENT
+
+
+def _typecode(table):
+    return table.typecode if isinstance(table, array) else table.format
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    configure_logging(args)
+
+    start = time.perf_counter()
+    if args.file:
+        tables = ArithmeticTables.open(args.file, args.limit, args.tables)
+    else:
+        tables = ArithmeticTables(args.limit, args.tables)
+    logging.info('Tables %s up to %d ready in %0.3fs' % (', '.join(tables.tables), tables.limit, time.perf_counter() - start))
+
+    with tables:
+        for n in args.numbers:
+            columns = ['%d' % n, 'factors %s' % (tables.factorize(n) or n)]
+            for name in tables.tables[1:]:
+                columns.append('%s %d' % (name, getattr(tables, name)[n]))
+            print(', '.join(columns))
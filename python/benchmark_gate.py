@@ -0,0 +1,114 @@
+"""
+Times the benchmarks in tests/test_benchmarks.py and compares them with a baseline - a
+JSON file of the best time of each benchmark, together with the machine it was taken
+on:
+    {
+        "machine": {"system": "Linux", "machine": "x86_64", "python": "3.11.7", ...},
+        "results": {"test_semiprime[rho-1e18]": {"seconds": 0.0123, "loops": 20}, ...}
+    }
+A benchmark regresses when its best time exceeds the baseline's by more than the
+tolerance (a fraction - 0.25 allows 25% slower). A benchmark that appears to have
+regressed is timed again, up to RETIMES more times, and its best time is judged - a busy
+host slows a timing, but does not make it faster, so unchanged code passes while a real
+regression fails every timing. The random module is seeded before every call, so that
+randomised algorithms (Pollard's rho, Miller-Rabin) repeat the same work. Times are only compared with a
+baseline taken on the same kind of machine and Python; otherwise the benchmarks run
+but are not judged, until a baseline is saved on this machine.
+    pytest -m benchmark --benchmark-save              # record the baseline
+    pytest -m benchmark                               # fail anything that has regressed
+    pytest -m benchmark --benchmark-tolerance=0.1 --benchmark-baseline=ci.json
+The tolerance and baseline can also be set by $BENCHMARK_TOLERANCE and $BENCHMARK_BASELINE.
+"""
+
+import json
+import os
+import platform
+import timeit
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', 'baseline.json')
+BASELINE_ENVIRONMENT_VARIABLE = 'BENCHMARK_BASELINE'
+TOLERANCE_ENVIRONMENT_VARIABLE = 'BENCHMARK_TOLERANCE'
+DEFAULT_TOLERANCE = 0.25
+# Each timing repeats a benchmark for at least this long, and the best of the repeats is kept
+MIN_TIME = 0.1
+DEFAULT_REPEAT = 5
+# Further timings of a benchmark that appears to have regressed, before it fails
+RETIMES = 3
+# The random module is seeded with this before each call of a benchmark
+SEED = 0
+# Machine details that must match for times to be compared - the host name is recorded but not compared
+COMPARED_MACHINE_KEYS = ('system', 'machine', 'processor', 'cpu_count', 'implementation', 'python')
+
+
+def machine_metadata():
+    return {
+        'node': platform.node(),
+        'system': platform.system(),
+        'release': platform.release(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'implementation': platform.python_implementation(),
+        'python': platform.python_version(),
+    }
+
+
+def same_machine(machine, other):
+    return all(machine.get(key) == other.get(key) for key in COMPARED_MACHINE_KEYS)
+
+
+def time_function(function, repeat = DEFAULT_REPEAT, min_time = MIN_TIME):
+    # Returns (best seconds per call, calls per repeat) - like timeit, enough calls are made to outlast the clock's noise
+    timer = timeit.Timer(function)
+    loops = 1
+    while True:
+        if timer.timeit(loops) >= min_time:
+            break
+        loops *= 2
+    return min(timer.repeat(repeat, loops)) / loops, loops
+
+
+def load_baseline(path):
+    # Returns the baseline, or an empty one if there is no file
+    try:
+        with open(path) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        return {'machine': {}, 'results': {}}
+    if not isinstance(baseline, dict) or not isinstance(baseline.get('results'), dict):
+        raise ValueError('%s is not a benchmark baseline' % path)
+    baseline.setdefault('machine', {})
+    return baseline
+
+
+def save_baseline(path, results, machine = None):
+    # Merges the results into the baseline taken on this machine (a baseline from another machine is replaced)
+    machine = machine or machine_metadata()
+    baseline = load_baseline(path)
+    merged = dict(baseline['results']) if same_machine(baseline['machine'], machine) else {}
+    merged.update(results)
+    with open(path + '.tmp', 'w') as f:
+        json.dump({'machine': machine, 'results': dict(sorted(merged.items()))}, f, indent=4)
+        f.write('\n')
+    os.replace(path + '.tmp', path)
+
+
+def regression(name, seconds, baseline, tolerance = DEFAULT_TOLERANCE):
+    # Returns a description of the regression, or None if the time is within the tolerance (or there is nothing to compare)
+    expected = baseline['results'].get(name)
+    if expected is None:
+        return None
+    limit = expected['seconds'] * (1 + tolerance)
+    if seconds <= limit:
+        return None
+    return '%s took %s, %0.0f%% slower than the baseline %s (tolerance %0.0f%%)' % (
+        name, format_seconds(seconds), (seconds / expected['seconds'] - 1) * 100, format_seconds(expected['seconds']),
+        tolerance * 100)
+
+
+def format_seconds(seconds):
+    if seconds >= 1:
+        return '%0.3fs' % seconds
+    if seconds >= 1e-3:
+        return '%0.3fms' % (seconds * 1e3)
+    return '%0.3fus' % (seconds * 1e6)
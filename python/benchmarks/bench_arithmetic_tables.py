@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+"""
+Times building the arithmetic tables up to N, loading them back from a file (memory
+mapped, so only the pages that are read are loaded) and factoring every n up to N by
+following the smallest prime factor links, against prime_factors.factorize.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import prime_factors
+from arithmetic_tables import ArithmeticTables
+
+LIMITS = (10 ** 5, 10 ** 6, 10 ** 7)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-l', '--limits', type=int, nargs='+', default=list(LIMITS), help='Table limits [%s]' % ' '.join('%d' % n for n in LIMITS))
+    parser.add_argument('-s', '--sample', type=int, default=10 ** 5, help='Numbers factored each way [100000]')
+    return parser.parse_args()
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    print('%10s %10s %10s %10s %14s %14s' % ('N', 'build (s)', 'save (s)', 'load (ms)', 'tables (us/n)', 'factorize (us/n)'))
+    with tempfile.TemporaryDirectory() as directory:
+        for limit in args.limits:
+            path = os.path.join(directory, 'tables_%d.bin' % limit)
+            tables, build = timed(ArithmeticTables, limit)
+            _, save = timed(tables.save, path)
+            del tables
+            tables, load = timed(ArithmeticTables.load, path)
+            numbers = range(max(2, limit - args.sample + 1), limit + 1)
+            _, lookups = timed(lambda: [tables.factorize(n) for n in numbers])
+            _, factoring = timed(lambda: [prime_factors.factorize(n) for n in numbers])
+            tables.close()
+            print('%10d %10.2f %10.2f %10.2f %14.2f %14.2f' % (limit, build, save, load * 1000, lookups * 1e6 / len(numbers), factoring * 1e6 / len(numbers)))
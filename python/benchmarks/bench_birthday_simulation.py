@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+
+"""
+Measures the simulation throughput (trials per second) of the birthday simulator for
+pairs and triples, uniform and skewed birthdays, and 1, 2 and 4 worker processes.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import birthday_simulation
+
+WORKER_COUNTS = (1, 2, 4)
+# Twice as many birthdays in the first month as in the rest of the year
+SKEWED_WEIGHTS = [2 if day < 31 else 1 for day in range(365)]
+SCENARIOS = (
+    ('pairs, uniform', 23, 2, None),
+    ('pairs, skewed', 23, 2, SKEWED_WEIGHTS),
+    ('triples, uniform', 88, 3, None),
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--trials', type=int, default=200000, help='Trials per run [200000]')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    print('%-18s %8s %10s %14s' % ('Scenario', 'Workers', 'P(match)', 'Trials/s'))
+    for name, people, match_size, weights in SCENARIOS:
+        for workers in WORKER_COUNTS:
+            # A zero tolerance runs every trial, so that the runs are comparable
+            result = birthday_simulation.simulate(people, 365, match_size, weights, args.trials, workers=workers, tolerance=0)
+            print('%-18s %8d %10.5f %14.0f' % (name, workers, result.estimate, result.trials_per_second))
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+"""
+Compares the nodes, edges and Graphviz layout time of diagrams of three-tier estates
+of increasing size, drawn in full and with collapsed groups and hub nodes. Layout is
+only timed when Graphviz (dot) is installed, and never for full diagrams of more than
+--max-edges edges.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import diagram_topology
+
+SIZES = (3, 10, 30, 100, 300)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-t', '--threshold', type=int, default=diagram_topology.DEFAULT_COLLAPSE_THRESHOLD,
+                        help='Collapse threshold [%d]' % diagram_topology.DEFAULT_COLLAPSE_THRESHOLD)
+    parser.add_argument('--max-edges', type=int, default=2000, help='Largest full diagram laid out [2000]')
+    return parser.parse_args()
+
+
+def three_tier(instances):
+    # A load balancer, web and app tiers of the given size spread over 3 subnets each, and a database
+    subnets = min(3, instances)
+    return {
+        'name': 'Three tier x%d' % instances,
+        'filename': 'three_tier_%d' % instances,
+        'nodes': [
+            {'id': 'alb', 'type': 'aws.network.ALB'},
+            {'id': 'rds', 'type': 'aws.database.RDS'},
+        ],
+        'groups': [
+            {'id': 'web', 'type': 'aws.compute.EC2', 'count': instances, 'subnets': subnets, 'subnet_label': 'Public Subnet'},
+            {'id': 'app', 'type': 'aws.compute.EC2', 'count': instances, 'subnets': subnets, 'subnet_label': 'Private Subnet'},
+        ],
+        'clusters': [{'label': 'VPC', 'nodes': ['alb', 'web', 'app', 'rds']}],
+        'edges': [['alb', 'web'], ['web', 'app'], ['app', 'rds']],
+    }
+
+
+def layout(spec, max_edges):
+    if not shutil.which('dot') or len(spec['edges']) > max_edges:
+        return '%10s' % 'n/a'
+    return '%9.3fs' % diagram_topology.layout_time(spec)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    variants = (('full', None, False), ('hubs', None, True), ('collapsed with hubs', args.threshold, True))
+    print('%9s' % '' + ''.join(' | %-24s' % name for name, _, _ in variants))
+    print('%9s' % 'Instances' + ' | %6s %6s %10s' % ('Nodes', 'Edges', 'Layout') * len(variants))
+    for instances in SIZES:
+        topology = three_tier(instances)
+        row = '%9d' % instances
+        for _, threshold, hubs in variants:
+            spec = diagram_topology.generate(topology, threshold, hubs)
+            row += ' | %6d %6d %s' % (len(spec['nodes']), len(spec['edges']), layout(spec, args.max_edges))
+        print(row)
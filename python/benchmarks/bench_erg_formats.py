@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+"""
+Measures how many rows per second each output format writes for a fine-grained erg
+table (0.1s steps from 3:00 to 1:20 with a dozen distances), writing to /dev/null.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import erg_table_writers
+from Concept2Split import SplitTable
+
+DISTANCES = ['100', '250', '500', '1000', '2000', '5000', '6000', '10000', '15000', '21097', '30000', '42195']
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Timing repetitions [3]')
+    parser.add_argument('-I', '--increment', type=float, default=0.1, help='Split increment in seconds [0.1]')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    rows = sum(len(chunk) for chunk in SplitTable.chunks(180.0, 80.0, args.increment, DISTANCES))
+
+    print('%-10s %12s %14s' % ('Format', 'Time (s)', 'Rows/s'))
+    with open(os.devnull, 'wb') as output:
+        for output_format in erg_table_writers.FORMATS:
+            best = None
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                chunks = SplitTable.chunks(180.0, 80.0, args.increment, DISTANCES)
+                erg_table_writers.write_table(chunks, output, output_format, DISTANCES)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            print('%-10s %12.4f %14.0f' % (output_format, best, rows / best))
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks the factorial algorithms against math.factorial for n from 10^3 to 10^5.
+The for-loop is skipped above --loop-limit because it is quadratic in n.
+"""
+
+import argparse
+import math
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import factorial_loop
+import fast_factorial
+
+SIZES = (10 ** 3, 10 ** 4, 10 ** 5)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--repeat', type=int, default=3, help='Timing repetitions [3]')
+    parser.add_argument('--loop-limit', type=int, default=10 ** 5, help='Largest n timed with the for-loop [10^5]')
+    return parser.parse_args()
+
+
+def best_time(function, n, repeat):
+    return min(timeit.repeat(lambda: function(n), number=1, repeat=repeat))
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    algorithms = [
+        ('loop', factorial_loop.factorial),
+        ('split', fast_factorial.binary_split_factorial),
+        ('swing', fast_factorial.prime_swing_factorial),
+    ]
+
+    print('%8s %12s %12s %12s %12s %12s' % ('n', 'math (s)', 'loop (s)', 'split (s)', 'swing (s)', 'swing/math'))
+    for n in SIZES:
+        expected = math.factorial(n)
+        math_time = best_time(math.factorial, n, args.repeat)
+        times = {}
+        for name, function in algorithms:
+            if name == 'loop' and n > args.loop_limit:
+                times[name] = None
+                continue
+            assert function(n) == expected, '%s gave the wrong answer for %d' % (name, n)
+            times[name] = best_time(function, n, args.repeat)
+
+        columns = ['%12s' % '-' if times[name] is None else '%12.6f' % times[name] for name, _ in algorithms]
+        print('%8d %12.6f %s %11.1fx' % (n, math_time, ' '.join(columns), times['swing'] / math_time))
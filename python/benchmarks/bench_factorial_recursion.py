@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks the trampolined, memoised recursive factorial against the for-loop, both for
+single (cold) queries and for a run of increasing queries n, n + 1, n + 2, ...
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import factorial_loop
+import factorial_recursion
+
+SIZES = (10 ** 3, 10 ** 4, 2 * 10 ** 4)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-r', '--run-length', type=int, default=100, help='Number of increasing queries [100]')
+    return parser.parse_args()
+
+
+def time_queries(function, queries, before = None):
+    if before:
+        before()
+    start = time.perf_counter()
+    for n in queries:
+        function(n)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    print('%8s %14s %14s %16s %16s' % ('n', 'loop (s)', 'recursion (s)', 'loop run (s)', 'recursion run (s)'))
+    for n in SIZES:
+        run = range(n, n + args.run_length)
+        assert factorial_recursion.factorial(n) == factorial_loop.factorial(n)
+        loop_time = time_queries(factorial_loop.factorial, [n])
+        recursion_time = time_queries(factorial_recursion.factorial, [n], factorial_recursion.clear_memo)
+        loop_run_time = time_queries(factorial_loop.factorial, run)
+        recursion_run_time = time_queries(factorial_recursion.factorial, run, factorial_recursion.clear_memo)
+        print('%8d %14.6f %14.6f %16.6f %16.6f' % (n, loop_time, recursion_time, loop_run_time, recursion_run_time))
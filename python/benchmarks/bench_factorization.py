@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+"""
+Compares rendering the factors of 2^n (one prime, many factors) with the original
+output_string, which counts each factor in the tuple, against Factorization.render.
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from factorization import Factorization
+
+EXPONENTS = (10, 100, 1000, 5000)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Timing repetitions [3]')
+    return parser.parse_args()
+
+
+def legacy_output_string(factors):
+    # The original implementation (without colour codes)
+    output = ''
+    index = 0
+    while index < len(factors):
+        prime_factor = factors[index]
+        if factors.count(prime_factor) == 1:
+            output += '%d' % prime_factor
+            if index < len(factors) - 1:
+                output += ' * '
+            index += 1
+        else:
+            prime_factor_count = factors.count(prime_factor)
+            output += '%d' % prime_factor
+            output += '^'
+            output += '%d' % prime_factor_count
+            if index + prime_factor_count < len(factors):
+                output += ' * '
+            index += prime_factor_count
+    return output
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    print('%8s %14s %14s %14s' % ('2^n', 'legacy (ms)', 'flat (ms)', 'pairs (ms)'))
+    for n in EXPONENTS:
+        # Followed by many distinct odd factors, each of which the legacy loop counts in the whole tuple
+        factors = tuple([2] * n + list(range(3, 3 + 2 * min(n, 500), 2)))
+        factorization = Factorization.from_factors(factors)
+        assert legacy_output_string(factors) == factorization.render()
+        legacy = min(timeit.repeat(lambda: legacy_output_string(factors), number=1, repeat=args.repeat))
+        flat = min(timeit.repeat(lambda: Factorization.from_factors(factors).render(), number=1, repeat=args.repeat))
+        pairs = min(timeit.repeat(factorization.render, number=1, repeat=args.repeat))
+        print('%8d %14.3f %14.3f %14.3f' % (n, legacy * 1000, flat * 1000, pairs * 1000))
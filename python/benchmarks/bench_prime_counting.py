@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+"""
+Times prime_pi(10^k) (Lucy_Hedgehog, O(x^(3/4)) time and O(sqrt(x)) memory) and
+nth_prime(10^k) against their known values, and counting the primes up to 10^k with
+the segmented sieve for the smaller k. prime_pi(10^12) takes a minute or so.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import prime_engine
+
+PRIME_PI = {6: 78498, 7: 664579, 8: 5761455, 9: 50847534, 10: 455052511, 11: 4118054813, 12: 37607912018}
+NTH_PRIME = {6: 15485863, 7: 179424673, 8: 2038074743, 9: 22801763489}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-m', '--max-exponent', type=int, default=12, help='Largest power of ten counted [12]')
+    parser.add_argument('-s', '--sieve-exponent', type=int, default=8, help='Largest power of ten also counted by sieving [8]')
+    return parser.parse_args()
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    print('%6s %14s %12s %14s %14s %12s' % ('x', 'pi(x)', 'pi (s)', 'sieve (s)', 'nth prime', 'nth (s)'))
+    for k in sorted(PRIME_PI):
+        if k > args.max_exponent:
+            break
+        count, counting = timed(prime_engine.prime_pi, 10 ** k)
+        assert count == PRIME_PI[k]
+        sieving = '-'
+        if k <= args.sieve_exponent:
+            sieved, seconds = timed(lambda: sum(1 for _ in prime_engine.primes_in_range(2, 10 ** k + 1)))
+            assert sieved == count
+            sieving = '%0.3f' % seconds
+        nth, nth_seconds = ('-', '-')
+        if k in NTH_PRIME:
+            prime, seconds = timed(prime_engine.nth_prime, 10 ** k)
+            assert prime == NTH_PRIME[k]
+            nth, nth_seconds = '%d' % prime, '%0.3f' % seconds
+        print('%6s %14d %12.3f %14s %14s %12s' % ('10^%d' % k, count, counting, sieving, nth, nth_seconds))
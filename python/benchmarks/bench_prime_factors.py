@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks the sieve-backed prime_factors against the original trial-division
+implementation, for semiprimes from 10^6 to 10^12. The original is skipped above
+--legacy-limit because it takes minutes (or hours) for the larger inputs. The sieve is
+timed with method 'trial' - the default, 'auto', hands large cofactors to Pollard's rho.
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import prime_engine
+import prime_factors
+
+# A semiprime (the product of two primes close to its square root) is the worst case for trial division
+SEMIPRIMES = {
+    6: 101 * 9901,
+    8: 9967 * 10007,
+    10: 99991 * 100003,
+    12: 999983 * 1000003,
+}
+
+
+def legacy_is_prime(number):
+    factor = 2
+    while factor < number and pow(factor, 2) <= number:
+        if number % factor == 0:
+            return False
+        factor += 1
+    return True
+
+
+def legacy_prime_factors(number):
+    factors_set = ()
+    dividend = number
+    divisor = 2
+    while True:
+        if dividend == 1:
+            break
+        if not factors_set and pow(divisor, 2) > number:
+            break
+        if legacy_is_prime(divisor):
+            if dividend % divisor == 0:
+                factors_set += (divisor,)
+                dividend = dividend // divisor
+                continue
+        divisor += 1
+    return factors_set
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--repeat', type=int, default=3, help='Timing repetitions [3]')
+    parser.add_argument('--legacy-limit', type=int, default=10 ** 8, help='Largest input timed with the original implementation [10^8]')
+    return parser.parse_args()
+
+
+def sieve_prime_factors(number):
+    return prime_factors.prime_factors(number, method='trial')
+
+
+def best_time(function, number, repeat):
+    return min(timeit.repeat(lambda: function(number), number=1, repeat=repeat))
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    # Warm the shared sieve so that its one-off construction is not charged to the first input
+    prime_engine.DEFAULT_SIEVE.extend(10 ** 6 + 1)
+
+    print('%8s %16s %14s %14s %10s' % ('Digits', 'Number', 'Legacy (s)', 'Sieve (s)', 'Speed-up'))
+    for digits, number in sorted(SEMIPRIMES.items()):
+        sieve_time = best_time(sieve_prime_factors, number, args.repeat)
+        if number <= args.legacy_limit:
+            assert legacy_prime_factors(number) == sieve_prime_factors(number)
+            legacy_time = best_time(legacy_prime_factors, number, args.repeat)
+            print('%8d %16d %14.6f %14.6f %9.1fx' % (digits, number, legacy_time, sieve_time, legacy_time / sieve_time))
+        else:
+            print('%8d %16d %14s %14.6f %10s' % (digits, number, 'skipped', sieve_time, '-'))
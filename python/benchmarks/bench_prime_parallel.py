@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+"""
+Measures the throughput (numbers per second) of factoring a batch of numbers with
+1, 2, 4 and 8 worker processes, and checks that every run matches the serial results.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import prime_factors
+
+WORKER_COUNTS = (1, 2, 4, 8)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--count', type=int, default=20000, help='Numbers in the batch [20000]')
+    parser.add_argument('-b', '--bits', type=int, default=48, help='Largest size of each number in bits [48]')
+    parser.add_argument('-s', '--seed', type=int, default=1, help='Random seed for the batch [1]')
+    return parser.parse_args()
+
+
+def make_batch(count, bits, seed):
+    # A mix of sizes, so that both the tiny-number and the large-number chunking is exercised
+    rng = random.Random(seed)
+    return [rng.getrandbits(rng.randint(8, bits)) | 1 for _ in range(count)]
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    numbers = make_batch(args.count, args.bits, args.seed)
+
+    start = time.perf_counter()
+    serial = list(prime_factors.factorize_stream(numbers))
+    serial_time = time.perf_counter() - start
+    print('%8s %12s %14s %10s' % ('Workers', 'Time (s)', 'Numbers/s', 'Speed-up'))
+    print('%8s %12.3f %14.0f %10s' % ('serial', serial_time, args.count / serial_time, '1.0x'))
+
+    for workers in WORKER_COUNTS:
+        start = time.perf_counter()
+        results = list(prime_factors.factorize_parallel(numbers, workers=workers))
+        elapsed = time.perf_counter() - start
+        assert results == serial, 'Results with %d workers differ from the serial results' % workers
+        print('%8d %12.3f %14.0f %9.1fx' % (workers, elapsed, args.count / elapsed, serial_time / elapsed))
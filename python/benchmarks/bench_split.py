@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+"""
+Compares the memory footprint and construction speed of the immutable, slotted Split
+against the original class, which had a per-instance __dict__, calculated its display
+string and watts eagerly and copied its distances into a new list.
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from Concept2Split import Split
+
+DISTANCES = ['500', '1000', '2000', '5000', '6000', '10000']
+
+
+class LegacySplit(object):
+    SPLIT_DISTANCE = 500
+
+    def __init__(self, split, distances):
+        self.split = split
+        self.split_display = Split._seconds_to_display_string(self.split)
+        self.watts = self.calculate_watts()
+        if distances:
+            self.distances = list(map(int, distances))
+        else:
+            self.distances = []
+
+    def calculate_watts(self):
+        pace = self.split / self.SPLIT_DISTANCE
+        watts = 2.8 / pace ** 3
+        return round(watts, 1)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--count', type=int, default=200000, help='Splits to construct [200000]')
+    return parser.parse_args()
+
+
+def construct(cls, count):
+    return [cls(80 + (i % 1000) / 10, DISTANCES) for i in range(count)]
+
+
+def measure(cls, count):
+    start = time.perf_counter()
+    construct(cls, count)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    splits = construct(cls, count)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del splits
+    return elapsed, memory
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    print('%-12s %12s %14s %14s' % ('Class', 'Time (s)', 'Splits/s', 'Bytes/split'))
+    for cls in (LegacySplit, Split):
+        elapsed, memory = measure(cls, args.count)
+        print('%-12s %12.4f %14.0f %14.1f' % (cls.__name__, elapsed, args.count / elapsed, memory / args.count))
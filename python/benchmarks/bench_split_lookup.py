@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+"""
+Compares three ways of finding the split for a target power output - scanning a
+generated erg table (as the coaching dashboard did), the closed-form inverse and
+bisection of a SplitIndex.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from Concept2Split import Split, SplitIndex, SplitTable
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--queries', type=int, default=20000, help='Number of queries [20000]')
+    return parser.parse_args()
+
+
+def table_scan(table, watts):
+    # The splits are in descending order, so the last one with enough watts is the answer
+    for split, split_watts in zip(table.splits, table.watts):
+        if split_watts >= watts:
+            return split
+    return None
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    rng = random.Random(1)
+    queries = [rng.uniform(100, 500) for _ in range(args.queries)]
+
+    table = SplitTable([t / 10 for t in range(3000, 599, -1)])
+    index = SplitIndex()
+    lookups = (
+        ('table scan', lambda: [table_scan(table, w) for w in queries]),
+        ('closed form', lambda: list(Split.watts_array_to_seconds(queries))),
+        ('index', lambda: index.splits_for_watts(queries)),
+    )
+
+    expected = None
+    for name, lookup in lookups:
+        start = time.perf_counter()
+        results = lookup()
+        elapsed = time.perf_counter() - start
+        expected = expected or results
+        assert results == expected, '%s disagrees with the table scan' % name
+        print('%-12s %10.4f s %14.0f queries/s' % (name, elapsed, args.queries / elapsed))
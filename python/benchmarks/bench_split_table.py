@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+"""
+Compares building and rendering a fine-grained erg table (0.1s steps from 3:00 to 1:20,
+with a dozen distances) one Split object per row against the columnar SplitTable.
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from Concept2Split import Split, SplitTable
+
+DISTANCES = [100, 250, 500, 1000, 2000, 5000, 6000, 10000, 15000, 21097, 30000, 42195]
+HIGH_SPLIT = 180.0
+LOW_SPLIT = 80.0
+INCREMENT = 0.1
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--repeat', type=int, default=5, help='Timing repetitions [5]')
+    return parser.parse_args()
+
+
+def split_rows():
+    rows = [Split.get_header_row(DISTANCES)]
+    seconds = HIGH_SPLIT
+    while seconds >= LOW_SPLIT:
+        rows.append(Split(seconds, DISTANCES).get_row())
+        seconds -= INCREMENT
+    return rows
+
+
+def table_rows():
+    table = SplitTable.range(HIGH_SPLIT, LOW_SPLIT, INCREMENT, DISTANCES)
+    return [table.get_header_row()] + list(table.rows())
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    assert split_rows() == table_rows()
+
+    rows = len(table_rows()) - 1
+    for name, function in (('Split per row', split_rows), ('SplitTable', table_rows)):
+        elapsed = min(timeit.repeat(function, number=1, repeat=args.repeat))
+        print('%-14s %10.6f s %12.0f rows/s' % (name, elapsed, rows / elapsed))
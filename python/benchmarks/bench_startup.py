@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+"""
+Reports the import time (from python -X importtime) of each utils command, the
+slowest modules it imports and the wall-clock time of a whole run, against the
+startup budget that the tests enforce.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from utils import startup
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='Runs of each command - the fastest is reported [5]')
+    parser.add_argument('-t', '--top', type=int, default=5, help='Slowest modules listed per command [5]')
+    return parser.parse_args()
+
+
+def wall_time(args):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-m', 'utils'] + list(args), cwd=startup.PYTHON_DIRECTORY,
+                   stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    print('Budget: %d ms of imports per command' % startup.STARTUP_BUDGET_MS)
+    for command in startup.COMMANDS:
+        runs = [startup.import_times(command) for _ in range(args.repeat)]
+        modules, total = min(runs, key=lambda run: run[1])
+        wall = min(wall_time(command) for _ in range(args.repeat))
+        print('\n%-40s imports %7.1f ms   run %7.1f ms' % (' '.join(command), total / 1000, wall * 1000))
+        user_modules = dict(modules)
+        for name in sorted(user_modules, key=user_modules.get, reverse=True)[:args.top]:
+            print('    %-36s %7.1f ms' % (name, user_modules[name] / 1000))
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+"""
+Load tests the erg table service on localhost - concurrent keep-alive clients request
+a mix of tables (so some are cache hits and some are renderings) and the throughput
+and latency percentiles are reported. The service is started on a free port unless
+the port of a running one is given.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+SERVICE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'erg_table_service.py')
+DISTANCES = (500, 1000, 2000, 5000, 6000, 10000, 21097, 42195)
+FORMATS = ('text', 'csv', 'json', 'markdown', 'binary')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-p', '--port', type=int, help='Port of a running service [start one]')
+    parser.add_argument('-c', '--concurrency', type=int, default=32, help='Concurrent clients [32]')
+    parser.add_argument('-n', '--requests', type=int, default=5000, help='Total requests [5000]')
+    parser.add_argument('--variants', type=int, default=100, help='Distinct tables requested [100]')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the request mix [0]')
+    return parser.parse_args()
+
+
+def request_targets(variants, seed):
+    rng = random.Random(seed)
+    targets = []
+    for _ in range(variants):
+        high = rng.randint(120, 300)
+        low = rng.randint(60, high)
+        increment = rng.choice(('0.1', '0.5', '1', '2.5'))
+        distances = ','.join(str(d) for d in rng.sample(DISTANCES, rng.randint(0, 4)))
+        targets.append('/table?high=%d:%02d&low=%d:%02d&increment=%s&distance=%s&format=%s' % (
+            high // 60, high % 60, low // 60, low % 60, increment, distances, rng.choice(FORMATS)))
+    return targets
+
+
+async def fetch(reader, writer, target):
+    writer.write(('GET %s HTTP/1.1\r\nHost: localhost\r\n\r\n' % target).encode())
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if not line.strip():
+            break
+        name, _, value = line.decode().partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def client(port, targets, count, rng, latencies, errors):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        for _ in range(count):
+            start = time.perf_counter()
+            status, _ = await fetch(reader, writer, rng.choice(targets))
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def load(port, args):
+    targets = request_targets(args.variants, args.seed)
+    latencies = []
+    errors = []
+    counts = [args.requests // args.concurrency + (i < args.requests % args.concurrency) for i in range(args.concurrency)]
+    start = time.perf_counter()
+    await asyncio.gather(*[client(port, targets, count, random.Random(args.seed + i), latencies, errors) for i, count in enumerate(counts)])
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    _, stats = await fetch(reader, writer, '/stats')
+    writer.close()
+
+    latencies.sort()
+    print('%d requests (%d errors) from %d clients in %0.2fs - %0.0f requests/s' % (
+        len(latencies), len(errors), args.concurrency, elapsed, len(latencies) / elapsed))
+    print('Latency: ' + ', '.join('p%d %0.2fms' % (p, latencies[min(len(latencies) - 1, len(latencies) * p // 100)] * 1000) for p in (50, 90, 99)))
+    print('Service: ' + stats.decode().strip())
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for(port, timeout = 10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    service = None
+    port = args.port
+    if port is None:
+        port = free_port()
+        service = subprocess.Popen([sys.executable, SERVICE, '--port', str(port), '--quiet'])
+    try:
+        wait_for(port)
+        asyncio.run(load(port, args))
+    finally:
+        if service:
+            service.terminate()
+            service.wait()
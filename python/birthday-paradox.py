@@ -2,7 +2,10 @@
 
 import argparse
 import logging
-from fractions import Fraction
+import sys
+
+import birthday_engine
+import birthday_simulation
 
 # An EVENT is a subset of all possible outcomes of an experiment, e.g. rolling an odd
 # number on a (fair) die.
@@ -25,44 +28,84 @@ from fractions import Fraction
 """
 Calculates the minimum number of people needed to achieve a better-than-evens chance
 of two sharing a birthday. Assumes that birthdays are uniformly distributed over
-a 365-day year and that twins and selection bias are ignored.
+a 365-day year and that twins and selection bias are ignored. The number of days,
+the number of people who must share and the probability threshold can all be changed.
 """
 
-PROBABILITY_THRESHOLD = 0.5
+PROBABILITY_THRESHOLD = birthday_engine.DEFAULT_THRESHOLD
+DAYS = birthday_engine.DEFAULT_DAYS
+MATCH_SIZE = birthday_engine.DEFAULT_MATCH_SIZE
 
-def parse_args():
+def parse_args(argv = None):
     parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-d', '--days', help='Number of equally likely birthdays [%d]' % DAYS, type=int, default=DAYS)
+    parser.add_argument('-k', '--match-size', help='Number of people who must share a birthday [%d]' % MATCH_SIZE, type=int, default=MATCH_SIZE)
+    parser.add_argument('-t', '--threshold', help='Probability of a shared birthday to reach [%s]' % PROBABILITY_THRESHOLD, type=float, default=PROBABILITY_THRESHOLD)
+    parser.add_argument('-a', '--approximate', help='Use the approximate solver (suitable for billions of days or more)', action='store_true')
+    parser.add_argument('-s', '--simulate', metavar='PEOPLE', help='Estimate the probability of a match for this many people by simulation', type=int)
+    parser.add_argument('-W', '--weights', metavar='FILE', help='Simulate with the relative likelihood of each day read from this file (one per line)', type=argparse.FileType('r'))
+    parser.add_argument('--trials', help='Most trials to simulate [%d]' % birthday_simulation.DEFAULT_TRIALS, type=int, default=birthday_simulation.DEFAULT_TRIALS)
+    parser.add_argument('--tolerance', help='Stop simulating once the confidence interval is this narrow (half-width) [%s]' % birthday_simulation.DEFAULT_TOLERANCE, type=float, default=birthday_simulation.DEFAULT_TOLERANCE)
+    parser.add_argument('--workers', help='Number of simulation processes [1]', type=int, default=1)
+    parser.add_argument('--seed', help='Random seed for the simulation [0]', type=int, default=0)
     parser.add_argument('-q', '--quiet', help='Quiet mode', action='store_true')
     parser.add_argument('-v', '--verbose', help='Verbose mode', action='store_true')
-    return parser.parse_args()
+    args = parser.parse_args(argv)
+    if args.simulate is not None and args.simulate < 1:
+        parser.error('at least one person must be simulated; %d is invalid' % args.simulate)
+    if args.trials < 1:
+        parser.error('at least one trial must be simulated; %d is invalid' % args.trials)
+    if args.workers < 1:
+        parser.error('at least one worker is needed; %d is invalid' % args.workers)
+    return args
 
 def configure_logging(args):
-    log_level = logging.INFO
+    # Quiet mode needs no configuration - by default warnings and errors are written to stderr
     if args.quiet:
-        log_level = logging.WARNING
-    elif args.verbose:
+        return
+    log_level = logging.INFO
+    if args.verbose:
         log_level = logging.DEBUG
 
     logging.basicConfig(level=log_level, format='%(levelname)s: %(message)s')
 
-def calculate_birthdays():
+def calculate_birthdays(days = DAYS, threshold = PROBABILITY_THRESHOLD, match_size = MATCH_SIZE):
     # Starting with the certainty of one person *not* sharing a birthday,
     # iteratively add people until the converse probability drops below
     # the threshold
-    count = 1
-    converse_probability = 1.0
-    while converse_probability > PROBABILITY_THRESHOLD:
-        f = Fraction(365 - (count - 1), 365)
-        converse_probability *= float(f)
-        logging.debug('%d people - %f probability of not sharing a birthday' % (count, converse_probability))
+    debug = logging.getLogger().isEnabledFor(logging.DEBUG)
+    birthday_engine.verify(days, match_size, threshold)
+    for count, converse_probability in birthday_engine.no_match_probabilities(days, match_size):
+        if debug:
+            logging.debug('%d people - %f probability of not sharing a birthday' % (count, converse_probability))
+        if converse_probability <= 1 - threshold:
+            return count
+
+def main(argv = None):
+    args = parse_args(argv)
+    configure_logging(args)
 
-        count += 1
+    if args.simulate is not None:
+        weights = None
+        if args.weights:
+            with args.weights:
+                weights = [float(line) for line in args.weights if line.strip()]
+            args.days = len(weights)
+        result = birthday_simulation.simulate(
+            args.simulate, args.days, args.match_size, weights, args.trials,
+            workers=args.workers, seed=args.seed, tolerance=args.tolerance)
+        print('%d people, %d days: %s' % (args.simulate, args.days, result))
+        return 0
 
-    return count - 1
+    if args.approximate:
+        people = birthday_engine.approximate_people_needed(args.days, args.threshold, args.match_size)
+    else:
+        people = calculate_birthdays(args.days, args.threshold, args.match_size)
 
-if __name__ == '__main__':
-    args = parse_args()
-    configure_logging(args)
+    chance = 'better-than-evens' if args.threshold == 0.5 else '%g%%' % (args.threshold * 100)
+    year = '' if args.days == DAYS else ' in a %d-day year' % args.days
+    print('Only %d people are needed for a %s chance of %d sharing a birthday%s' % (people, chance, args.match_size, year))
+    return 0
 
-    people = calculate_birthdays()
-    print('Only %d people are needed for a better-than-evens chance of 2 sharing a birthday' % people)
\ No newline at end of file
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""
+The generalised birthday problem - how many people are needed before the probability
+that at least k of them share a birthday reaches a threshold, when birthdays are
+uniformly distributed over d days? With d = 2^64 (say) this sizes a hash or random ID
+space so that collisions are suitably unlikely.
+
+The exact probabilities come from a recurrence over the number of people. For k = 2 it
+is the familiar product (d - n + 1)/d; for larger k it is Miller's recurrence for the
+coefficients of (1 + x + x^2/2! + ... + x^(k-1)/(k-1)!)^d. A whole grid of thresholds
+is answered from a single pass over the probabilities for each d.
+
+For very large d the approximate solver starts from the square-root (k = 2) or
+Diaconis-Mosteller (k > 2) estimate, then corrects it against a series expansion of
+the log-probability (k = 2) or a saddle-point approximation of it (k > 2). Below
+APPROXIMATE_DAYS_MINIMUM days it uses the exact recurrence instead. Above it the answer
+can still be one person out when the threshold falls within the error of the expansion
+of the boundary probability - for k = 2 that error is below n^5/d^4.
+"""
+
+import math
+
+DEFAULT_DAYS = 365
+DEFAULT_MATCH_SIZE = 2
+DEFAULT_THRESHOLD = 0.5
+# Above this many days people_needed switches to the approximate solver
+EXACT_DAYS_LIMIT = 10 ** 7
+# Below this many days approximate_people_needed defers to the exact solver - the expansions are too coarse
+APPROXIMATE_DAYS_MINIMUM = 10 ** 4
+# Iterations of the Diaconis-Mosteller correction for k > 2
+CORRECTION_ITERATIONS = 8
+# Bisection steps solving for the saddle point
+SADDLE_POINT_ITERATIONS = 100
+
+
+def verify(days, match_size, threshold):
+    if days < 1:
+        raise ValueError('The number of days must be at least 1; %s is invalid' % str(days))
+    if match_size < 2:
+        raise ValueError('The match size must be at least 2; %s is invalid' % str(match_size))
+    if not 0 < threshold < 1:
+        raise ValueError('The threshold must be between 0 and 1; %s is invalid' % str(threshold))
+
+
+def no_match_probabilities(days = DEFAULT_DAYS, match_size = DEFAULT_MATCH_SIZE):
+    # Yields (n, probability that no match_size people out of n share a birthday) for n = 1, 2, ...
+    # The probability is exactly zero once every day holds match_size - 1 people
+    history = [1.0]
+    factors = [1.0 / (math.factorial(j) * days ** j) for j in range(match_size)]
+    people = 0
+    while True:
+        people += 1
+        if people > days * (match_size - 1):
+            probability = 0.0
+        else:
+            # P(n) = sum over j < k of ((d + 1)j - n) / (j! d^j) * (n - 1)! / (n - j)! * P(n - j)
+            probability = 0.0
+            falling = 1.0
+            for j in range(1, min(people, match_size - 1) + 1):
+                if j > 1:
+                    falling *= people - j + 1
+                probability += ((days + 1) * j - people) * factors[j] * falling * history[-j]
+        yield people, probability
+        history.append(probability)
+        if len(history) > match_size:
+            del history[0]
+
+
+def people_needed(days = DEFAULT_DAYS, threshold = DEFAULT_THRESHOLD, match_size = DEFAULT_MATCH_SIZE):
+    # The fewest people for which the probability of a match is at least the threshold
+    verify(days, match_size, threshold)
+    if days > EXACT_DAYS_LIMIT:
+        return approximate_people_needed(days, threshold, match_size)
+
+    for people, probability in no_match_probabilities(days, match_size):
+        if probability <= 1 - threshold:
+            return people
+
+
+def solve_grid(days_values, thresholds, match_size = DEFAULT_MATCH_SIZE):
+    # Returns {(days, threshold): people} - each number of days takes one pass for every threshold
+    results = {}
+    thresholds = sorted(thresholds)
+    for days in days_values:
+        for threshold in thresholds:
+            verify(days, match_size, threshold)
+        if days > EXACT_DAYS_LIMIT:
+            for threshold in thresholds:
+                results[(days, threshold)] = approximate_people_needed(days, threshold, match_size)
+            continue
+
+        # The probability of no match only decreases, so the thresholds are reached in increasing order
+        remaining = iter(thresholds)
+        threshold = next(remaining, None)
+        for people, probability in no_match_probabilities(days, match_size):
+            while threshold is not None and probability <= 1 - threshold:
+                results[(days, threshold)] = people
+                threshold = next(remaining, None)
+            if threshold is None:
+                break
+    return results
+
+
+def approximate_people_needed(days, threshold = DEFAULT_THRESHOLD, match_size = DEFAULT_MATCH_SIZE):
+    verify(days, match_size, threshold)
+    if days < APPROXIMATE_DAYS_MINIMUM:
+        for people, probability in no_match_probabilities(days, match_size):
+            if probability <= 1 - threshold:
+                return people
+    log_target = math.log1p(-threshold)
+
+    if match_size > 2:
+        # Diaconis-Mosteller - n = (k! d^(k-1) L)^(1/k) * (1 - n/(d(k + 1)))^(-1/k), solved by iteration
+        base = math.exp((math.lgamma(match_size + 1) + (match_size - 1) * math.log(days) + math.log(-log_target)) / match_size)
+        people = base
+        for _ in range(CORRECTION_ITERATIONS):
+            people = base * (1 - people / (days * (match_size + 1))) ** (-1 / match_size)
+
+        # Correction - the estimate is a few percent low, so search for the first n past the threshold. A match
+        # is certain with one more person than fills every day k - 1 times, which bounds the search
+        limit = days * (match_size - 1) + 1
+        low = high = min(limit, max(1, math.ceil(people)))
+        while low > 1 and _log_no_match_saddle(low, days, match_size) <= log_target:
+            low = max(1, low // 2)
+        while high < limit and _log_no_match_saddle(high, days, match_size) > log_target:
+            high = min(limit, high * 2)
+        while low < high:
+            middle = (low + high) // 2
+            if _log_no_match_saddle(middle, days, match_size) <= log_target:
+                high = middle
+            else:
+                low = middle + 1
+        return high
+
+    # Square-root estimate - the expected number of matching pairs n(n - 1)/2d equals -ln(1 - threshold)
+    people = max(1, math.ceil(0.5 + math.sqrt(0.25 - 2 * days * log_target)))
+
+    # Correction - step until n is the first number of people past the threshold
+    while _log_no_match(people, days) > log_target:
+        people += 1
+    while people > 1 and _log_no_match(people - 1, days) <= log_target:
+        people -= 1
+    return people
+
+
+def _log_no_match(people, days):
+    # ln of the product of (1 - i/d) for i < n, expanded as -(S1/d + S2/2d^2 + S3/3d^3) where Sj is the sum of i^j
+    n = people
+    s1 = n * (n - 1) / 2
+    s2 = (n - 1) * n * (2 * n - 1) / 6
+    s3 = s1 * s1
+    return -(s1 / days + s2 / (2 * days ** 2) + s3 / (3 * days ** 3))
+
+
+def _log_no_match_saddle(people, days, match_size):
+    # ln P(no match) = ln [x^n] f(x)^d - ln [x^n] e^(dx), where f is e^x truncated to its first k terms. Both
+    # coefficients are taken at their saddle points, so that most of the error of each cancels. With r the
+    # saddle point of f (the mean of a Poisson(r) truncated below k is n/d) and s = r/(n/d):
+    #   n(s - 1 - ln s) + d ln(1 - P(Poisson(r) >= k)) - ln(variance/mean of the truncated Poisson) / 2
+    if people > days * (match_size - 1):
+        return -math.inf
+    rate = people / days
+
+    def truncated_poisson(r):
+        # (terms r^j/j! for j < k, mean, variance)
+        terms = [1.0]
+        for j in range(1, match_size):
+            terms.append(terms[-1] * r / j)
+        total = sum(terms)
+        mean = sum(j * term for j, term in enumerate(terms)) / total
+        return terms, mean, sum(j * j * term for j, term in enumerate(terms)) / total - mean * mean
+
+    # Truncation lowers the mean, so the saddle point is above the rate
+    low, high = rate, 2 * rate
+    while truncated_poisson(high)[1] < rate:
+        high *= 2
+    for _ in range(SADDLE_POINT_ITERATIONS):
+        middle = (low + high) / 2
+        if truncated_poisson(middle)[1] < rate:
+            low = middle
+        else:
+            high = middle
+    r = (low + high) / 2
+    terms, mean, variance = truncated_poisson(r)
+
+    # The probability of the tail j >= k - summed directly while it is small, to keep its precision
+    if r < 1:
+        tail = 0.0
+        term = terms[-1] * r / match_size
+        j = match_size
+        while term > tail * 1e-17:
+            tail += term
+            j += 1
+            term *= r / j
+        tail *= math.exp(-r)
+    else:
+        tail = 1 - math.exp(-r) * sum(terms)
+    if tail >= 1:
+        return -math.inf
+
+    s = r / rate
+    return people * ((s - 1) - math.log(s)) + days * math.log1p(-tail) - 0.5 * math.log(variance / mean)
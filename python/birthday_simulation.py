@@ -0,0 +1,134 @@
+"""
+Monte Carlo simulation of the birthday problem, for cases the analytic engine cannot
+handle - birthdays that are not uniformly distributed (e.g. skewed traffic over an ID
+space) and k-way matches. Each trial draws n birthdays and checks whether any day is
+shared by at least k of them.
+
+Trials run in batches and are sharded across a process pool. Every shard has its own
+random number generator seeded from (seed, shard), so that the streams are independent
+and a run is reproducible. Batches continue until the confidence interval of the
+estimate is narrower than the tolerance, or the trial budget is spent.
+"""
+
+import hashlib
+import math
+import random
+import time
+
+from collections import Counter
+from itertools import accumulate
+
+DEFAULT_TRIALS = 10 ** 6
+DEFAULT_BATCH_SIZE = 10 ** 4
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_TOLERANCE = 0.001
+
+
+class SimulationResult(object):
+
+    def __init__(self, matches, trials, confidence, elapsed):
+        self.matches = matches
+        self.trials = trials
+        self.confidence = confidence
+        self.elapsed = elapsed
+        self.estimate = matches / trials
+        self.low, self.high = wilson_interval(matches, trials, confidence)
+
+    def __repr__(self):
+        return 'P(match) = %0.5f, %g%% interval [%0.5f, %0.5f] from %d trials (%d trials/s)' % (
+            self.estimate, self.confidence * 100, self.low, self.high, self.trials, self.trials_per_second)
+
+    @property
+    def half_width(self):
+        return (self.high - self.low) / 2
+
+    @property
+    def trials_per_second(self):
+        return self.trials / self.elapsed if self.elapsed else 0
+
+
+def wilson_interval(successes, trials, confidence = DEFAULT_CONFIDENCE):
+    # The Wilson score interval, which (unlike the normal approximation) behaves near 0 and 1
+    if trials == 0:
+        return 0.0, 1.0
+    # Imported here as statistics (and its imports) are slow to import
+    from statistics import NormalDist
+
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+def shard_seed(seed, shard):
+    # Derives an independent seed for each shard, so streams never overlap whatever the seed
+    digest = hashlib.sha256(('%s:%d' % (seed, shard)).encode()).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+def simulate_batch(people, days, match_size, trials, seed, weights = None):
+    # Returns the number of trials (out of trials) in which at least match_size people share a day
+    rng = random.Random(seed)
+    cumulative_weights = list(accumulate(weights)) if weights else None
+    population = range(days)
+    matches = 0
+    for _ in range(trials):
+        birthdays = rng.choices(population, cum_weights=cumulative_weights, k=people)
+
+        if match_size == 2:
+            # A repeated birthday shrinks the set
+            if len(set(birthdays)) < people:
+                matches += 1
+        elif Counter(birthdays).most_common(1)[0][1] >= match_size:
+            matches += 1
+    return matches
+
+
+def simulate(people, days = 365, match_size = 2, weights = None, trials = DEFAULT_TRIALS,
+             batch_size = DEFAULT_BATCH_SIZE, workers = 1, seed = 0,
+             confidence = DEFAULT_CONFIDENCE, tolerance = DEFAULT_TOLERANCE):
+    # Estimates the probability that at least match_size of the people share a birthday
+    if weights is not None and len(weights) != days:
+        raise ValueError('There must be one weight per day; %d weights for %d days is invalid' % (len(weights), days))
+    if people < 1 or days < 1 or match_size < 2 or trials < 1:
+        raise ValueError('Invalid simulation: %d people, %d days, match size %d, %d trials' % (people, days, match_size, trials))
+    if workers < 1 or batch_size < 1:
+        raise ValueError('Invalid simulation: %d workers, batches of %d trials' % (workers, batch_size))
+
+    start = time.perf_counter()
+    matches = 0
+    completed = 0
+    shard = 0
+    executor = None
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        while completed < trials:
+            # One round is a batch per worker - stop early once the interval is tight enough
+            sizes = []
+            for _ in range(workers):
+                size = min(batch_size, trials - completed - sum(sizes))
+                if size > 0:
+                    sizes.append(size)
+            arguments = [(people, days, match_size, size, shard_seed(seed, shard + i), weights) for i, size in enumerate(sizes)]
+            shard += len(sizes)
+
+            if executor:
+                futures = [executor.submit(simulate_batch, *a) for a in arguments]
+                matches += sum(future.result() for future in futures)
+            else:
+                matches += sum(simulate_batch(*a) for a in arguments)
+            completed += sum(sizes)
+
+            low, high = wilson_interval(matches, completed, confidence)
+            if (high - low) / 2 <= tolerance:
+                break
+    finally:
+        if executor:
+            executor.shutdown()
+
+    return SimulationResult(matches, completed, confidence, time.perf_counter() - start)
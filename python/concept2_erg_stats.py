@@ -8,8 +8,11 @@ This script also shows the total times needed for an optional range of distances
 
 import argparse
 import logging
+import sys
 
-from Concept2Split import Split
+import erg_table_writers
+
+from Concept2Split import Split, SplitTable
 
 DEFAULT_HIGH_SPLIT = "2:15"
 DEFAULT_LOW_SPLIT = "1:45"
@@ -24,7 +27,7 @@ def default_low_split():
 def default_split_increment():
     return DEFAULT_SPLIT_INCREMENT
 
-def parse_args():
+def parse_args(argv = None):
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument(
         '-H', '--high-split',
@@ -48,6 +51,11 @@ def parse_args():
         action='store',
         default=default_low_split()
     )
+    parser.add_argument(
+        '-f', '--format',
+        help='Output format [' + erg_table_writers.DEFAULT_FORMAT + ']',
+        choices=erg_table_writers.FORMATS,
+        default=erg_table_writers.DEFAULT_FORMAT)
     parser.add_argument(
         '-q', '--quiet',
         help='Quiet mode',
@@ -64,14 +72,15 @@ def parse_args():
         nargs='*',
     )
 
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
 def configure_logging(args):
-    log_level = logging.INFO
+    # Quiet mode needs no configuration - by default warnings and errors are written to stderr
     if args.quiet:
-        log_level = logging.WARNING
-    elif args.verbose:
+        return
+    log_level = logging.INFO
+    if args.verbose:
         log_level = logging.DEBUG
 
     logging.basicConfig(level=log_level, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -87,8 +96,14 @@ def example_splits():
     split_display = Split.display('1:45.0')
     print('EXAMPLE: Split constructed from a display string: %s' % split_display)
 
-if __name__ == '__main__':
-    args = parse_args()
+def log_splits(chunks):
+    for table in chunks:
+        for split in table:
+            logging.debug(split)
+        yield table
+
+def main(argv = None):
+    args = parse_args(argv)
 
     Split.verify_increment(args.split_increment)
     Split.verify_split(args.high_split)
@@ -96,19 +111,21 @@ if __name__ == '__main__':
 
     configure_logging(args)
 
-    example_splits()
-
-    table_output = [Split.get_header_row(args.distances)]
+    # The examples would corrupt the machine-readable formats
+    if args.format == 'text':
+        example_splits()
+        sys.stdout.flush()
 
     start = Split.split_display_string_to_seconds(args.high_split)
     end = Split.split_display_string_to_seconds(args.low_split)
 
-    seconds = start
-    while seconds >= end:
-        split = Split(seconds, args.distances)
-        logging.debug(split)
-        table_output.append(split.get_row())
-        seconds -= args.split_increment
+    chunks = SplitTable.chunks(start, end, args.split_increment, args.distances)
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        chunks = log_splits(chunks)
 
-    print('\n'.join(table_output))
+    # Each chunk of rows is written as soon as it is generated
+    erg_table_writers.write_table(chunks, sys.stdout.buffer, args.format, args.distances)
 
+
+if __name__ == '__main__':
+    main()
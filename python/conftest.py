@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+import os
+import random
+import warnings
+
+import pytest
+
+import benchmark_gate
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmark', 'performance benchmarks (run with -m benchmark)')
+    group.addoption(
+        '--benchmark-baseline',
+        metavar='FILE',
+        help='JSON baseline to compare with [$%s or benchmarks/baseline.json]' % benchmark_gate.BASELINE_ENVIRONMENT_VARIABLE,
+        default=os.environ.get(benchmark_gate.BASELINE_ENVIRONMENT_VARIABLE, benchmark_gate.BASELINE_FILE))
+    group.addoption(
+        '--benchmark-tolerance',
+        metavar='FRACTION',
+        help='Fail a benchmark this much slower than its baseline [$%s or %s]' % (
+            benchmark_gate.TOLERANCE_ENVIRONMENT_VARIABLE, benchmark_gate.DEFAULT_TOLERANCE),
+        type=float,
+        default=float(os.environ.get(benchmark_gate.TOLERANCE_ENVIRONMENT_VARIABLE, benchmark_gate.DEFAULT_TOLERANCE)))
+    group.addoption(
+        '--benchmark-save',
+        help='Save the times as the baseline rather than comparing with it',
+        action='store_true')
+
+class BenchmarkSession(object):
+
+    def __init__(self, config):
+        self.path = config.getoption('benchmark_baseline')
+        self.tolerance = config.getoption('benchmark_tolerance')
+        self.save = config.getoption('benchmark_save')
+        self.machine = benchmark_gate.machine_metadata()
+        self.baseline = benchmark_gate.load_baseline(self.path)
+        self.comparable = benchmark_gate.same_machine(self.baseline['machine'], self.machine)
+        self.results = {}
+
+    def regression(self, name, seconds):
+        # A description of the regression, or None if there is one or the times are not compared
+        if self.save or not self.comparable:
+            return None
+        return benchmark_gate.regression(name, seconds, self.baseline, self.tolerance)
+
+    def record(self, name, seconds, loops):
+        self.results[name] = {'seconds': seconds, 'loops': loops}
+        if not self.save and not self.comparable:
+            if self.baseline['results']:
+                warnings.warn('The benchmark baseline %s was taken on another machine - not compared' % self.path)
+            return
+        message = self.regression(name, seconds)
+        if message:
+            pytest.fail(message, pytrace=False)
+
+@pytest.fixture(scope='session')
+def benchmark_session(request):
+    session = BenchmarkSession(request.config)
+    yield session
+    if session.save and session.results:
+        benchmark_gate.save_baseline(session.path, session.results, session.machine)
+
+@pytest.fixture
+def measure(benchmark_session, request):
+    # measure(function, *args) times the function and fails the test if it has regressed
+    def run(function, *args, repeat = benchmark_gate.DEFAULT_REPEAT):
+        def call():
+            # Randomised algorithms take the same path on every call
+            random.seed(benchmark_gate.SEED)
+            function(*args)
+
+        name = request.node.name
+        seconds, loops = benchmark_gate.time_function(call, repeat)
+        # A busy host only slows a timing down - time an apparent regression again before failing it
+        for _ in range(benchmark_gate.RETIMES):
+            if benchmark_session.regression(name, seconds) is None:
+                break
+            seconds = min(seconds, benchmark_gate.time_function(call, repeat)[0])
+        benchmark_session.record(name, seconds, loops)
+        return seconds
+    return run
@@ -1,73 +1,149 @@
 #!/usr/bin/env python3
 
 """
-Enhanced VPC Diagram with Security Layers
+Renders architecture diagrams from specs (see diagram_spec.py) - by default the
+Enhanced VPC Diagram with Security Layers in diagram_specs/secure_vpc.json.
 brew install graphviz
 (venv) pip install diagrams
 Thank you, ChatGPT :-)
-"""
-
-from diagrams import Cluster, Diagram
-from diagrams.aws.compute import EC2
-from diagrams.aws.network import ALB, InternetGateway, NATGateway
-from diagrams.aws.database import RDS
-from diagrams.aws.security import WAF, Shield, KMS
-from diagrams.onprem.client import User
-
-with Diagram("Secure VPC Architecture", show=True, filename="secure_vpc_diagram"):
-
-    # External Client
-    client = User("Client")
-
-    with Cluster("VPC"):
-
-        # Edge Security
-        waf = WAF("AWS WAF")
-        igw = InternetGateway("Internet Gateway")
-
-        # Represent security Groups
-        alb_sg = Shield("ALB SG")
-        web_sg = Shield("Web SG")
-        middleware_sg = Shield("Middleware SG")
-        rds_sg = Shield("DB SG")
-
-        # Application Load Balancer
-        alb = ALB("Application Load Balancer")
-
-        # Public Subnets
-        with Cluster("Public Subnet 1"):
-            web1 = EC2("Web Server 1")
-        with Cluster("Public Subnet 2"):
-            web2 = EC2("Web Server 2")
-        with Cluster("Public Subnet 3"):
-            web3 = EC2("Web Server 3")
 
-        # Private Subnets
-        with Cluster("Private Subnet 1"):
-            middleware1 = EC2("Middleware 1")
-        with Cluster("Private Subnet 2"):
-            middleware2 = EC2("Middleware 2")
-        with Cluster("Private Subnet 3"):
-            middleware3 = EC2("Middleware 3")
-
-        # NAT Gateway for private outbound internet
-        nat = NATGateway("NAT Gateway")
-
-        # Database
-        rds = RDS("Application Database")
-        kms = KMS("KMS Encryption")
-
-        # Connections (flow + security layers)
-        client >> waf >> igw >> alb_sg >> alb
-
-        alb >> web_sg >> [web1, web2, web3]
-
-        [web1, web2, web3] >> middleware_sg >> [middleware1, middleware2, middleware3]
-
-        [middleware1, middleware2, middleware3] >> rds_sg >> rds
-
-        # Private instances can access the internet via NAT
-        [middleware1, middleware2, middleware3] >> nat
+Each artifact (e.g. secure_vpc_diagram.png) has a sidecar file of the hash of the spec
+it was drawn from (secure_vpc_diagram.png.sha256). A diagram whose hash matches is not
+redrawn, so a docs build only pays for Graphviz when a topology changes. Many diagrams
+are drawn in parallel by a pool of processes. The diagrams package is only imported to
+draw, and a diagram is only opened in an image viewer when asked (--show).
+"""
 
-        # Database encryption
-        rds >> kms
+import argparse
+import importlib
+import logging
+import os
+import time
+
+import diagram_spec
+
+HASH_SUFFIX = '.sha256'
+DEFAULT_SPEC = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'diagram_specs', 'secure_vpc.json')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('specs', metavar='SPEC', help='JSON or YAML diagram specs [the secure VPC]', nargs='*', default=[DEFAULT_SPEC])
+    parser.add_argument('-o', '--output-directory', metavar='DIR', help='Directory of the rendered diagrams [.]', default='.')
+    parser.add_argument('-w', '--workers', metavar='N', help='Number of rendering processes [1]', type=int, default=1)
+    parser.add_argument('-f', '--force', help='Render even if the diagram is up to date', action='store_true')
+    parser.add_argument('-s', '--show', help='Open each rendered diagram in the image viewer', action='store_true')
+    parser.add_argument('-q', '--quiet', help='Quiet mode', action='store_true')
+    parser.add_argument('-v', '--verbose', help='Verbose mode', action='store_true')
+    return parser.parse_args()
+
+
+def configure_logging(args):
+    log_level = logging.INFO
+    if args.quiet:
+        log_level = logging.WARNING
+    elif args.verbose:
+        log_level = logging.DEBUG
+
+    logging.basicConfig(level=log_level, format='%(levelname)s: %(message)s')
+
+
+def artifact_path(spec, directory = '.'):
+    return os.path.join(directory, diagram_spec.artifact_name(spec))
+
+
+def is_current(spec, directory = '.'):
+    # True if the artifact exists and was drawn from this spec
+    path = artifact_path(spec, directory)
+    try:
+        with open(path + HASH_SUFFIX) as f:
+            recorded = f.read().strip()
+    except FileNotFoundError:
+        return False
+    return recorded == diagram_spec.spec_hash(spec) and os.path.exists(path)
+
+
+def render(spec, directory = '.', force = False, show = False):
+    # Draws the diagram unless it is up to date - returns (artifact path, whether it was drawn)
+    spec = diagram_spec.normalize(spec)
+    path = artifact_path(spec, directory)
+    if not force and is_current(spec, directory):
+        logging.debug('%s is up to date' % path)
+        return path, False
+
+    start = time.perf_counter()
+    draw(spec, directory, show)
+    # The hash is only recorded once the artifact has been written, so a failed render is retried
+    with open(path + HASH_SUFFIX, 'w') as f:
+        f.write(diagram_spec.spec_hash(spec) + '\n')
+    logging.info('Rendered %s in %0.2fs' % (path, time.perf_counter() - start))
+    return path, True
+
+
+def render_all(specs, directory = '.', workers = 1, force = False, show = False):
+    # Renders the specs that are out of date, across a pool of processes - returns (path, drawn) for each spec
+    specs = [diagram_spec.normalize(spec) for spec in specs]
+    results = [(artifact_path(spec, directory), False) for spec in specs]
+    stale = [index for index, spec in enumerate(specs) if force or not is_current(spec, directory)]
+    if workers > 1 and len(stale) > 1:
+        # Only imported for parallel rendering, as it is slow to import
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(stale))) as executor:
+            futures = [executor.submit(render, specs[index], directory, True, show) for index in stale]
+            for index, future in zip(stale, futures):
+                results[index] = future.result()
+    else:
+        for index in stale:
+            results[index] = render(specs[index], directory, True, show)
+    return results
+
+
+def draw(spec, directory = '.', show = False):
+    # Builds the diagram with the diagrams package, which runs Graphviz to write the artifact
+    from diagrams import Cluster, Diagram
+
+    nodes_by_id = dict((node['id'], node) for node in spec['nodes'])
+    clustered = set(node_id for cluster in diagram_spec.walk_clusters(spec['clusters']) for node_id in cluster['nodes'])
+    drawn = {}
+
+    def draw_node(node_id):
+        node = nodes_by_id[node_id]
+        drawn[node_id] = node_class(node['type'])(node['label'])
+
+    def draw_clusters(clusters):
+        for cluster in clusters:
+            with Cluster(cluster['label']):
+                for node_id in cluster['nodes']:
+                    draw_node(node_id)
+                draw_clusters(cluster['clusters'])
+
+    filename = os.path.join(directory, spec['filename'])
+    with Diagram(spec['name'], show=show, filename=filename, direction=spec['direction'], outformat=spec['outformat']):
+        for node in spec['nodes']:
+            if node['id'] not in clustered:
+                draw_node(node['id'])
+        draw_clusters(spec['clusters'])
+        for source, target in spec['edges']:
+            drawn[source] >> drawn[target]
+
+
+def node_class(node_type):
+    # e.g. "aws.compute.EC2" is diagrams.aws.compute.EC2
+    module, _, name = node_type.rpartition('.')
+    try:
+        return getattr(importlib.import_module('diagrams.' + module), name)
+    except (ImportError, AttributeError):
+        raise ValueError('Unknown node type "%s"' % node_type)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    configure_logging(args)
+
+    start = time.perf_counter()
+    specs = [diagram_spec.load_spec(path) for path in args.specs]
+    os.makedirs(args.output_directory, exist_ok=True)
+    results = render_all(specs, args.output_directory, args.workers, args.force, args.show)
+    drawn = sum(1 for _, rendered in results if rendered)
+    logging.info('%d diagrams rendered, %d up to date in %0.2fs' % (drawn, len(results) - drawn, time.perf_counter() - start))
@@ -0,0 +1,137 @@
+"""
+Architecture diagrams as data. A spec is a dictionary (usually loaded from a JSON or
+YAML file) of the nodes, the clusters they are grouped in and the edges between them:
+    {
+        "name": "Secure VPC Architecture",
+        "filename": "secure_vpc_diagram",
+        "nodes": [{"id": "client", "type": "onprem.client.User", "label": "Client"}, ...],
+        "clusters": [{"label": "VPC", "nodes": ["waf", ...], "clusters": [...]}],
+        "edges": [["client", "waf"], ["web_sg", ["web1", "web2", "web3"]], ...]
+    }
+A node type is a class of the diagrams package, relative to it (e.g. "aws.compute.EC2").
+Either end of an edge may be a list of node ids - a fan out or in.
+
+A normalized spec has every default filled in and every edge expanded to a pair of
+ids, and its canonical JSON (sorted keys, no whitespace) is hashed. Specs that draw the
+same diagram therefore have the same hash, whatever their key order or shorthand.
+Node, cluster and edge order is kept, as it changes the Graphviz layout.
+"""
+
+import copy
+import hashlib
+import json
+import os
+
+# Part of every hash, so that changing how specs are drawn invalidates every artifact
+SPEC_VERSION = 1
+DEFAULT_DIRECTION = 'LR'
+DEFAULT_OUTFORMAT = 'png'
+DIRECTIONS = ('LR', 'RL', 'TB', 'BT')
+OUTFORMATS = ('png', 'jpg', 'svg', 'pdf', 'dot')
+
+
+def load_spec(path):
+    return normalize(read_data(path))
+
+
+def read_data(path):
+    # JSON, or YAML for a .yaml or .yml file
+    with open(path) as f:
+        if path.endswith(('.yaml', '.yml')):
+            # Only imported for YAML files
+            import yaml
+
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def normalize(spec):
+    # Returns a verified copy of the spec with the defaults filled in and the edges expanded to pairs
+    spec = copy.deepcopy(spec)
+    for key in ('name', 'filename', 'nodes'):
+        if not spec.get(key):
+            raise ValueError('A diagram spec must have a "%s"' % key)
+    if os.path.basename(spec['filename']) != spec['filename']:
+        raise ValueError('The filename "%s" must not include a directory' % spec['filename'])
+    spec.setdefault('direction', DEFAULT_DIRECTION)
+    spec.setdefault('outformat', DEFAULT_OUTFORMAT)
+    if spec['direction'] not in DIRECTIONS:
+        raise ValueError('Invalid direction "%s" - must be one of %s' % (spec['direction'], ', '.join(DIRECTIONS)))
+    if spec['outformat'] not in OUTFORMATS:
+        raise ValueError('Invalid format "%s" - must be one of %s' % (spec['outformat'], ', '.join(OUTFORMATS)))
+
+    ids = set()
+    for node in spec['nodes']:
+        if not node.get('id') or not node.get('type'):
+            raise ValueError('Every node must have an "id" and a "type"; %s is invalid' % node)
+        if node['id'] in ids:
+            raise ValueError('The node id "%s" is repeated' % node['id'])
+        if '.' not in node['type']:
+            raise ValueError('The node type "%s" must be a module and class, e.g. "aws.compute.EC2"' % node['type'])
+        node.setdefault('label', node['id'])
+        ids.add(node['id'])
+
+    spec['clusters'] = [_normalize_cluster(cluster, ids) for cluster in spec.get('clusters', [])]
+    _check_clustered_once(spec['clusters'])
+
+    edges = []
+    for edge in spec.get('edges', []):
+        if len(edge) != 2:
+            raise ValueError('An edge must be a pair of node ids (or lists of them); %s is invalid' % edge)
+        for source in _ids(edge[0], ids):
+            for target in _ids(edge[1], ids):
+                edges.append([source, target])
+    spec['edges'] = edges
+    return spec
+
+
+def canonical_json(spec):
+    return json.dumps(spec, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def spec_hash(spec):
+    # The SHA-256 of the canonical JSON of the normalized spec (and the spec version)
+    content = canonical_json({'spec': normalize(spec), 'version': SPEC_VERSION})
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def artifact_name(spec):
+    return '%s.%s' % (spec['filename'], spec.get('outformat', DEFAULT_OUTFORMAT))
+
+
+def walk_clusters(clusters):
+    # Yields every cluster, parents before their children
+    for cluster in clusters:
+        yield cluster
+        yield from walk_clusters(cluster['clusters'])
+
+
+def _normalize_cluster(cluster, ids):
+    if not cluster.get('label'):
+        raise ValueError('Every cluster must have a "label"; %s is invalid' % cluster)
+    nodes = list(cluster.get('nodes', []))
+    for node_id in nodes:
+        if node_id not in ids:
+            raise ValueError('The cluster "%s" contains an unknown node "%s"' % (cluster['label'], node_id))
+    return {
+        'label': cluster['label'],
+        'nodes': nodes,
+        'clusters': [_normalize_cluster(child, ids) for child in cluster.get('clusters', [])],
+    }
+
+
+def _check_clustered_once(clusters):
+    clustered = set()
+    for cluster in walk_clusters(clusters):
+        for node_id in cluster['nodes']:
+            if node_id in clustered:
+                raise ValueError('The node "%s" is in more than one cluster' % node_id)
+            clustered.add(node_id)
+
+
+def _ids(end, ids):
+    end = [end] if isinstance(end, str) else list(end)
+    for node_id in end:
+        if node_id not in ids:
+            raise ValueError('An edge refers to an unknown node "%s"' % node_id)
+    return end
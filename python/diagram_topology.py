@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+
+"""
+Generates a diagram spec (see diagram_spec.py) from a topology - a local YAML or JSON
+description of an estate, rather than a live AWS call. A topology is a spec in which
+instance groups can be used wherever a node can:
+    groups:
+      - id: web
+        type: aws.compute.EC2
+        label: Web Server          # instances are "Web Server 1", "Web Server 2" ...
+        count: 120
+        subnets: 3                 # instances are spread across the subnets
+        subnet_label: Public Subnet
+    clusters:
+      - label: VPC
+        nodes: [alb, web_sg, web]  # the group's subnets are drawn in the VPC
+    edges:
+      - [web_sg, web]              # to every instance in the group
+Graphviz layout time grows steeply with the number of nodes and edges, so:
+- a group of more instances than the collapse threshold is drawn as one aggregate node
+- an edge from many nodes to many nodes is routed through a hub node - N + M edges
+  rather than N x M
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import diagram_spec
+
+DEFAULT_COLLAPSE_THRESHOLD = 8
+HUB_TYPE = 'generic.blank.Blank'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('topology', metavar='TOPOLOGY', help='YAML or JSON topology')
+    parser.add_argument('-o', '--output', metavar='FILE', help='Write the spec (JSON) to this file ("-" for stdout)')
+    parser.add_argument('-r', '--render', metavar='DIR', help='Render the diagram into this directory (unless it is up to date)')
+    parser.add_argument('-l', '--layout', help='Time the Graphviz layout of the diagram', action='store_true')
+    parser.add_argument(
+        '-t', '--threshold',
+        metavar='N',
+        help='Collapse groups of more instances than this [the topology\'s collapse_threshold or %d]' % DEFAULT_COLLAPSE_THRESHOLD,
+        type=int)
+    parser.add_argument('--no-hubs', help='Draw every edge of a many-to-many fan', action='store_true')
+    parser.add_argument('-q', '--quiet', help='Quiet mode', action='store_true')
+    parser.add_argument('-v', '--verbose', help='Verbose mode', action='store_true')
+    return parser.parse_args()
+
+
+def configure_logging(args):
+    log_level = logging.INFO
+    if args.quiet:
+        log_level = logging.WARNING
+    elif args.verbose:
+        log_level = logging.DEBUG
+
+    logging.basicConfig(level=log_level, format='%(levelname)s: %(message)s')
+
+
+def generate(topology, threshold = DEFAULT_COLLAPSE_THRESHOLD, hubs = True):
+    # Returns the normalized spec of the topology - a threshold of None never collapses a group
+    nodes = [dict(node) for node in topology.get('nodes', [])]
+    # The node ids that each node or group id stands for at the end of an edge
+    members = dict((node['id'], [node['id']]) for node in nodes)
+    # What a group id in a cluster is replaced by - its subnet clusters, or its nodes
+    placements = {}
+
+    for group in topology.get('groups', []):
+        group_nodes, group_clusters = _expand_group(group, threshold)
+        if group['id'] in members:
+            raise ValueError('The group id "%s" is repeated' % group['id'])
+        nodes.extend(group_nodes)
+        members[group['id']] = [node['id'] for node in group_nodes]
+        placements[group['id']] = (members[group['id']] if not group_clusters else [], group_clusters)
+
+    placed = set()
+    clusters = [_place_cluster(cluster, placements, placed) for cluster in topology.get('clusters', [])]
+    # Groups that are not in a cluster are drawn at the top level
+    for group_id, (_, group_clusters) in placements.items():
+        if group_id not in placed:
+            clusters.extend(group_clusters)
+
+    edges = []
+    seen = set()
+    hub_count = 0
+    for edge in topology.get('edges', []):
+        if len(edge) != 2:
+            raise ValueError('An edge must be a pair of ids (or lists of them); %s is invalid' % edge)
+        sources, targets = _members(edge[0], members), _members(edge[1], members)
+        if hubs and len(sources) > 1 and len(targets) > 1:
+            hub_count += 1
+            hub = 'hub%d' % hub_count
+            nodes.append({'id': hub, 'type': HUB_TYPE, 'label': ''})
+            pairs = [(source, hub) for source in sources] + [(hub, target) for target in targets]
+        else:
+            pairs = [(source, target) for source in sources for target in targets]
+        for pair in pairs:
+            if pair not in seen:
+                seen.add(pair)
+                edges.append(list(pair))
+
+    spec = dict((key, value) for key, value in topology.items() if key not in ('groups', 'collapse_threshold'))
+    spec.update(nodes=nodes, clusters=clusters, edges=edges)
+    return diagram_spec.normalize(spec)
+
+
+def spec_size(spec):
+    # (nodes, edges)
+    return len(spec['nodes']), len(spec['edges'])
+
+
+def layout_time(spec):
+    # Seconds for Graphviz to lay out the diagram - it is drawn as DOT, so no image is rasterised
+    import diagram_as_code
+
+    spec = dict(spec, outformat='dot')
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        diagram_as_code.draw(spec, directory)
+        return time.perf_counter() - start
+
+
+def _expand_group(group, threshold):
+    # Returns the group's nodes and (if it has subnets) its subnet clusters
+    for key in ('id', 'type', 'count'):
+        if not group.get(key):
+            raise ValueError('Every group must have an "%s"; %s is invalid' % (key, group))
+    count = group['count']
+    subnets = group.get('subnets', 1)
+    label = group.get('label', group['id'])
+    subnet_label = group.get('subnet_label')
+    if not isinstance(count, int) or not isinstance(subnets, int) or not 1 <= subnets <= count:
+        raise ValueError('A group needs between 1 and count subnets; %s is invalid' % group)
+
+    if threshold is not None and count > threshold:
+        node = {'id': group['id'], 'type': group['type'], 'label': '%s x%d' % (label, count)}
+        if not subnet_label:
+            return [node], []
+        cluster_label = subnet_label if subnets == 1 else '%s x%d' % (subnet_label, subnets)
+        return [node], [{'label': cluster_label, 'nodes': [group['id']]}]
+
+    group_nodes = [{'id': '%s%d' % (group['id'], i), 'type': group['type'], 'label': '%s %d' % (label, i)}
+                   for i in range(1, count + 1)]
+    if not subnet_label:
+        return group_nodes, []
+    # Instances are dealt to the subnets in turn
+    group_clusters = [{'label': '%s %d' % (subnet_label, j + 1) if subnets > 1 else subnet_label,
+                       'nodes': [node['id'] for node in group_nodes[j::subnets]]} for j in range(subnets)]
+    return group_nodes, group_clusters
+
+
+def _place_cluster(cluster, placements, placed):
+    nodes = []
+    clusters = []
+    for member in cluster.get('nodes', []):
+        if member in placements:
+            if member in placed:
+                raise ValueError('The group "%s" is in more than one cluster' % member)
+            placed.add(member)
+            group_nodes, group_clusters = placements[member]
+            nodes.extend(group_nodes)
+            clusters.extend(group_clusters)
+        else:
+            nodes.append(member)
+    clusters.extend(_place_cluster(child, placements, placed) for child in cluster.get('clusters', []))
+    return {'label': cluster.get('label'), 'nodes': nodes, 'clusters': clusters}
+
+
+def _members(end, members):
+    ids = []
+    for member in [end] if isinstance(end, str) else end:
+        if member not in members:
+            raise ValueError('An edge refers to an unknown node or group "%s"' % member)
+        ids.extend(members[member])
+    return ids
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    configure_logging(args)
+
+    topology = diagram_spec.read_data(args.topology)
+    threshold = args.threshold if args.threshold is not None else topology.get('collapse_threshold', DEFAULT_COLLAPSE_THRESHOLD)
+    spec = generate(topology, threshold, not args.no_hubs)
+
+    nodes, edges = spec_size(spec)
+    all_nodes, all_edges = spec_size(generate(topology, None, False))
+    logging.info('%d nodes and %d edges (%d and %d without collapsing groups or hubs)' % (nodes, edges, all_nodes, all_edges))
+
+    if args.output:
+        output = sys.stdout if args.output == '-' else open(args.output, 'w')
+        try:
+            json.dump(spec, output, indent=4)
+            output.write('\n')
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+    if args.layout:
+        seconds = layout_time(spec)
+        logging.info('Layout of %d nodes and %d edges in %0.3fs (%0.1f ms per edge)' % (nodes, edges, seconds, seconds * 1000 / max(edges, 1)))
+
+    if args.render:
+        import diagram_as_code
+
+        os.makedirs(args.render, exist_ok=True)
+        path, drawn = diagram_as_code.render(spec, args.render)
+        logging.info('%s %s' % (path, 'rendered' if drawn else 'is up to date'))
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+
+"""
+Summarises exported Concept2 logbook intervals (CSV or JSON lines) in a single
+streaming pass - the mean and percentiles of the power in watts, the total time rowed
+at each distance and the best split for each athlete. Rows are parsed and converted to
+watts in fixed-size chunks, so memory use does not grow with the size of the log.
+"""
+
+import argparse
+import csv
+import json
+import logging
+import sys
+import time
+
+from array import array
+from itertools import islice
+
+from Concept2Split import Split
+
+DEFAULT_SPLIT_COLUMN = 'split'
+DEFAULT_DISTANCE_COLUMN = 'distance'
+DEFAULT_ATHLETE_COLUMN = 'athlete'
+DEFAULT_CHUNK_SIZE = 10000
+PERCENTILES = (50, 90, 99)
+FORMATS = ('csv', 'jsonl')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        'logs',
+        metavar='LOG',
+        help='Logbook files to summarise ("-" for stdin)',
+        type=argparse.FileType('r'),
+        default=[sys.stdin],
+        nargs='*')
+    parser.add_argument(
+        '-f', '--format',
+        help='Log format - guessed from each file name if not given (CSV for stdin)',
+        choices=FORMATS)
+    parser.add_argument('--split-column', help='Column of the 500m splits [' + DEFAULT_SPLIT_COLUMN + ']', default=DEFAULT_SPLIT_COLUMN)
+    parser.add_argument('--distance-column', help='Column of the interval distances [' + DEFAULT_DISTANCE_COLUMN + ']', default=DEFAULT_DISTANCE_COLUMN)
+    parser.add_argument('--athlete-column', help='Column of the athlete names [' + DEFAULT_ATHLETE_COLUMN + ']', default=DEFAULT_ATHLETE_COLUMN)
+    parser.add_argument('--chunk-size', help='Rows converted at a time [%d]' % DEFAULT_CHUNK_SIZE, type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('-q', '--quiet', help='Quiet mode', action='store_true')
+    parser.add_argument('-v', '--verbose', help='Verbose mode', action='store_true')
+    return parser.parse_args()
+
+
+def configure_logging(args):
+    log_level = logging.INFO
+    if args.quiet:
+        log_level = logging.WARNING
+    elif args.verbose:
+        log_level = logging.DEBUG
+
+    logging.basicConfig(level=log_level, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+
+def read_rows(stream, log_format = 'csv'):
+    # Yields each interval as a dictionary of column name to value - or None for a JSON line that is not an
+    # object, so the summary counts it as skipped
+    if log_format == 'csv':
+        yield from csv.DictReader(stream)
+    elif log_format == 'jsonl':
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                logging.debug('Skipping line %d: %s' % (number, e))
+                yield None
+                continue
+            if not isinstance(row, dict):
+                logging.debug('Skipping line %d: not a JSON object' % number)
+                row = None
+            yield row
+    else:
+        raise ValueError('Invalid format "%s" - must be one of %s' % (log_format, ', '.join(FORMATS)))
+
+
+def guess_format(name):
+    return 'jsonl' if name.endswith(('.jsonl', '.json', '.ndjson')) else 'csv'
+
+
+def chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def format_duration(seconds):
+    # H:MM:SS.s
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(int(minutes), 60)
+    return '%d:%02d:%04.1f' % (hours, minutes, seconds)
+
+
+def watts(splits):
+    # Converts a column of splits (in seconds) to watts in one pass
+    return array('d', map(Split.seconds_to_watts, splits))
+
+
+class LogSummary(object):
+
+    def __init__(self, split_column = DEFAULT_SPLIT_COLUMN, distance_column = DEFAULT_DISTANCE_COLUMN,
+                 athlete_column = DEFAULT_ATHLETE_COLUMN):
+        self.split_column = split_column
+        self.distance_column = distance_column
+        self.athlete_column = athlete_column
+        self.rows = 0
+        self.skipped = 0
+        self.watts_total = 0.0
+        # Watts are rounded to 0.1 so a histogram of tenths gives exact percentiles in bounded memory
+        self.watts_histogram = {}
+        self.distance_times = {}
+        self.distance_counts = {}
+        self.best_splits = {}
+
+    def add_rows(self, rows, chunk_size = DEFAULT_CHUNK_SIZE):
+        for chunk in chunks(rows, chunk_size):
+            self.add_chunk(chunk)
+
+    def add_chunk(self, rows):
+        athletes = []
+        distances = []
+        splits = array('d')
+        for row in rows:
+            if row is None:
+                self.skipped += 1
+                continue
+            try:
+                split = Split.parse_display(str(row[self.split_column]).strip())
+                distance = int(row[self.distance_column]) if row.get(self.distance_column) not in (None, '') else 0
+                if split <= 0:
+                    # e.g. a rest interval - there is no power at a 0:00 split
+                    raise ValueError('The split must be positive')
+                athlete = row.get(self.athlete_column)
+                if athlete is not None and not isinstance(athlete, str):
+                    raise TypeError('The athlete must be a name')
+            except (KeyError, TypeError, ValueError) as e:
+                logging.debug('Skipping row %s: %s' % (row, e))
+                self.skipped += 1
+                continue
+            athletes.append(athlete)
+            distances.append(distance)
+            splits.append(split)
+
+        chunk_watts = watts(splits)
+        self.rows += len(splits)
+        self.watts_total += sum(chunk_watts)
+        histogram = self.watts_histogram
+        for w in chunk_watts:
+            tenths = round(w * 10)
+            histogram[tenths] = histogram.get(tenths, 0) + 1
+
+        best_splits = self.best_splits
+        for athlete, distance, split in zip(athletes, distances, splits):
+            if distance:
+                self.distance_times[distance] = self.distance_times.get(distance, 0.0) + split * distance / Split.SPLIT_DISTANCE
+                self.distance_counts[distance] = self.distance_counts.get(distance, 0) + 1
+            if athlete is not None and (athlete not in best_splits or split < best_splits[athlete]):
+                best_splits[athlete] = split
+
+    def mean_watts(self):
+        return self.watts_total / self.rows if self.rows else 0.0
+
+    def percentile_watts(self, percentile):
+        # The smallest value with at least the percentile of the rows at or below it
+        if not self.rows:
+            return 0.0
+        target = percentile / 100 * self.rows
+        seen = 0
+        for tenths in sorted(self.watts_histogram):
+            seen += self.watts_histogram[tenths]
+            if seen >= target:
+                return tenths / 10
+        return max(self.watts_histogram) / 10
+
+    def report(self):
+        lines = ['Watts: mean %0.1f, %s' % (self.mean_watts(), ', '.join('p%d %0.1f' % (p, self.percentile_watts(p)) for p in PERCENTILES))]
+        lines.append('Total time per distance:')
+        for distance in sorted(self.distance_times):
+            lines.append('  %6dm %14s (%d intervals)' % (distance, format_duration(self.distance_times[distance]), self.distance_counts[distance]))
+        lines.append('Best split per athlete:')
+        for athlete in sorted(self.best_splits):
+            split = Split.seconds(self.best_splits[athlete])
+            lines.append('  %s: %s (%0.1f watts)' % (athlete, split.split_display, split.watts))
+        return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    configure_logging(args)
+
+    summary = LogSummary(args.split_column, args.distance_column, args.athlete_column)
+    start = time.perf_counter()
+    for log in args.logs:
+        with log:
+            log_format = args.format or guess_format(log.name)
+            summary.add_rows(read_rows(log, log_format), args.chunk_size)
+    elapsed = time.perf_counter() - start
+
+    print(summary.report())
+    logging.info('%d rows (%d skipped) in %0.2fs - %d rows/s' % (
+        summary.rows, summary.skipped, elapsed, (summary.rows + summary.skipped) / elapsed if elapsed else 0))
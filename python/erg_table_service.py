@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+
+"""
+Serves the tables of concept2_erg_stats.py over HTTP, so that repeated requests do not
+pay for Python startup or recalculation. e.g.
+    GET /table?high=2:15&low=1:45&increment=1&distance=2000&distance=5000&format=csv
+    GET /stats
+Every split from the grid's high to low split is calculated once, at 0.1 second
+resolution, when the service starts - a table is a slice of that grid. Rendered tables
+are kept in an LRU cache keyed on the normalized arguments (splits and increment in
+tenths of a second, distances as integers), and concurrent requests for the same table
+share one rendering. Rendering runs in a thread pool so the event loop keeps serving.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import logging
+import math
+import time
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import erg_table_writers
+
+from Concept2Split import Split, SplitTable
+from concept2_erg_stats import DEFAULT_HIGH_SPLIT, DEFAULT_LOW_SPLIT, DEFAULT_SPLIT_INCREMENT
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8500
+DEFAULT_CACHE_SIZE = 256
+DEFAULT_GRID_HIGH = '5:00'
+DEFAULT_GRID_LOW = '1:00'
+MAX_DISTANCES = 32
+CONTENT_TYPES = {
+    'text': 'text/plain; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+    'json': 'application/json',
+    'markdown': 'text/markdown; charset=utf-8',
+    'binary': 'application/octet-stream',
+}
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', help='Address to listen on [' + DEFAULT_HOST + ']', default=DEFAULT_HOST)
+    parser.add_argument('-p', '--port', help='Port to listen on [%d]' % DEFAULT_PORT, type=int, default=DEFAULT_PORT)
+    parser.add_argument('--cache-size', help='Rendered tables kept in memory [%d]' % DEFAULT_CACHE_SIZE, type=int, default=DEFAULT_CACHE_SIZE)
+    parser.add_argument('-w', '--workers', help='Rendering threads [default for the machine]', type=int)
+    parser.add_argument('--grid-high', metavar='SPLIT', help='Slowest split served [' + DEFAULT_GRID_HIGH + ']', default=DEFAULT_GRID_HIGH)
+    parser.add_argument('--grid-low', metavar='SPLIT', help='Fastest split served [' + DEFAULT_GRID_LOW + ']', default=DEFAULT_GRID_LOW)
+    parser.add_argument('-q', '--quiet', help='Quiet mode', action='store_true')
+    parser.add_argument('-v', '--verbose', help='Verbose mode', action='store_true')
+    return parser.parse_args()
+
+
+def configure_logging(args):
+    log_level = logging.INFO
+    if args.quiet:
+        log_level = logging.WARNING
+    elif args.verbose:
+        log_level = logging.DEBUG
+
+    logging.basicConfig(level=log_level, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+
+def to_tenths(seconds):
+    return round(seconds * 10)
+
+
+def normalize(query):
+    # Returns the cache key for a query string - (high, low, increment) in tenths of a second, the distances and the format
+    params = parse_qs(query)
+
+    def single(name, default):
+        values = params.get(name)
+        return values[-1] if values else default
+
+    high = single('high', DEFAULT_HIGH_SPLIT)
+    low = single('low', DEFAULT_LOW_SPLIT)
+    Split.verify_split(high)
+    Split.verify_split(low)
+
+    increment = float(single('increment', DEFAULT_SPLIT_INCREMENT))
+    if not math.isfinite(increment):
+        raise ValueError('The increment must be a number; %s is invalid' % str(increment))
+    Split.verify_increment(increment)
+
+    # Distances may be repeated (distance=2000&distance=5000) or comma-separated
+    distances = Split.verify_distances(d for value in params.get('distance', []) for d in value.split(',') if d)
+    if len(distances) > MAX_DISTANCES:
+        raise ValueError('At most %d distances can be tabulated; %d is too many' % (MAX_DISTANCES, len(distances)))
+
+    output_format = single('format', erg_table_writers.DEFAULT_FORMAT)
+    if output_format not in erg_table_writers.FORMATS:
+        raise ValueError('Invalid format "%s" - must be one of %s' % (output_format, ', '.join(erg_table_writers.FORMATS)))
+
+    return (to_tenths(Split.split_display_string_to_seconds(high)), to_tenths(Split.split_display_string_to_seconds(low)),
+            to_tenths(increment), distances, output_format)
+
+
+class TableGrid(object):
+
+    def __init__(self, high = DEFAULT_GRID_HIGH, low = DEFAULT_GRID_LOW):
+        # Every split from high (slowest) to low (fastest) in tenths of a second, with its watts
+        self.high = to_tenths(Split.split_display_string_to_seconds(high))
+        self.low = to_tenths(Split.split_display_string_to_seconds(low))
+        self.table = SplitTable([tenths / 10 for tenths in range(self.high, self.low - 1, -1)])
+
+    def __len__(self):
+        return len(self.table)
+
+    def covers(self, high, low):
+        return self.low <= low <= self.high and self.low <= high <= self.high
+
+    def chunks(self, high, low, increment, distances = None, size = 4096):
+        # The table from high down to low (all in tenths) as a series of slices of at most size rows
+        if not self.covers(high, low):
+            raise ValueError('Splits from %s to %s are outside the grid (%s to %s)' % tuple(
+                Split._seconds_to_display_string(tenths / 10) for tenths in (high, low, self.high, self.low)))
+        start = self.high - high
+        stop = self.high - low + 1
+        for first in range(start, stop, size * increment):
+            yield self.table.slice(first, min(first + size * increment, stop), increment, distances)
+
+
+class ErgTableService(object):
+
+    def __init__(self, grid, cache_size = DEFAULT_CACHE_SIZE, workers = None):
+        self.grid = grid
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        # Tables being rendered, so concurrent requests for the same table share one rendering
+        self.pending = {}
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='render')
+        self.requests = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, key):
+        high, low, increment, distances, output_format = key
+        output = io.BytesIO()
+        erg_table_writers.write_table(self.grid.chunks(high, low, increment, distances), output, output_format, distances)
+        return output.getvalue()
+
+    async def table(self, key):
+        body = self.cache.get(key)
+        if body is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return body
+
+        self.misses += 1
+        future = self.pending.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, self.render, key)
+            future.add_done_callback(lambda f: self._rendered(key, f))
+            self.pending[key] = future
+        # A client that disconnects must not cancel the rendering for everyone else
+        return await asyncio.shield(future)
+
+    def _rendered(self, key, future):
+        del self.pending[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.cache[key] = future.result()
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        return {
+            'requests': self.requests,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'cached': len(self.cache),
+            'cached_bytes': sum(map(len, self.cache.values())),
+            'grid_rows': len(self.grid),
+        }
+
+    async def respond(self, method, target):
+        # Returns (status, content type, body)
+        url = urlsplit(target)
+        if url.path not in ('/table', '/stats'):
+            return 404, 'text/plain', b'Not found - try /table or /stats\n'
+        if method != 'GET':
+            return 405, 'text/plain', b'Only GET is supported\n'
+        if url.path == '/stats':
+            return 200, 'application/json', json.dumps(self.stats()).encode() + b'\n'
+
+        try:
+            key = normalize(url.query)
+            high, low = key[:2]
+            if not self.grid.covers(high, low):
+                raise ValueError('Splits must be between %s and %s' % (
+                    Split._seconds_to_display_string(self.grid.low / 10), Split._seconds_to_display_string(self.grid.high / 10)))
+        except ValueError as e:
+            return 400, 'text/plain', ('%s\n' % e).encode()
+        return 200, CONTENT_TYPES[key[-1]], await self.table(key)
+
+    async def handle(self, reader, writer):
+        # One connection - HTTP/1.1 requests are served until the client closes it or asks to
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                # Any body is discarded, so the next request on the connection starts in the right place
+                if headers.get('content-length', '0').isdigit() and int(headers.get('content-length', '0')):
+                    await reader.readexactly(int(headers['content-length']))
+
+                start = time.perf_counter()
+                parts = request_line.decode('latin-1').split()
+                if len(parts) == 3:
+                    method, target, version = parts
+                    status, content_type, body = await self.respond(method, target)
+                else:
+                    version = 'HTTP/1.0'
+                    status, content_type, body = 400, 'text/plain', b'Malformed request\n'
+                self.requests += 1
+
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                head = 'HTTP/1.1 %d %s\r\nContent-Type: %s\r\nContent-Length: %d\r\nConnection: %s\r\n\r\n' % (
+                    status, REASONS[status], content_type, len(body), 'keep-alive' if keep_alive else 'close')
+                writer.write(head.encode('latin-1') + body)
+                await writer.drain()
+                if logging.getLogger().isEnabledFor(logging.DEBUG):
+                    logging.debug('%s %d %d bytes in %0.2fms' % (request_line.decode('latin-1').strip(), status, len(body),
+                                                                (time.perf_counter() - start) * 1000))
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+            # ValueError is a request line or header longer than the stream limit
+            logging.debug('Connection dropped: %s' % e)
+        finally:
+            writer.close()
+
+    def close(self):
+        self.executor.shutdown()
+
+
+async def serve(service, host = DEFAULT_HOST, port = DEFAULT_PORT):
+    server = await asyncio.start_server(service.handle, host, port)
+    logging.info('Serving erg tables on %s' % ', '.join('%s:%d' % s.getsockname()[:2] for s in server.sockets))
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    configure_logging(args)
+
+    Split.verify_split(args.grid_high)
+    Split.verify_split(args.grid_low)
+    start = time.perf_counter()
+    grid = TableGrid(args.grid_high, args.grid_low)
+    logging.info('%d grid rows calculated in %0.3fs' % (len(grid), time.perf_counter() - start))
+
+    service = ErgTableService(grid, args.cache_size, args.workers)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
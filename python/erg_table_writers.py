@@ -0,0 +1,152 @@
+"""
+Writes erg tables (a series of SplitTable chunks) to a binary stream in one of several
+formats. Rows are encoded and written as each chunk is generated, so memory use does
+not depend on the size of the table.
+- text - the centred, fixed-width table
+- csv - the same columns, unpadded
+- json - an array of row objects, with the splits and times in seconds
+- markdown - a GitHub-flavoured Markdown table
+- binary - a columnar format (in the spirit of Parquet) of little-endian doubles:
+    b'ERGT', version (u8), column count (u16), then each column name (u16 length + UTF-8),
+    then row groups of a row count (u32) followed by each column's values,
+    and finally a row count of zero
+"""
+
+import json
+import struct
+import sys
+
+from array import array
+
+from Concept2Split import Split
+
+FORMATS = ('text', 'csv', 'json', 'markdown', 'binary')
+DEFAULT_FORMAT = 'text'
+BINARY_MAGIC = b'ERGT'
+BINARY_VERSION = 1
+
+
+def write_table(chunks, output, output_format = DEFAULT_FORMAT, distances = None):
+    # Writes the table chunks to a buffered binary stream (e.g. sys.stdout.buffer) -
+    # the distances label the time columns, as they were entered
+    if output_format not in FORMATS:
+        raise ValueError('Invalid format "%s" - must be one of %s' % (output_format, ', '.join(FORMATS)))
+
+    distances = list(distances) if distances else []
+    WRITERS[output_format](chunks, output, distances)
+    output.flush()
+
+
+def write_text(chunks, output, distances):
+    output.write(Split.get_header_row(distances).encode())
+    for table in chunks:
+        rows = '\n'.join(table.rows())
+        if rows:
+            output.write(b'\n' + rows.encode())
+    output.write(b'\n')
+
+
+def write_csv(chunks, output, distances):
+    output.write(_join(['Split', 'Watts'] + ['%sm' % d for d in distances], ',').encode())
+    for table in chunks:
+        for columns in _display_columns(table):
+            output.write(_join(columns, ',').encode())
+
+
+def write_markdown(chunks, output, distances):
+    headers = ['Split', 'Watts'] + ['%sm' % d for d in distances]
+    output.write(('| %s |\n' % ' | '.join(headers)).encode())
+    output.write(('|%s\n' % ('---:|' * len(headers))).encode())
+    for table in chunks:
+        for columns in _display_columns(table):
+            output.write(('| %s |\n' % ' | '.join(columns)).encode())
+
+
+def write_json(chunks, output, distances):
+    output.write(b'[')
+    separator = b'\n'
+    for table in chunks:
+        for index in range(len(table)):
+            row = {
+                'split': Split._seconds_to_display_string(table.splits[index]),
+                'seconds': table.splits[index],
+                'watts': table.watts[index],
+                'times': dict(('%d' % d, times[index]) for d, times in zip(table.distances, table.times)),
+            }
+            output.write(separator + json.dumps(row).encode())
+            separator = b',\n'
+    output.write(b'\n]\n')
+
+
+def write_binary(chunks, output, distances):
+    names = ['seconds', 'watts'] + ['%sm' % d for d in distances]
+    output.write(BINARY_MAGIC + struct.pack('<BH', BINARY_VERSION, len(names)))
+    for name in names:
+        encoded = name.encode()
+        output.write(struct.pack('<H', len(encoded)) + encoded)
+
+    for table in chunks:
+        if not len(table):
+            continue
+        output.write(struct.pack('<I', len(table)))
+        for column in [table.splits, table.watts] + list(table.times):
+            output.write(_little_endian(column))
+    output.write(struct.pack('<I', 0))
+
+
+def read_binary(stream):
+    # Returns the column names and yields each row (as a tuple of floats) of a binary table
+    magic = stream.read(4)
+    if magic != BINARY_MAGIC:
+        raise ValueError('Not a binary erg table')
+    version, count = struct.unpack('<BH', stream.read(3))
+    if version != BINARY_VERSION:
+        raise ValueError('Unsupported binary erg table version %d' % version)
+    names = []
+    for _ in range(count):
+        length, = struct.unpack('<H', stream.read(2))
+        names.append(stream.read(length).decode())
+    return names, _binary_rows(stream, count)
+
+
+def _binary_rows(stream, count):
+    while True:
+        rows, = struct.unpack('<I', stream.read(4))
+        if not rows:
+            return
+        columns = []
+        for _ in range(count):
+            column = array('d')
+            column.frombytes(stream.read(rows * column.itemsize))
+            if sys.byteorder == 'big':
+                column.byteswap()
+            columns.append(column)
+        yield from zip(*columns)
+
+
+def _display_columns(table):
+    display = Split._seconds_to_display_string
+    for index in range(len(table)):
+        columns = [display(table.splits[index]), str(table.watts[index])]
+        columns.extend(display(times[index]) for times in table.times)
+        yield columns
+
+
+def _join(columns, separator):
+    return separator.join(columns) + '\n'
+
+
+def _little_endian(column):
+    if sys.byteorder == 'big':
+        column = array('d', column)
+        column.byteswap()
+    return column.tobytes()
+
+
+WRITERS = {
+    'text': write_text,
+    'csv': write_csv,
+    'json': write_json,
+    'markdown': write_markdown,
+    'binary': write_binary,
+}
@@ -0,0 +1,104 @@
+"""
+A cache of prime factorizations. Recently used factorizations are held in memory,
+with the least recently used evicted once the cache is full, and can optionally be
+persisted to a local SQLite database so that they survive between runs.
+Each entry is the complete list of prime factors, so a prime p is stored as [p].
+"""
+
+from collections import OrderedDict
+
+DEFAULT_MAX_SIZE = 1 << 16
+# Writes to the persistent store are committed in batches of this size
+COMMIT_INTERVAL = 1000
+
+
+class FactorCache(object):
+
+    def __init__(self, max_size = DEFAULT_MAX_SIZE, path = None):
+        if max_size < 1:
+            raise ValueError('The cache size must be at least 1; %d is invalid' % max_size)
+
+        self.max_size = max_size
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._uncommitted = 0
+        self._db = None
+        if path:
+            # Only imported when persisting, as it is slow to import
+            import sqlite3
+
+            # Numbers (and factors) may exceed SQLite's 64-bit integers so they are stored as text
+            self._db = sqlite3.connect(path)
+            self._db.execute('CREATE TABLE IF NOT EXISTS factors (number TEXT PRIMARY KEY, factors TEXT NOT NULL)')
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, number):
+        return number in self._entries
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get(self, number, count_miss = True):
+        # Returns the prime factors of the number, or None if it is not in the cache.
+        # A speculative lookup (e.g. of a cofactor mid-factoring) is not counted as a miss.
+        factors = self._entries.get(number)
+        if factors is not None:
+            self._entries.move_to_end(number)
+            self.hits += 1
+            return factors
+
+        if self._db is not None:
+            row = self._db.execute('SELECT factors FROM factors WHERE number = ?', (str(number),)).fetchone()
+            if row:
+                factors = tuple(map(int, row[0].split()))
+                self._remember(number, factors)
+                self.hits += 1
+                return factors
+
+        if count_miss:
+            self.misses += 1
+        return None
+
+    def put(self, number, factors):
+        factors = tuple(factors)
+        self._remember(number, factors)
+        if self._db is not None:
+            self._db.execute('INSERT OR REPLACE INTO factors VALUES (?, ?)', (str(number), ' '.join(map(str, factors))))
+            self._uncommitted += 1
+            if self._uncommitted >= COMMIT_INTERVAL:
+                self.commit()
+
+    def commit(self):
+        if self._db is not None and self._uncommitted:
+            self._db.commit()
+            self._uncommitted = 0
+
+    def close(self):
+        if self._db is not None:
+            self.commit()
+            self._db.close()
+            self._db = None
+
+    def stats(self):
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def _remember(self, number, factors):
+        self._entries[number] = factors
+        self._entries.move_to_end(number)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
@@ -2,26 +2,43 @@
 
 """
 Calculates the factorial of a non-negative integer. The algorithm uses a for-loop.
+Faster algorithms (binary splitting and prime swing) can be chosen for large numbers.
 """
 
 import argparse
 import logging
+import sys
 
+import fast_factorial
+import worker_client
 
+METHODS = ('loop', 'split', 'swing')
+DEFAULT_METHOD = 'loop'
 
-def parse_args():
+
+def parse_args(argv = None):
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument('number', type=int)
+    parser.add_argument(
+        '-m', '--method',
+        help='Algorithm: a for-loop, binary splitting or prime swing [' + DEFAULT_METHOD + ']',
+        choices=METHODS,
+        default=DEFAULT_METHOD)
+    parser.add_argument(
+        '--no-daemon',
+        help='Calculate in this process even if the worker daemon is running',
+        action='store_true')
     parser.add_argument('-q', '--quiet', help='Quiet mode', action='store_true')
     parser.add_argument('-v', '--verbose', help='Verbose mode', action='store_true')
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
 def configure_logging(args):
-    log_level = logging.INFO
+    # Quiet mode needs no configuration - by default warnings and errors are written to stderr
     if args.quiet:
-        log_level = logging.WARNING
-    elif args.verbose:
+        return
+    log_level = logging.INFO
+    if args.verbose:
         log_level = logging.DEBUG
 
     logging.basicConfig(level=log_level, format='%(levelname)s: %(message)s')
@@ -32,17 +49,49 @@ def factorial(n):
         logging.error('Cannot calculate factorial of a negative number!')
         raise ValueError('Invalid value %d - n must be positive' % n)
 
+    # Formatting the partial product is quadratic in n, so only do it if it will be logged
+    debug = logging.getLogger().isEnabledFor(logging.DEBUG)
     result = 1
     for i in range(1, n + 1):
         result *= i
-        logging.debug('Calculated factorial of %d: %d' % (i, result))
+        if debug:
+            logging.debug('Calculated factorial of %d: %d' % (i, result))
 
     return result
 
 
-if __name__ == '__main__':
-    args = parse_args()
+def factorial_by_method(n, method = DEFAULT_METHOD):
+    if method == 'loop':
+        return factorial(n)
+    elif method == 'split':
+        return fast_factorial.binary_split_factorial(n)
+    elif method == 'swing':
+        return fast_factorial.prime_swing_factorial(n)
+    raise ValueError('Invalid method "%s" - must be one of %s' % (method, ', '.join(METHODS)))
+
+
+def daemon_factorial(n, method = DEFAULT_METHOD):
+    # The decimal digits of n! from the worker daemon (see worker_daemon.py), or None if it is not running
+    response = worker_client.request({'op': 'factorial', 'number': n, 'method': method})
+    if response is None or not response.get('ok'):
+        return None
+    logging.debug('%d! was calculated by the worker daemon' % n)
+    return response['result']
+
+
+def main(argv = None):
+    args = parse_args(argv)
     configure_logging(args)
 
-    answer = factorial(args.number)
-    print('%d! = %d' % (args.number, answer))
+    # Large factorials have more digits than Python converts to a string by default
+    if hasattr(sys, 'set_int_max_str_digits'):
+        sys.set_int_max_str_digits(0)
+
+    answer = None if args.no_daemon else daemon_factorial(args.number, args.method)
+    if answer is None:
+        answer = '%d' % factorial_by_method(args.number, args.method)
+    print('%d! = %s' % (args.number, answer))
+
+
+if __name__ == '__main__':
+    main()
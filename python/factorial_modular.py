@@ -0,0 +1,146 @@
+"""
+Properties of n! that are needed far more often than n! itself, calculated without
+ever materializing the (enormous) factorial:
+- n! mod m, using Wilson's theorem when m is prime and n is close to m
+- binomial coefficients, optionally mod m (Lucas' theorem when m is prime)
+- the number of trailing zeros of n! in any base, by Legendre's formula
+- the number of decimal digits of n!, from the log-gamma function
+"""
+
+import math
+
+from decimal import Decimal, localcontext
+
+import prime_engine
+
+# Below this n the number of digits is counted exactly
+EXACT_DIGITS_LIMIT = 20
+# pi to 50 decimal places, for the Stirling series
+PI = Decimal('3.14159265358979323846264338327950288419716939937510')
+
+
+def verify_n(n):
+    if n < 0:
+        raise ValueError('Invalid value %d - n must be positive' % n)
+
+
+def verify_modulus(m):
+    if m < 1:
+        raise ValueError('Invalid modulus %d - m must be at least 1' % m)
+
+
+def factorial_mod(n, m):
+    verify_n(n)
+    verify_modulus(m)
+
+    # m divides n! once n reaches m
+    if n >= m:
+        return 0
+
+    # Wilson's theorem - (p - 1)! = -1 (mod p), so n! = -1 / ((n + 1) * ... * (p - 1)) (mod p)
+    if m - 1 - n < n and prime_engine.is_prime(m):
+        denominator = 1
+        for i in range(n + 1, m):
+            denominator = denominator * i % m
+        return -pow(denominator, -1, m) % m
+
+    result = 1 % m
+    for i in range(2, n + 1):
+        result = result * i % m
+    return result
+
+
+def binomial(n, k, m = None):
+    verify_n(n)
+    if k < 0 or k > n:
+        return 0
+    if m is None:
+        return math.comb(n, k)
+
+    verify_modulus(m)
+    if prime_engine.is_prime(m):
+        return _lucas_binomial(n, k, m)
+
+    # The exponent of each prime in n! / (k! (n - k)!) follows from Legendre's formula. The primes are sieved
+    # a segment at a time, so the shared sieve only grows to the square root of n
+    result = 1 % m
+    for p in prime_engine.primes_in_range(2, n + 1):
+        exponent = legendre(n, p) - legendre(k, p) - legendre(n - k, p)
+        if exponent:
+            result = result * pow(p, exponent, m) % m
+    return result
+
+
+def legendre(n, p):
+    # The exponent of the prime p in n!
+    exponent = 0
+    while n:
+        n //= p
+        exponent += n
+    return exponent
+
+
+def factorial_trailing_zeros(n, base = 10):
+    verify_n(n)
+    if base < 2:
+        raise ValueError('Invalid base %d - the base must be at least 2' % base)
+
+    # Each trailing zero needs every prime power p^e of the base to divide n! once more
+    zeros = None
+    remainder = base
+    for p in prime_engine.primes():
+        if p * p > remainder:
+            break
+        exponent = 0
+        while remainder % p == 0:
+            remainder //= p
+            exponent += 1
+        if exponent:
+            zeros = _min_zeros(zeros, legendre(n, p) // exponent)
+    if remainder > 1:
+        zeros = _min_zeros(zeros, legendre(n, remainder))
+    return zeros
+
+
+def factorial_digits(n):
+    verify_n(n)
+    if n < EXACT_DIGITS_LIMIT:
+        return len(str(math.factorial(n)))
+    return int(_log10_gamma(n + 1)) + 1
+
+
+def _min_zeros(zeros, candidate):
+    return candidate if zeros is None else min(zeros, candidate)
+
+
+def _lucas_binomial(n, k, p):
+    # Lucas' theorem - C(n, k) is the product of the binomials of the base p digits of n and k
+    result = 1
+    while k:
+        n_digit, k_digit = n % p, k % p
+        if k_digit > n_digit:
+            return 0
+        result = result * _small_binomial_mod(n_digit, k_digit, p) % p
+        n //= p
+        k //= p
+    return result
+
+
+def _small_binomial_mod(n, k, p):
+    # C(n, k) mod p for n < p, so the denominator is invertible
+    k = min(k, n - k)
+    numerator = denominator = 1
+    for i in range(k):
+        numerator = numerator * (n - i) % p
+        denominator = denominator * (i + 1) % p
+    return numerator * pow(denominator, -1, p) % p
+
+
+def _log10_gamma(x):
+    # log10(gamma(x)) from the Stirling series, with enough precision to count digits exactly
+    with localcontext() as context:
+        context.prec = 40 + len(str(x))
+        x = Decimal(x)
+        ln_gamma = (x - Decimal('0.5')) * x.ln() - x + (2 * PI).ln() / 2
+        ln_gamma += 1 / (12 * x) - 1 / (360 * x ** 3) + 1 / (1260 * x ** 5) - 1 / (1680 * x ** 7)
+        return ln_gamma / Decimal(10).ln()
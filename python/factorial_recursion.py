@@ -1,11 +1,23 @@
 #!/usr/bin/env python3
 
 """
-Calculates the factorial of a non-negative integer. The algorithm uses a for-loop.
+Calculates the factorial of a non-negative integer. The algorithm uses recursion.
+The recursion is trampolined - each step returns the next call rather than making it -
+so that n is not limited by the depth of the stack. Calculated factorials are
+remembered, so that a query for n + 1 after n costs a single multiplication.
 """
 
 import argparse
+import bisect
+import sys
 
+from collections import OrderedDict
+
+# The most factorials remembered at once - the least recently used are forgotten first
+MEMO_SIZE = 64
+
+_memo = OrderedDict({0: 1, 1: 1})
+_memo_keys = [0, 1]
 
 
 def parse_args():
@@ -14,19 +26,58 @@ def parse_args():
     return parser.parse_args()
 
 
+def trampoline(result):
+    # Keep calling the returned steps until one of them returns a value
+    while callable(result):
+        result = result()
+    return result
+
+
+def _factorial_step(n, k, accumulator):
+    # n! = accumulator * n * (n - 1) * ... * (k + 1) * k!, where k! is remembered
+    if n == k:
+        return accumulator * _memo[k]
+    return lambda: _factorial_step(n - 1, k, accumulator * n)
+
+
 def factorial(n):
     if n < 0:
         raise ValueError('Invalid value %d - n must be positive' % n)
 
-    if n ==0:
-        return 1
-    elif n == 1:
-        return 1
-    else:
-        return n * factorial(n - 1)
+    if n in _memo:
+        _memo.move_to_end(n)
+        return _memo[n]
+
+    # Start from the largest remembered factorial below n
+    k = _memo_keys[bisect.bisect_right(_memo_keys, n) - 1]
+    _memo.move_to_end(k)
+    result = trampoline(_factorial_step(n, k, 1))
+    _remember(n, result)
+    return result
+
+
+def clear_memo():
+    _memo.clear()
+    _memo.update({0: 1, 1: 1})
+    _memo_keys[:] = [0, 1]
+
+
+def _remember(n, result):
+    _memo[n] = result
+    bisect.insort(_memo_keys, n)
+    if len(_memo) > MEMO_SIZE:
+        # 0! and 1! are always remembered - forget the least recently used of the rest
+        oldest = next(key for key in _memo if key > 1)
+        del _memo[oldest]
+        _memo_keys.remove(oldest)
+
 
 if __name__ == '__main__':
     args = parse_args()
 
+    # Large factorials have more digits than Python converts to a string by default
+    if hasattr(sys, 'set_int_max_str_digits'):
+        sys.set_int_max_str_digits(0)
+
     answer = factorial(args.number)
     print('%d! = %d' % (args.number, answer))
@@ -0,0 +1,143 @@
+"""
+The prime factorization of a positive integer, held as (prime, exponent) pairs in
+increasing order of the primes - 2^1000 is one pair rather than a thousand factors.
+The flat tuple of factors (e.g. (2, 2, 2, 3, 3, 5) for 360) is still available.
+
+Everything derived from a factorization - the number itself, its divisors, the number
+and sum of the divisors, Euler's totient, the gcd, lcm and product of factorizations -
+is calculated from the exponents, so the number is never factored again.
+
+A factorization renders as e.g. "2^3 * 3^2 * 5", optionally coloured. The colour codes
+are looked up (and colorama initialised) only once, the first time they are needed.
+"""
+
+import math
+
+from collections import Counter
+
+NO_COLOURS = ('', '', '', '')
+# (prime, exponent, caret, reset) codes once colorama has been initialised
+_colours = None
+
+
+def colour_codes():
+    global _colours
+    if _colours is None:
+        # Only imported when colour is needed
+        import colorama
+
+        colorama.init(autoreset=True)
+        _colours = (colorama.Fore.GREEN, colorama.Fore.CYAN, colorama.Style.BRIGHT, colorama.Style.RESET_ALL)
+    return _colours
+
+
+class Factorization(object):
+
+    __slots__ = ('pairs', '_number')
+
+    def __init__(self, pairs = ()):
+        # The pairs are merged and sorted - the primes are not verified to be prime
+        exponents = {}
+        for prime, exponent in pairs:
+            if prime < 2 or exponent < 0:
+                raise ValueError('Invalid prime power %d^%d' % (prime, exponent))
+            if exponent:
+                exponents[prime] = exponents.get(prime, 0) + exponent
+        # Immutable - attributes can only be set here, bypassing __setattr__
+        object.__setattr__(self, 'pairs', tuple(sorted(exponents.items())))
+        object.__setattr__(self, '_number', None)
+
+    @classmethod
+    def from_factors(cls, factors):
+        # From a flat sequence of prime factors, e.g. (2, 2, 2, 3, 3, 5)
+        return cls(Counter(factors).items())
+
+    def __setattr__(self, name, value):
+        raise AttributeError('A Factorization is immutable - cannot set "%s"' % name)
+
+    def __reduce__(self):
+        return (Factorization, (self.pairs,))
+
+    def __repr__(self):
+        return 'Factorization(%d = %s)' % (self.number, self.render() or '1')
+
+    def __str__(self):
+        return self.render()
+
+    def __eq__(self, other):
+        if not isinstance(other, Factorization):
+            return NotImplemented
+        return self.pairs == other.pairs
+
+    def __hash__(self):
+        return hash(self.pairs)
+
+    def __iter__(self):
+        return iter(self.pairs)
+
+    def __len__(self):
+        # The number of distinct primes
+        return len(self.pairs)
+
+    def __mul__(self, other):
+        if not isinstance(other, Factorization):
+            return NotImplemented
+        return Factorization(self.pairs + other.pairs)
+
+    def __pow__(self, power):
+        if not isinstance(power, int) or power < 0:
+            return NotImplemented
+        return Factorization((prime, exponent * power) for prime, exponent in self.pairs)
+
+    @property
+    def number(self):
+        if self._number is None:
+            object.__setattr__(self, '_number', math.prod(prime ** exponent for prime, exponent in self.pairs))
+        return self._number
+
+    @property
+    def factors(self):
+        # The flat tuple of prime factors, in increasing order
+        return tuple(prime for prime, exponent in self.pairs for _ in range(exponent))
+
+    @property
+    def is_prime(self):
+        return len(self.pairs) == 1 and self.pairs[0][1] == 1
+
+    def divisor_count(self):
+        return math.prod(exponent + 1 for _, exponent in self.pairs)
+
+    def divisor_sum(self, k = 1):
+        # sigma_k - the sum of the kth powers of the divisors
+        if k == 0:
+            return self.divisor_count()
+        return math.prod((prime ** (k * (exponent + 1)) - 1) // (prime ** k - 1) for prime, exponent in self.pairs)
+
+    def totient(self):
+        return math.prod(prime ** (exponent - 1) * (prime - 1) for prime, exponent in self.pairs)
+
+    def divisors(self):
+        # Every divisor, in increasing order
+        divisors = [1]
+        for prime, exponent in self.pairs:
+            powers = [prime ** e for e in range(1, exponent + 1)]
+            divisors += [divisor * power for divisor in divisors for power in powers]
+        return sorted(divisors)
+
+    def gcd(self, other):
+        exponents = dict(other.pairs)
+        return Factorization((prime, min(exponent, exponents[prime])) for prime, exponent in self.pairs if prime in exponents)
+
+    def lcm(self, other):
+        exponents = dict(self.pairs)
+        for prime, exponent in other.pairs:
+            exponents[prime] = max(exponent, exponents.get(prime, 0))
+        return Factorization(exponents.items())
+
+    def render(self, colour = False):
+        # e.g. "2^3 * 3^2 * 5" - formatted in one pass and joined once
+        prime_colour, exponent_colour, caret_colour, reset = colour_codes() if colour else NO_COLOURS
+        prime_format = prime_colour + '%d' + reset
+        power_format = prime_format + caret_colour + '^' + reset + exponent_colour + '%d' + reset
+        return ' * '.join(prime_format % prime if exponent == 1 else power_format % (prime, exponent)
+                          for prime, exponent in self.pairs)
@@ -0,0 +1,68 @@
+"""
+Fast factorials of large integers. Multiplying 1..n one at a time spends almost all of
+its time multiplying a huge partial product by a small number; these algorithms instead
+multiply numbers of similar size together.
+- Binary splitting - the product of a range is the product of the products of its halves.
+- Prime swing (Luschny) - n! = (floor(n/2)!)^2 * swing(n), where the 'swing' is the
+  product of a few prime powers read directly from a prime sieve.
+"""
+
+import prime_engine
+
+# Ranges (and lists) shorter than this are multiplied directly
+SPLIT_THRESHOLD = 32
+
+
+def product_range(low, high):
+    # The product of the integers in [low, high), by binary splitting
+    if high - low <= SPLIT_THRESHOLD:
+        result = 1
+        for i in range(low, high):
+            result *= i
+        return result
+    mid = (low + high) // 2
+    return product_range(low, mid) * product_range(mid, high)
+
+
+def product(values, low = 0, high = None):
+    # The product of a list of integers, by binary splitting
+    if high is None:
+        high = len(values)
+    if high - low <= SPLIT_THRESHOLD:
+        result = 1
+        for i in range(low, high):
+            result *= values[i]
+        return result
+    mid = (low + high) // 2
+    return product(values, low, mid) * product(values, mid, high)
+
+
+def verify_n(n):
+    if n < 0:
+        raise ValueError('Invalid value %d - n must be positive' % n)
+
+
+def binary_split_factorial(n):
+    verify_n(n)
+    return product_range(2, n + 1)
+
+
+def swing(n):
+    # n! / (floor(n/2)!)^2 - the exponent of each prime p is the number of odd values of floor(n/p^k)
+    prime_powers = []
+    for p in prime_engine.primes(stop = n + 1):
+        q = n
+        exponent = 0
+        while q >= p:
+            q //= p
+            exponent += q & 1
+        if exponent:
+            prime_powers.append(p if exponent == 1 else p ** exponent)
+    return product(prime_powers)
+
+
+def prime_swing_factorial(n):
+    verify_n(n)
+    if n < 2:
+        return 1
+    return prime_swing_factorial(n // 2) ** 2 * swing(n)
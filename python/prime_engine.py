@@ -0,0 +1,277 @@
+"""
+A reusable prime engine. Primes are held in a segmented Sieve of Eratosthenes - a
+bytearray of flags (1 = prime) that is extended lazily, one segment at a time, as
+larger primes are requested. Each segment is sieved using the primes already found,
+so no candidate is ever re-tested once the sieve has covered it.
+Numbers beyond the sieve are tested with Miller-Rabin (deterministic below 2^64,
+probabilistic above) and composites are split with Brent's variant of Pollard's rho.
+
+Primes are counted without listing them - prime_pi(x) uses Lucy_Hedgehog's method in
+O(x^(3/4)) time and O(sqrt(x)) memory. The nth prime is estimated from the inverse of
+the logarithmic integral, the primes up to the estimate are counted and the segmented
+sieve finishes the walk to the nth prime. primes_in_range(start, stop) sieves any range
+a segment at a time, holding only the primes up to sqrt(stop) and one segment.
+"""
+
+import math
+import random
+
+from itertools import compress, islice
+from math import gcd, isqrt
+
+INITIAL_LIMIT = 1 << 16   # the first segment is sieved in one pass
+SEGMENT_SIZE = 1 << 16    # subsequent segments are sieved this many numbers at a time
+
+# Testing against these bases is sufficient to prove primality of any number below 2^64
+DETERMINISTIC_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+DETERMINISTIC_LIMIT = 1 << 64
+# Beyond 2^64 each random base wrongly passes a composite with probability at most 1/4
+PROBABILISTIC_ROUNDS = 24
+# Pollard's rho - number of products accumulated before each gcd
+RHO_BATCH_SIZE = 128
+
+
+class PrimeSieve(object):
+
+    def __init__(self, limit = INITIAL_LIMIT):
+        # 0 and 1 are not prime; everything else is assumed prime until crossed off
+        self._flags = bytearray([0, 0]) + bytearray([1]) * (INITIAL_LIMIT - 2)
+        for p in range(2, isqrt(INITIAL_LIMIT - 1) + 1):
+            if self._flags[p]:
+                self._flags[p * p::p] = bytes(len(range(p * p, INITIAL_LIMIT, p)))
+        self.extend(limit)
+
+    def __len__(self):
+        return len(self._flags)
+
+    @property
+    def limit(self):
+        # All numbers below the limit have been sieved
+        return len(self._flags)
+
+    def extend(self, limit):
+        # Grow the sieve, one segment at a time, until it covers every number below the limit
+        while len(self._flags) < limit:
+            low = len(self._flags)
+            high = min(limit, low + SEGMENT_SIZE)
+            segment = bytearray([1]) * (high - low)
+            for p in compress(range(isqrt(high - 1) + 1), self._flags):
+                start = max(p * p, -(-low // p) * p)
+                segment[start - low::p] = bytes(len(range(start, high, p)))
+            self._flags += segment
+
+    def count(self, stop):
+        # The number of primes below stop, which must be within the sieve
+        return self._flags.count(1, 0, stop)
+
+    def is_prime(self, number):
+        if number < 2:
+            return False
+        if number < len(self._flags):
+            return bool(self._flags[number])
+
+        # Beyond the sieve - trial divide by the sieved primes up to the square root
+        for p in self.primes(stop = isqrt(number) + 1):
+            if number % p == 0:
+                return False
+        return True
+
+    def primes(self, start = 2, stop = None):
+        # Yields the primes in [start, stop), or every prime from start if there is no stop
+        low = max(start, 2)
+        while stop is None or low < stop:
+            high = low + SEGMENT_SIZE if stop is None else min(stop, low + SEGMENT_SIZE)
+            self.extend(high)
+            yield from compress(range(low, high), self._flags[low:high])
+            low = high
+
+
+# A sieve shared by every caller in the process, so it is only ever built once
+DEFAULT_SIEVE = PrimeSieve()
+
+
+def is_prime(number):
+    if number < DEFAULT_SIEVE.limit:
+        return DEFAULT_SIEVE.is_prime(number)
+    return miller_rabin(number)
+
+
+def miller_rabin(number, rounds = PROBABILISTIC_ROUNDS):
+    if number < 2:
+        return False
+    for p in DETERMINISTIC_BASES:
+        if number % p == 0:
+            return number == p
+
+    # Write number - 1 as d * 2^s with d odd
+    d = number - 1
+    s = 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    if number < DETERMINISTIC_LIMIT:
+        bases = DETERMINISTIC_BASES
+    else:
+        bases = [random.randrange(2, number - 1) for _ in range(rounds)]
+
+    for a in bases:
+        x = pow(a, d, number)
+        if x == 1 or x == number - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % number
+            if x == number - 1:
+                break
+        else:
+            # a is a witness to the compositeness of number
+            return False
+    return True
+
+
+def pollard_brent(number):
+    # Returns a non-trivial factor of a composite number (the result is undefined for a prime)
+    if number % 2 == 0:
+        return 2
+
+    while True:
+        y = random.randrange(1, number)
+        c = random.randrange(1, number)
+        g = r = q = 1
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % number
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(RHO_BATCH_SIZE, r - k)):
+                    y = (y * y + c) % number
+                    q = q * abs(x - y) % number
+                g = gcd(q, number)
+                k += RHO_BATCH_SIZE
+            r *= 2
+
+        if g == number:
+            # The batched gcd overshot - step back through the last batch one term at a time
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % number
+                g = gcd(abs(x - ys), number)
+
+        # A failed cycle (g == number) is retried with a new polynomial
+        if g != number:
+            return g
+
+
+def primes(start = 2, stop = None):
+    return DEFAULT_SIEVE.primes(start, stop)
+
+
+def primes_in_range(start, stop):
+    # Yields the primes in [start, stop) - a range beyond the shared sieve is sieved a segment at a time
+    if stop <= DEFAULT_SIEVE.limit:
+        yield from DEFAULT_SIEVE.primes(start, stop)
+        return
+
+    base_primes = list(DEFAULT_SIEVE.primes(stop = isqrt(stop - 1) + 1))
+    # Segments at least as long as the largest base prime, so each prime marks at least once per segment
+    size = max(SEGMENT_SIZE, base_primes[-1])
+    low = max(start, 2)
+    while low < stop:
+        high = min(stop, low + size)
+        if high <= DEFAULT_SIEVE.limit:
+            yield from DEFAULT_SIEVE.primes(low, high)
+        else:
+            segment = bytearray([1]) * (high - low)
+            for p in base_primes:
+                if p * p >= high:
+                    break
+                first = max(p * p, -(-low // p) * p)
+                segment[first - low::p] = bytes(len(range(first, high, p)))
+            yield from compress(range(low, high), segment)
+        low = high
+
+
+def prime_pi(x):
+    # The number of primes <= x, by Lucy_Hedgehog's method
+    if x < DEFAULT_SIEVE.limit:
+        return DEFAULT_SIEVE.count(max(x + 1, 0))
+
+    # small[v] = pi(v) for v <= sqrt(x) and large[i] = pi(x // i), starting from the count of 2..v
+    # and sieving each prime p out of them in turn: pi(v) -= pi(v // p) - pi(p - 1)
+    r = isqrt(x)
+    small = [max(v - 1, 0) for v in range(r + 1)]
+    large = [0] + [x // i - 1 for i in range(1, r + 1)]
+    for p in range(2, r + 1):
+        if small[p] == small[p - 1]:
+            continue
+        sp = small[p - 1]
+        # Only the values >= p^2 change, and every update reads the values from before this prime
+        p2 = p * p
+        lim = min(r, x // p2)
+        direct = min(lim, r // p)
+        large[1:direct + 1] = [a - b + sp for a, b in zip(large[1:direct + 1], large[p:direct * p + 1:p])]
+        if lim > direct:
+            q = x // p
+            large[direct + 1:lim + 1] = [a - small[q // i] + sp for i, a in zip(range(direct + 1, lim + 1), large[direct + 1:lim + 1])]
+        if r >= p2:
+            small[p2:] = [a - small[v // p] + sp for v, a in zip(range(p2, r + 1), small[p2:])]
+    return large[1]
+
+
+def logarithmic_integral(x):
+    # li(x), by Ramanujan's series
+    log_x = math.log(x)
+    total = 0.0
+    term = -1.0
+    inner = 0.0
+    for n in range(1, 200):
+        term *= -log_x / n
+        if n % 2:
+            inner += 1.0 / n
+        delta = term / (1 << (n - 1)) * inner
+        total += delta
+        if abs(delta) < 1e-15 * abs(total):
+            break
+    return 0.5772156649015329 + math.log(log_x) + math.sqrt(x) * total
+
+
+def nth_prime(n):
+    # The nth prime (the first is 2)
+    if n < 1:
+        raise ValueError('There is no prime number %d' % n)
+    if n <= DEFAULT_SIEVE.count(DEFAULT_SIEVE.limit):
+        return next(islice(DEFAULT_SIEVE.primes(), n - 1, None))
+
+    # Solve li(x) = n by Newton's method - li'(x) = 1 / log(x) - the error is around sqrt(x)
+    x = n * math.log(n)
+    for _ in range(100):
+        step = (logarithmic_integral(x) - n) * math.log(x)
+        x -= step
+        if abs(step) < 1:
+            break
+    estimate = int(x)
+
+    count = prime_pi(estimate)
+    if count < n:
+        # Count on from the estimate
+        low = estimate + 1
+        while True:
+            high = low + SEGMENT_SIZE * 16
+            for p in primes_in_range(low, high):
+                count += 1
+                if count == n:
+                    return p
+            low = high
+
+    # Count back from the estimate - the nth prime is the (count - n)th prime below the highest
+    excess = count - n
+    high = estimate + 1
+    while True:
+        low = max(2, high - SEGMENT_SIZE * 16)
+        found = list(primes_in_range(low, high))
+        if excess < len(found):
+            return found[-1 - excess]
+        excess -= len(found)
+        high = low
@@ -1,115 +1,379 @@
 #!/usr/bin/env python3
 
 """
-Outputs the prime factors of a positive integer.
+Outputs the prime factors of a positive integer. Alternatively, factors a stream of
+newline-delimited integers read from a file (or stdin) and writes one result per line.
 """
 
 import argparse
-import colorama
+import csv
+import json
 import logging
+import os
 import sys
 
-from colorama import Fore, Style
+from collections import deque
 
+import prime_engine
+import worker_client
 
+from factor_cache import DEFAULT_MAX_SIZE, FactorCache
+from factorization import Factorization
 
-def parse_args():
+METHODS = ('trial', 'rho', 'auto')
+DEFAULT_METHOD = 'auto'
+# The auto method trial divides by the primes below this limit before switching to Pollard's rho
+AUTO_TRIAL_DIVISION_LIMIT = 1 << 12
+# Output formats when factoring a stream of numbers
+FORMATS = ('plain', 'jsonl', 'csv')
+DEFAULT_FORMAT = 'plain'
+# Parallel factoring - numbers are sent to a worker in chunks whose estimated cost reaches the budget,
+# so that a chunk of tiny numbers is large enough to outweigh the inter-process overhead
+CHUNK_COST_BUDGET = 1 << 12
+MAX_CHUNK_SIZE = 1 << 12
+# Chunks in flight per worker - bounds memory however long the input is
+CHUNKS_PER_WORKER = 4
+
+
+def parse_args(argv = None):
     parser = argparse.ArgumentParser(description=__doc__)
-    parser.add_argument('number', type=int)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('number', type=int, nargs='?')
+    source.add_argument(
+        '-i', '--input',
+        metavar='FILE',
+        help='Factor the newline-delimited integers in this file ("-" for stdin)',
+        type=argparse.FileType('r'))
+    parser.add_argument(
+        '-f', '--format',
+        help='Output format when factoring a file [' + DEFAULT_FORMAT + ']',
+        choices=FORMATS,
+        default=DEFAULT_FORMAT)
+    parser.add_argument(
+        '-m', '--method',
+        help='Factoring method: trial division, Pollard\'s rho or trial division of small primes then rho [' + DEFAULT_METHOD + ']',
+        choices=METHODS,
+        default=DEFAULT_METHOD)
+    parser.add_argument(
+        '-w', '--workers',
+        metavar='N',
+        help='Number of worker processes when factoring a file [1]',
+        type=int,
+        default=1)
+    parser.add_argument(
+        '-u', '--unordered',
+        help='Write the results for a file as they complete rather than in input order (needs --workers > 1)',
+        action='store_true')
+    parser.add_argument(
+        '-c', '--cache-file',
+        metavar='FILE',
+        help='Persist factorizations in this SQLite database so that they are reused by later runs',
+        default=None)
+    parser.add_argument(
+        '--cache-size',
+        metavar='N',
+        help='Number of factorizations held in memory [' + str(DEFAULT_MAX_SIZE) + ']',
+        type=int,
+        default=DEFAULT_MAX_SIZE)
+    parser.add_argument(
+        '--no-cache',
+        help='Do not cache factorizations',
+        action='store_true')
+    parser.add_argument(
+        '--no-daemon',
+        help='Factor a number in this process even if the worker daemon is running (a cache file is always used here)',
+        action='store_true')
     parser.add_argument('-q', '--quiet', help='Quiet mode', action='store_true')
     parser.add_argument('-v', '--verbose', help='Verbose mode', action='store_true')
-    return parser.parse_args()
+    args = parser.parse_args(argv)
+    if args.unordered and args.workers <= 1:
+        parser.error('--unordered only applies with more than one worker')
+    if args.cache_size < 1:
+        parser.error('the cache size must be at least 1 (use --no-cache to disable it); %d is invalid' % args.cache_size)
+    return args
 
 
 def configure_logging(local_args):
-    log_level = logging.INFO
+    # Quiet mode needs no configuration - by default warnings and errors are written to stderr
     if local_args.quiet:
-        log_level = logging.WARNING
-    elif local_args.verbose:
+        return
+    log_level = logging.INFO
+    if local_args.verbose:
         log_level = logging.DEBUG
 
     logging.basicConfig(level=log_level, format='%(levelname)s: %(message)s')
 
 
 def is_prime(number):
-    factor = 2
-    # Commutativity - keep incrementing potential factors until the square root is reached
-    while factor < number and pow(factor, 2) <= number:
-        if number % factor == 0:
-            return False
-        factor += 1
-    return True
-
-
-def prime_factors(number):
-    logging.debug('Calculating prime factors for %d' % number)
-    factors_set = ()
+    return prime_engine.is_prime(number)
+
+
+def trial_division(number, limit = None, cache = None):
+    # Divides out every prime below the limit (or below the square root if there is no limit).
+    # Returns the factors found and the remaining cofactor, which is 1 or a prime if complete.
+    # If there is a cache, a cached factorization of a cofactor completes the factoring early.
+    factors = []
     dividend = number
-    divisor = 2
-    while True:
-        # Exit condition 1 - all integers are divisible by 1 so the factoring is now complete
-        if dividend == 1:
-            logging.debug('Dividend is now 1 - prime factoring is complete')
+    complete = False
+    # Candidate divisors come from the shared sieve, so only primes are ever tried
+    for divisor in prime_engine.primes(stop = limit):
+        # Exit condition - the remaining dividend has no factor below its square root so it is prime
+        if divisor * divisor > dividend:
+            logging.debug('The divisor %d is larger than the square root of %d - quitting loop' % (divisor, dividend))
+            complete = True
             break
 
-        # Exit condition 2 - the number is a prime if no factors have been found *and* the divisor exceeds its square root
-        if not factors_set and pow(divisor, 2) > number:
-            logging.debug('No factors have been found and the divisor %d is larger than the square root of %d - quitting loop' % (divisor, number))
-            break
+        if dividend % divisor == 0:
+            # Divisor is a prime factor - capture it and check whether the cofactor is already known
+            factors.append(divisor)
+            dividend = dividend // divisor
+            cached = cache.get(dividend, count_miss=False) if cache is not None and dividend > 1 else None
+            if cached is not None:
+                factors += cached
+                return factors, 1
 
-        # If the divisor is prime *and* is a factor then capture the divisor, apply against the dividend and retry
-        logging.debug('Trying divisor %d' % divisor)
-        if is_prime(divisor):
-            logging.debug('  Divisor is a prime')
-            if dividend % divisor == 0:
-                # Divisor is a prime factor - capture and retry this value
-                logging.debug('  Divisor is a prime factor')
-                factors_set += (divisor,)
-                dividend = dividend // divisor
-                logging.debug('  Dividend is now %d' % dividend)
-                continue
-
-        # The current divisor is not a factor - increment and continue
-        divisor += 1
-
-    return factors_set
-
-
-def output_string(factors):
-    colorama.init(autoreset=True)
-    output = ''
-    index = 0
-    while index < len(factors):
-        prime_factor = factors[index]
-        # Unique prime factor - capture and increment to the following one
-        if factors.count(prime_factor) == 1:
-            output += '%s%d%s' % (Fore.GREEN, prime_factor, Style.RESET_ALL)
-            if index < len(factors) - 1:
-                output += ' * '
-            index += 1
-        # Repeated prime factor - construct exponent and shift the index by the count
+        while dividend % divisor == 0:
+            # Divisor is a repeated prime factor - capture and retry this value
+            factors.append(divisor)
+            dividend = dividend // divisor
+
+    if complete and dividend > 1:
+        factors.append(dividend)
+        dividend = 1
+    return factors, dividend
+
+
+def rho_factors(number, cache = None):
+    # Splits a number into its prime factors using Miller-Rabin and Brent's variant of Pollard's rho
+    factors = []
+    pending = [number] if number > 1 else []
+    while pending:
+        dividend = pending.pop()
+        cached = cache.get(dividend, count_miss=False) if cache is not None and dividend != number else None
+        if cached is not None:
+            factors += cached
+        elif prime_engine.is_prime(dividend):
+            factors.append(dividend)
         else:
-            prime_factor_count = factors.count(prime_factor)
-            output += '%s%d%s' % (Fore.GREEN,  prime_factor, Style.RESET_ALL)
-            output += '%s^%s' % (Style.BRIGHT, Style.RESET_ALL)
-            output += '%s%d%s' % (Fore.CYAN,  prime_factor_count, Style.RESET_ALL)
-            if index + prime_factor_count < len(factors):
-                output += ' * '
-            index += prime_factor_count
+            divisor = prime_engine.pollard_brent(dividend)
+            logging.debug('  Pollard\'s rho split %d into %d * %d' % (dividend, divisor, dividend // divisor))
+            pending += [divisor, dividend // divisor]
+    return factors
 
-    return output
 
+def prime_factors(number, method = DEFAULT_METHOD, cache = None):
+    factors = _factor_tuple(number, method, cache)
+    # A prime has no factors listed by convention
+    if factors == (number,):
+        factors = ()
+    return factors
 
-if __name__ == '__main__':
-    args = parse_args()
+
+def factorize(number, method = DEFAULT_METHOD, cache = None):
+    # The factorization of a positive number as (prime, exponent) pairs
+    if number < 1:
+        raise ValueError('Only positive numbers can be factored; %d is invalid' % number)
+    return Factorization.from_factors(_factor_tuple(number, method, cache))
+
+
+def _factor_tuple(number, method, cache):
+    # Every prime factor (a prime is its own factor) in increasing order
+    if method not in METHODS:
+        raise ValueError('Invalid method "%s" - must be one of %s' % (method, ', '.join(METHODS)))
+
+    factors = cache.get(number) if cache is not None and number > 1 else None
+    if factors is None:
+        logging.debug('Calculating prime factors for %d using the %s method' % (number, method))
+        if method == 'trial':
+            factors, cofactor = trial_division(number, cache=cache)
+        elif method == 'rho':
+            factors, cofactor = [], number
+        else:
+            # Small factors are cheapest to find by trial division - switch to rho for whatever is left
+            factors, cofactor = trial_division(number, AUTO_TRIAL_DIVISION_LIMIT, cache)
+        factors += rho_factors(cofactor, cache)
+        factors = tuple(sorted(factors))
+        if cache is not None and number > 1:
+            cache.put(number, factors)
+        logging.debug('Prime factoring of %d is complete' % number)
+    return factors
+
+
+def daemon_factorize(number, method = DEFAULT_METHOD):
+    # The factorization from the worker daemon (see worker_daemon.py), or None if it is not running
+    response = worker_client.request({'op': 'factors', 'number': number, 'method': method})
+    if response is None or not response.get('ok'):
+        return None
+    logging.debug('%d was factored by the worker daemon' % number)
+    # A prime has no factors listed by convention
+    return Factorization.from_factors(response['factors'] or [number])
+
+
+def read_numbers(stream):
+    # Yields the integers in a newline-delimited stream, one line at a time - like a single number, each must be at least 2
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            number = int(line)
+        except ValueError:
+            logging.warning('Line %d: "%s" is not an integer - skipping' % (line_number, line))
+            continue
+        if number < 2:
+            logging.warning('Line %d: the number must be greater or equal to 2: %d is invalid - skipping' % (line_number, number))
+            continue
+        yield number
+
+
+def factorize_stream(numbers, method = DEFAULT_METHOD, cache = None):
+    # Every number is factored with the same shared sieve, so it is only built once for the stream
+    for number in numbers:
+        yield number, prime_factors(number, method, cache)
+
+
+def chunk_cost(number):
+    # A rough estimate of the relative cost of factoring a number, which grows with its size
+    return 1 + (number.bit_length() // 8) ** 2
+
+
+def chunk_numbers(numbers, budget = CHUNK_COST_BUDGET):
+    # Groups the numbers into lists whose total estimated cost is about the budget
+    chunk = []
+    cost = 0
+    for number in numbers:
+        chunk.append(number)
+        cost += chunk_cost(number)
+        if cost >= budget or len(chunk) >= MAX_CHUNK_SIZE:
+            yield chunk
+            chunk = []
+            cost = 0
+    if chunk:
+        yield chunk
+
+
+# Each worker process has its own in-memory cache
+_worker_cache = None
+
+
+def _init_worker_cache(cache_size):
+    global _worker_cache
+    _worker_cache = FactorCache(cache_size) if cache_size else None
+
+
+def factorize_chunk(chunk, method = DEFAULT_METHOD):
+    return [(number, prime_factors(number, method, _worker_cache)) for number in chunk]
+
+
+def factorize_parallel(numbers, method = DEFAULT_METHOD, workers = None, ordered = True, cache_size = None):
+    # Factors the numbers across a pool of processes, yielding results in input order or as they complete
+    # Only imported for parallel factoring, as it is slow to import
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * CHUNKS_PER_WORKER
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker_cache, initargs=(cache_size,)) as executor:
+        pending = deque() if ordered else set()
+        for chunk in chunk_numbers(numbers):
+            if len(pending) >= max_pending:
+                yield from _completed_chunks(pending, ordered)
+            future = executor.submit(factorize_chunk, chunk, method)
+            if ordered:
+                pending.append(future)
+            else:
+                pending.add(future)
+
+        while pending:
+            yield from _completed_chunks(pending, ordered)
+
+
+def _completed_chunks(pending, ordered):
+    # Waits for the oldest chunk (ordered) or any chunk (unordered) and yields its results
+    if ordered:
+        yield from pending.popleft().result()
+    else:
+        from concurrent.futures import FIRST_COMPLETED, wait
+
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            pending.remove(future)
+            yield from future.result()
+
+
+def write_results(results, output, output_format = DEFAULT_FORMAT):
+    # Writes each (number, factors) result as soon as it is available
+    if output_format not in FORMATS:
+        raise ValueError('Invalid format "%s" - must be one of %s' % (output_format, ', '.join(FORMATS)))
+
+    csv_writer = None
+    if output_format == 'csv':
+        csv_writer = csv.writer(output, lineterminator='\n')
+        csv_writer.writerow(('number', 'prime', 'factors'))
+
+    for number, factors in results:
+        prime = number > 1 and not factors
+        if output_format == 'plain':
+            output.write('%d: %s\n' % (number, 'prime' if prime else ' '.join(map(str, factors))))
+        elif output_format == 'jsonl':
+            output.write(json.dumps({'number': number, 'prime': prime, 'factors': factors}) + '\n')
+        else:
+            csv_writer.writerow((number, int(prime), ' '.join(map(str, factors))))
+
+
+def output_string(factors, colour = None):
+    # Factors are only coloured (and colorama imported) when writing to a terminal
+    if colour is None:
+        colour = sys.stdout.isatty()
+    return Factorization.from_factors(factors).render(colour)
+
+
+def open_cache(args):
+    if args.no_cache:
+        return None
+    return FactorCache(args.cache_size, args.cache_file)
+
+
+def main(argv = None):
+    args = parse_args(argv)
     configure_logging(args)
 
+    if args.input:
+        # Worker processes have caches of their own, so the parent only opens one to factor the stream itself
+        cache = open_cache(args) if args.workers <= 1 else None
+        with args.input:
+            numbers = read_numbers(args.input)
+            if args.workers > 1:
+                if args.cache_file:
+                    logging.warning('The cache file is not used by worker processes - each has its own in-memory cache')
+                cache_size = None if args.no_cache else args.cache_size
+                results = factorize_parallel(numbers, args.method, args.workers, not args.unordered, cache_size)
+            else:
+                results = factorize_stream(numbers, args.method, cache)
+            write_results(results, sys.stdout, args.format)
+        if cache is not None:
+            logging.info('Cache: %(hits)d hits, %(misses)d misses, %(evictions)d evictions' % cache.stats())
+            cache.close()
+        return 0
+
     if args.number < 2:
         logging.error('The number must be greater or equal to 2: %d is invalid' % args.number)
-        sys.exit(1)
+        return 1
 
-    prime_factors = prime_factors(args.number)
-    if not prime_factors:
+    factorization = None
+    if not args.no_daemon and not args.cache_file:
+        factorization = daemon_factorize(args.number, args.method)
+    if factorization is None:
+        cache = open_cache(args)
+        factorization = factorize(args.number, args.method, cache)
+        if cache is not None:
+            logging.debug('Cache: %(hits)d hits, %(misses)d misses, %(evictions)d evictions' % cache.stats())
+            cache.close()
+    if factorization.is_prime:
         print('No factors found: %d is a prime number' % args.number)
     else:
-        print('The prime factors of %d are: %s' % (args.number, output_string(prime_factors)))
+        print('The prime factors of %d are: %s' % (args.number, factorization.render(sys.stdout.isatty())))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+import math
+
+import pytest
+
+import prime_factors
+from arithmetic_tables import ArithmeticTables, smallest_prime_factors
+
+LIMIT = 5000
+
+@pytest.fixture(scope='module')
+def tables():
+    return ArithmeticTables(LIMIT)
+
+def test_smallest_prime_factors():
+    spf = smallest_prime_factors(100)
+    assert list(spf[:10]) == [0, 1, 2, 3, 2, 5, 2, 7, 2, 3]
+    for n in range(2, 101):
+        assert spf[n] == min(p for p in range(2, n + 1) if n % p == 0)
+
+def test_tables_match_factorizations(tables):
+    for n in range(1, LIMIT + 1):
+        f = prime_factors.factorize(n)
+        assert tables.factorize(n) == f
+        assert tables.phi[n] == f.totient()
+        assert tables.divisor_count[n] == f.divisor_count()
+        assert tables.divisor_sum[n] == f.divisor_sum()
+
+@pytest.mark.parametrize('n', [1, 2, 12, 97, 360, 1024, 4096, 4999])
+def test_tables_match_brute_force(tables, n):
+    divisors = [d for d in range(1, n + 1) if n % d == 0]
+    assert tables.divisor_count[n] == len(divisors)
+    assert tables.divisor_sum[n] == sum(divisors)
+    assert tables.phi[n] == sum(1 for k in range(1, n + 1) if math.gcd(k, n) == 1)
+
+def test_primes(tables):
+    assert list(tables.primes())[:10] == [2, 3, 5, 7, 11, 13, 17, 19, 23, 29]
+    assert sum(1 for _ in tables.primes()) == 669
+    assert tables.is_prime(4999) and not tables.is_prime(1) and not tables.is_prime(4998)
+
+def test_out_of_range(tables):
+    with pytest.raises(ValueError):
+        tables.factorize(0)
+    with pytest.raises(ValueError):
+        tables.factorize(LIMIT + 1)
+    with pytest.raises(ValueError):
+        ArithmeticTables(0)
+    with pytest.raises(ValueError):
+        ArithmeticTables(10, ['mobius'])
+
+def test_selected_tables():
+    tables = ArithmeticTables(100, ['phi'])
+    assert tables.tables == ('spf', 'phi')
+    assert tables.divisor_count is None and tables.divisor_sum is None
+    assert tables.phi[36] == 12
+
+def test_save_and_load(tables, tmp_path):
+    path = str(tmp_path / 'tables.bin')
+    tables.save(path)
+    with ArithmeticTables.load(path) as loaded:
+        assert loaded.limit == LIMIT and loaded.tables == tables.tables
+        for name in tables.tables:
+            assert list(getattr(loaded, name)) == list(getattr(tables, name))
+        assert loaded.factorize(4096).pairs == ((2, 12),)
+        # Memory-mapped read-only
+        with pytest.raises(TypeError):
+            loaded.phi[2] = 0
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'not arithmetic tables')
+    with pytest.raises(ValueError):
+        ArithmeticTables.load(str(path))
+
+def test_open_builds_once(tmp_path):
+    path = str(tmp_path / 'tables.bin')
+    built = ArithmeticTables.open(path, 200)
+    assert built.limit == 200
+    # A smaller limit is served by the saved file, a larger one rebuilds it
+    with ArithmeticTables.open(path, 100) as loaded:
+        assert loaded.limit == 200 and loaded.divisor_sum[200] == 465
+    with ArithmeticTables.open(path, 300, ['phi']) as rebuilt:
+        assert rebuilt.limit == 300
+    with ArithmeticTables.load(path) as saved:
+        assert saved.limit == 300 and saved.tables == ('spf', 'phi')
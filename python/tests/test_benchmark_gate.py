@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+import json
+
+import pytest
+
+import benchmark_gate
+
+def baseline(seconds, machine = None):
+    return {'machine': machine or benchmark_gate.machine_metadata(), 'results': {'test_a': {'seconds': seconds, 'loops': 1}}}
+
+def test_regression():
+    assert benchmark_gate.regression('test_a', 1.2, baseline(1.0)) is None
+    message = benchmark_gate.regression('test_a', 1.3, baseline(1.0))
+    assert '30% slower' in message and 'tolerance 25%' in message
+    assert benchmark_gate.regression('test_a', 1.3, baseline(1.0), tolerance=0.5) is None
+    # A benchmark without a baseline cannot regress
+    assert benchmark_gate.regression('test_b', 100.0, baseline(1.0)) is None
+
+def test_same_machine():
+    machine = benchmark_gate.machine_metadata()
+    assert benchmark_gate.same_machine(machine, dict(machine, node='another-host'))
+    assert not benchmark_gate.same_machine(machine, dict(machine, python='2.7.18'))
+    assert not benchmark_gate.same_machine(machine, {})
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / 'baseline.json')
+    assert benchmark_gate.load_baseline(path) == {'machine': {}, 'results': {}}
+    benchmark_gate.save_baseline(path, {'test_a': {'seconds': 1.0, 'loops': 1}})
+    benchmark_gate.save_baseline(path, {'test_b': {'seconds': 2.0, 'loops': 4}})
+    saved = benchmark_gate.load_baseline(path)
+    assert saved['machine'] == benchmark_gate.machine_metadata()
+    assert sorted(saved['results']) == ['test_a', 'test_b']
+    # Results from another machine are replaced, not merged
+    other = dict(benchmark_gate.machine_metadata(), machine='riscv64')
+    benchmark_gate.save_baseline(path, {'test_c': {'seconds': 3.0, 'loops': 1}}, other)
+    assert list(benchmark_gate.load_baseline(path)['results']) == ['test_c']
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / 'other.json'
+    path.write_text(json.dumps([1, 2, 3]))
+    with pytest.raises(ValueError):
+        benchmark_gate.load_baseline(str(path))
+
+def test_time_function():
+    seconds, loops = benchmark_gate.time_function(lambda: sum(range(100)), repeat=2, min_time=0.01)
+    assert 0 < seconds < 0.01 and loops > 1
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+import importlib
+
+import pytest
+
+import birthday_engine
+import birthday_simulation
+import factorial_loop
+import fast_factorial
+import prime_engine
+import prime_factors
+from Concept2Split import Split, SplitTable
+
+# Run with "pytest -m benchmark" - see benchmark_gate.py for the baseline and tolerance
+pytestmark = pytest.mark.benchmark
+
+birthday_paradox = importlib.import_module('birthday-paradox')
+
+DISTANCES = ['500', '1000', '2000', '5000', '6000', '10000', '21097', '42195']
+SEMIPRIMES = {
+    '1e12': 999983 * 1000003,
+    '1e18': 1000000007 * 1000000009,
+    '1e24': 999999999989 * 1000000000039,
+}
+
+@pytest.mark.parametrize('method', ['auto', 'rho'])
+@pytest.mark.parametrize('size', sorted(SEMIPRIMES))
+def test_semiprime(measure, size, method):
+    number = SEMIPRIMES[size]
+    measure(prime_factors.prime_factors, number, method)
+
+def test_semiprime_trial_division(measure):
+    measure(prime_factors.prime_factors, SEMIPRIMES['1e12'], 'trial')
+
+def test_batch_factorization(measure):
+    numbers = range(10 ** 9, 10 ** 9 + 2000)
+    measure(lambda: list(prime_factors.factorize_stream(numbers)))
+
+def test_prime_pi(measure):
+    measure(prime_engine.prime_pi, 10 ** 8, repeat=3)
+
+@pytest.mark.parametrize('method, n', [('loop', 5000), ('split', 100000), ('swing', 100000)])
+def test_factorial(measure, method, n):
+    measure(factorial_loop.factorial_by_method, n, method)
+
+def test_factorial_product_range(measure):
+    measure(fast_factorial.product_range, 1, 50000)
+
+@pytest.mark.parametrize('match_size', [2, 3])
+def test_calculate_birthdays(measure, match_size):
+    measure(birthday_paradox.calculate_birthdays, 365, 0.5, match_size)
+
+def test_people_needed_many_days(measure):
+    measure(birthday_engine.people_needed, 10 ** 6, 0.5, 2)
+
+def test_birthday_simulation(measure):
+    measure(birthday_simulation.simulate, 23, 365, 2, None, 20000, repeat=3)
+
+def test_split_construction(measure):
+    measure(lambda: [Split(90 + i / 10, DISTANCES) for i in range(10000)])
+
+def test_fine_grained_erg_table(measure):
+    # Every tenth of a second from 5:00 to 1:00
+    measure(lambda: list(SplitTable.range(300.0, 60.0, 0.1, DISTANCES).rows()), repeat=3)
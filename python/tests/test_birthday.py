@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+import collections
+import itertools
+
+import pytest
+
+import birthday_engine
+
+def test_classic_birthday_paradox():
+    assert birthday_engine.people_needed() == 23
+
+def test_three_sharing_a_birthday():
+    assert birthday_engine.people_needed(match_size=3) == 88
+
+def test_thresholds():
+    assert birthday_engine.people_needed(threshold=0.99) == 57
+    assert birthday_engine.people_needed(threshold=0.1) == 10
+
+@pytest.mark.parametrize('match_size', [2, 3, 4])
+def test_probabilities_match_enumeration(match_size):
+    days = 5
+    probabilities = dict(itertools.islice(birthday_engine.no_match_probabilities(days, match_size), 7))
+    for people in range(1, 8):
+        assignments = itertools.product(range(days), repeat=people)
+        no_match = sum(1 for a in assignments if max(collections.Counter(a).values()) < match_size)
+        assert probabilities[people] == pytest.approx(no_match / days ** people, abs=1e-12)
+
+def test_grid_matches_single_solutions():
+    days_values = [2, 100, 365, 10000]
+    thresholds = [0.9, 0.1, 0.5]
+    grid = birthday_engine.solve_grid(days_values, thresholds)
+    for days in days_values:
+        for threshold in thresholds:
+            assert grid[(days, threshold)] == birthday_engine.people_needed(days, threshold)
+
+def test_approximation_matches_exact():
+    for days in [10 ** 4, 10 ** 5, 10 ** 6]:
+        for threshold in [0.01, 0.5, 0.99]:
+            assert birthday_engine.approximate_people_needed(days, threshold) == birthday_engine.people_needed(days, threshold)
+
+@pytest.mark.parametrize('match_size', [3, 4])
+def test_approximation_matches_exact_for_larger_matches(match_size):
+    for days in [10 ** 4, 3 * 10 ** 4, 10 ** 5]:
+        for threshold in [0.1, 0.5, 0.99]:
+            assert birthday_engine.approximate_people_needed(days, threshold, match_size) == birthday_engine.people_needed(days, threshold, match_size)
+
+@pytest.mark.parametrize('days, threshold, match_size', [
+    (100, 0.999999, 4),
+    (3, 0.5, 3),
+    (2, 0.5, 4),
+    (1, 0.5, 3),
+    (100, 0.01, 2),
+    (50, 0.999999, 2),
+    (365, 0.01, 5),
+])
+def test_approximation_for_few_days(days, threshold, match_size):
+    assert birthday_engine.approximate_people_needed(days, threshold, match_size) == birthday_engine.people_needed(days, threshold, match_size)
+
+@pytest.mark.parametrize('match_size', [2, 3, 5, 6])
+def test_approximation_at_the_extremes(match_size):
+    days = birthday_engine.APPROXIMATE_DAYS_MINIMUM
+    for threshold in [1e-6, 0.01, 0.999999]:
+        assert birthday_engine.approximate_people_needed(days, threshold, match_size) == birthday_engine.people_needed(days, threshold, match_size)
+
+def test_approximation_above_the_exact_limit():
+    # The exact answer for 10^7 days is 74784 - the Diaconis-Mosteller estimate alone gives 74691
+    assert birthday_engine.approximate_people_needed(10 ** 7, 0.5, 3) == 74784
+    assert birthday_engine.people_needed(10 ** 7 + 1, 0.5, 3) == 74784
+
+def test_approximation_for_64_bit_hashes():
+    # The well-known rule of thumb - about 5.06 billion 64-bit hashes give an evens chance of a collision
+    assert birthday_engine.approximate_people_needed(2 ** 64) == 5056937541
+    assert birthday_engine.people_needed(2 ** 64) == 5056937541
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        birthday_engine.people_needed(days=0)
+    with pytest.raises(ValueError):
+        birthday_engine.people_needed(match_size=1)
+    with pytest.raises(ValueError):
+        birthday_engine.people_needed(threshold=1.0)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+import importlib
+import itertools
+
+import pytest
+
+import birthday_engine
+import birthday_simulation
+
+def test_simulation_agrees_with_exact_probability():
+    result = birthday_simulation.simulate(23, trials=50000, tolerance=0)
+    _, no_match = list(itertools.islice(birthday_engine.no_match_probabilities(), 23))[-1]
+    assert result.low <= 1 - no_match <= result.high
+
+def test_simulation_is_reproducible():
+    first = birthday_simulation.simulate(30, trials=20000, seed=7, tolerance=0)
+    second = birthday_simulation.simulate(30, trials=20000, seed=7, tolerance=0)
+    assert first.matches == second.matches
+
+def test_parallel_matches_serial():
+    serial = birthday_simulation.simulate(30, trials=20000, batch_size=5000, seed=3, tolerance=0)
+    parallel = birthday_simulation.simulate(30, trials=20000, batch_size=5000, seed=3, tolerance=0, workers=2)
+    assert serial.matches == parallel.matches
+
+def test_early_stopping():
+    result = birthday_simulation.simulate(23, trials=10 ** 6, batch_size=1000, tolerance=0.02)
+    assert result.trials < 10 ** 6
+    assert result.half_width <= 0.02
+
+def test_skewed_birthdays_match_more_often():
+    weights = [10] + [1] * 364
+    uniform = birthday_simulation.simulate(10, trials=20000, tolerance=0)
+    skewed = birthday_simulation.simulate(10, weights=weights, trials=20000, tolerance=0)
+    assert skewed.estimate > uniform.estimate
+
+def test_certain_triple():
+    # Seven people over three days must include three sharing a day
+    result = birthday_simulation.simulate(7, days=3, match_size=3, trials=1000, tolerance=0)
+    assert result.estimate == 1.0
+
+def test_wilson_interval():
+    low, high = birthday_simulation.wilson_interval(50, 100)
+    assert low == pytest.approx(0.4038, abs=1e-4) and high == pytest.approx(0.5962, abs=1e-4)
+
+def test_invalid_weights():
+    with pytest.raises(ValueError):
+        birthday_simulation.simulate(10, days=365, weights=[1, 2, 3])
+
+@pytest.mark.parametrize('people, trials', [(0, 100), (10, 0)])
+def test_invalid_simulation(people, trials):
+    with pytest.raises(ValueError):
+        birthday_simulation.simulate(people, trials=trials)
+
+@pytest.mark.parametrize('workers, batch_size', [(0, 100), (-1, 100), (1, 0)])
+def test_invalid_workers_or_batch_size(workers, batch_size):
+    with pytest.raises(ValueError):
+        birthday_simulation.simulate(23, trials=1000, workers=workers, batch_size=batch_size)
+
+@pytest.mark.parametrize('arguments', [['-s', '0'], ['-s', '23', '--trials', '0'], ['-s', '23', '--workers', '0']])
+def test_cli_rejects_invalid_simulation(arguments, capsys):
+    birthday_paradox = importlib.import_module('birthday-paradox')
+    with pytest.raises(SystemExit) as e:
+        birthday_paradox.main(arguments)
+    assert e.value.code == 2
+    assert 'invalid' in capsys.readouterr().err
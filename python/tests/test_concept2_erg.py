@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
 
+import pickle
+
 import pytest
 
-from Concept2Split import Split
+from Concept2Split import Split, SplitIndex, SplitTable
 
 def test_invalid_split():
     with pytest.raises(ValueError):
@@ -61,3 +63,141 @@ def test_watts_from_display():
     split = Split.display("1:45.0")
     expected_value = 302.3
     assert split.watts == expected_value
+
+def test_split_table_matches_splits():
+    distances = [500, 2000, 5000, 21097]
+    table = SplitTable.range(180.0, 80.0, 0.1, distances)
+    seconds = 180.0
+    for row in table.rows():
+        assert row == Split(seconds, distances).get_row()
+        seconds -= 0.1
+    assert seconds < 80.0
+
+def test_split_table_header():
+    table = SplitTable([120.0], ['2000'])
+    assert table.get_header_row() == Split.get_header_row([2000])
+
+def test_split_table_columns():
+    table = SplitTable.range(120.0, 105.0, 15.0, [2000])
+    assert len(table) == 2
+    assert list(table.watts) == [202.5, 302.3]
+    assert list(table.times[0]) == [480.0, 420.0]
+
+def test_split_is_immutable():
+    split = Split.seconds(120)
+    with pytest.raises(AttributeError):
+        split.split = 100
+
+def test_split_has_no_instance_dict():
+    split = Split.seconds(120)
+    assert not hasattr(split, '__dict__')
+
+def test_splits_share_distances():
+    first = Split.seconds(120, ['2000', '5000'])
+    second = Split.seconds(110, ['2000', '5000'])
+    assert first.distances == (2000, 5000)
+    assert first.distances is second.distances
+
+def test_split_equality_and_hash():
+    assert Split.display('2:00') == Split.seconds(120)
+    assert len({Split.display('2:00'), Split.seconds(120), Split.seconds(121)}) == 2
+
+def test_split_ordering():
+    splits = [Split.seconds(s) for s in (120, 105, 110.5)]
+    assert [split.split for split in sorted(splits)] == [105, 110.5, 120]
+    assert Split.seconds(105) < Split.seconds(120)
+
+def test_split_arithmetic():
+    split = Split.seconds(120, [2000])
+    assert (split + 1.5).split == 121.5
+    assert (split - 20).split == 100
+    assert split - Split.seconds(100) == 20
+    assert (split * 0.5).split == 60
+    assert (split / 2).split == 60
+    assert split / Split.seconds(60) == 2
+    assert (split + 1).distances == (2000,)
+
+def test_split_pickle():
+    split = Split.seconds(120, [2000])
+    assert pickle.loads(pickle.dumps(split)) == split
+
+@pytest.mark.parametrize('display', ['1:45', '1:45.1', '2:5', '2:05.', '12:00.0'])
+def test_parse_display_matches_display(display):
+    assert Split.parse_display(display) == Split.display(display).split
+
+@pytest.mark.parametrize('display', ['', '2', '2:00.123', 'a:45', ':45', '1:', '1:45.a'])
+def test_parse_display_invalid(display):
+    with pytest.raises(ValueError):
+        Split.parse_display(display)
+
+def test_split_from_watts():
+    assert Split.from_watts(202.5).split == 120.0
+    assert Split.from_watts(302.3).split == 105.0
+    # Between the watts of 2:00.0 and 1:59.9 the faster split is needed
+    assert Split.from_watts(202.6).split == 119.9
+
+def test_split_for_target_time():
+    assert Split.for_target_time(2000, 420).split == 105.0
+    assert Split.for_target_time(2000, 421).split_display == '1:45.2'
+    assert Split.for_target_time(5000, 1200, [5000]).get_row().split()[-1] == '20:00.0'
+
+def test_inverse_functions_invalid():
+    with pytest.raises(ValueError):
+        Split.from_watts(0)
+    with pytest.raises(ValueError):
+        Split.for_target_time(0, 420)
+    with pytest.raises(ValueError):
+        Split.from_watts(1e12)
+    assert Split.watts_to_seconds(3.5e11) == 0.1
+
+def test_inverse_arrays():
+    assert list(Split.watts_array_to_seconds([202.5, 302.3])) == [120.0, 105.0]
+    assert list(Split.target_times_to_seconds(2000, [420, 480])) == [105.0, 120.0]
+
+def test_split_index_matches_closed_form():
+    index = SplitIndex(180.0, 80.0)
+    for tenths in range(800, 1800, 7):
+        watts = tenths / 4
+        expected = Split.watts_to_seconds(watts)
+        if 80.0 <= expected <= 180.0:
+            assert index.split_for_watts(watts) == expected
+        seconds = tenths * 0.4 + 0.05
+        assert index.split_for_target_time(2000, seconds) == Split.target_time_to_seconds(2000, seconds)
+
+def test_split_index_out_of_range():
+    index = SplitIndex(180.0, 80.0)
+    assert index.split_for_watts(10) is None
+    assert index.split_for_watts(5000) is None
+    assert index.split_for_target_time(2000, 60 * 60) is None
+    assert index.splits_for_watts([202.5, 10]) == [120.0, None]
+
+def test_split_index_invalid_distance():
+    index = SplitIndex(180.0, 80.0)
+    with pytest.raises(ValueError):
+        index.split_for_target_time(0, 420)
+    with pytest.raises(ValueError):
+        index.split_for_target_time(-2000, 420)
+
+def test_split_is_whole_tenths():
+    assert Split.seconds(120.04).tenths == 1200
+    assert Split.seconds(0.1 * 3).split == 0.3
+    assert Split.from_tenths(1055).split_display == '1:45.5'
+    assert Split.seconds(100.1) - Split.seconds(100) == 0.1
+
+def test_split_table_range_endpoints():
+    assert list(SplitTable.range(120.0, 119.0, 0.1).splits) == [120.0 - i / 10 for i in range(11)]
+    # The low split is only included when it is a whole number of increments from the high
+    assert list(SplitTable.range(120.0, 119.0, 0.3).splits) == [120.0, 119.7, 119.4, 119.1]
+    assert list(SplitTable.range(120.0, 120.0, 1.0).splits) == [120.0]
+    assert len(SplitTable.range(119.0, 120.0, 1.0)) == 0
+    with pytest.raises(ValueError):
+        SplitTable.range(120.0, 119.0, 0.01)
+
+def test_split_table_range_does_not_drift():
+    # 1000 steps of 0.1 - repeated float subtraction from 5:00 ends just above 3:20 and loses the last row
+    table = SplitTable.range(300.0, 200.0, 0.1, [2000])
+    assert len(table) == 1001
+    assert list(table.tenths) == list(range(3000, 1999, -1))
+    assert table.splits[-1] == 200.0
+    assert list(table.watts) == [Split.seconds(tenths / 10).watts for tenths in table.tenths]
+    assert [row for chunk in SplitTable.chunks(300.0, 200.0, 0.1, [2000], 64) for row in chunk.rows()] == list(table.rows())
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+import json
+import os
+
+import pytest
+
+import diagram_as_code
+import diagram_spec
+
+SPEC = {
+    'name': 'Web',
+    'filename': 'web',
+    'nodes': [
+        {'id': 'lb', 'type': 'aws.network.ALB'},
+        {'id': 'web1', 'type': 'aws.compute.EC2', 'label': 'Web 1'},
+        {'id': 'web2', 'type': 'aws.compute.EC2', 'label': 'Web 2'},
+    ],
+    'clusters': [{'label': 'VPC', 'nodes': ['lb'], 'clusters': [{'label': 'Subnet', 'nodes': ['web1', 'web2']}]}],
+    'edges': [['lb', ['web1', 'web2']]],
+}
+
+def test_normalize():
+    spec = diagram_spec.normalize(SPEC)
+    assert spec['edges'] == [['lb', 'web1'], ['lb', 'web2']]
+    assert spec['nodes'][0]['label'] == 'lb'
+    assert (spec['direction'], spec['outformat']) == ('LR', 'png')
+    assert diagram_spec.normalize(spec) == spec
+
+def test_hash_is_canonical():
+    # Key order and edge shorthand do not change the hash
+    reordered = json.loads(json.dumps(SPEC, sort_keys=True))
+    expanded = dict(SPEC, edges=[['lb', 'web1'], ['lb', 'web2']], direction='LR')
+    assert diagram_spec.spec_hash(reordered) == diagram_spec.spec_hash(SPEC) == diagram_spec.spec_hash(expanded)
+
+def test_hash_changes_with_content():
+    relabelled = json.loads(json.dumps(SPEC))
+    relabelled['nodes'][1]['label'] = 'Web One'
+    reversed_edges = dict(SPEC, edges=[['lb', ['web2', 'web1']]])
+    hashes = set(diagram_spec.spec_hash(spec) for spec in (SPEC, relabelled, reversed_edges, dict(SPEC, outformat='svg')))
+    assert len(hashes) == 4
+
+@pytest.mark.parametrize('change', [
+    {'name': ''},
+    {'filename': '../web'},
+    {'direction': 'UP'},
+    {'edges': [['lb', 'db']]},
+    {'clusters': [{'label': 'A', 'nodes': ['lb']}, {'label': 'B', 'nodes': ['lb']}]},
+    {'nodes': [{'id': 'lb', 'type': 'ALB'}]},
+])
+def test_invalid_spec(change):
+    with pytest.raises(ValueError):
+        diagram_spec.normalize(dict(SPEC, **change))
+
+def test_secure_vpc_spec():
+    spec = diagram_spec.load_spec(diagram_as_code.DEFAULT_SPEC)
+    assert len(spec['nodes']) == 17
+    assert len(spec['edges']) == 22
+
+def test_up_to_date_diagram_is_not_rendered(tmp_path):
+    spec = diagram_spec.normalize(SPEC)
+    path = diagram_as_code.artifact_path(spec, tmp_path)
+    assert not diagram_as_code.is_current(spec, tmp_path)
+
+    with open(path, 'wb') as f:
+        f.write(b'rendered')
+    with open(path + diagram_as_code.HASH_SUFFIX, 'w') as f:
+        f.write(diagram_spec.spec_hash(spec) + '\n')
+    assert diagram_as_code.is_current(spec, tmp_path)
+    assert diagram_as_code.render_all([SPEC, SPEC], tmp_path, workers=2) == [(path, False), (path, False)]
+
+    # A changed spec or a missing artifact is stale
+    assert not diagram_as_code.is_current(dict(SPEC, name='Changed'), tmp_path)
+    os.remove(path)
+    assert not diagram_as_code.is_current(spec, tmp_path)
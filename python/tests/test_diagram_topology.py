@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+import os
+
+import pytest
+
+import diagram_spec
+import diagram_topology
+
+SPECS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'diagram_specs')
+
+def tiers(count, subnets = 2):
+    return {
+        'name': 'Tiers',
+        'filename': 'tiers',
+        'nodes': [{'id': 'alb', 'type': 'aws.network.ALB'}],
+        'groups': [
+            {'id': 'web', 'type': 'aws.compute.EC2', 'label': 'Web', 'count': count, 'subnets': subnets, 'subnet_label': 'Subnet'},
+            {'id': 'app', 'type': 'aws.compute.EC2', 'count': count},
+        ],
+        'clusters': [{'label': 'VPC', 'nodes': ['alb', 'web']}],
+        'edges': [['alb', 'web'], ['web', 'app']],
+    }
+
+def test_secure_vpc_topology_matches_spec():
+    generated = diagram_topology.generate(diagram_spec.read_data(os.path.join(SPECS, 'secure_vpc_topology.yaml')))
+    assert generated == diagram_spec.load_spec(os.path.join(SPECS, 'secure_vpc.json'))
+
+def test_groups_are_spread_over_subnets():
+    spec = diagram_topology.generate(tiers(3), hubs=False)
+    vpc = spec['clusters'][0]
+    assert vpc['nodes'] == ['alb']
+    assert [(c['label'], c['nodes']) for c in vpc['clusters']] == [('Subnet 1', ['web1', 'web3']), ('Subnet 2', ['web2'])]
+    assert spec['nodes'][1]['label'] == 'Web 1'
+    assert diagram_topology.spec_size(spec) == (7, 3 + 9)
+
+def test_many_to_many_edges_use_a_hub():
+    spec = diagram_topology.generate(tiers(3))
+    assert diagram_topology.spec_size(spec) == (8, 3 + 6)
+    hub = spec['nodes'][-1]
+    assert hub['type'] == diagram_topology.HUB_TYPE
+    assert ['web1', hub['id']] in spec['edges'] and [hub['id'], 'app3'] in spec['edges']
+
+def test_large_groups_are_collapsed():
+    spec = diagram_topology.generate(tiers(100, 10), threshold=8)
+    assert diagram_topology.spec_size(spec) == (3, 2)
+    assert [node['label'] for node in spec['nodes']] == ['alb', 'Web x100', 'app x100']
+    assert spec['clusters'][0]['clusters'] == [{'label': 'Subnet x10', 'nodes': ['web'], 'clusters': []}]
+    # The full diagram has an edge for every pair
+    assert diagram_topology.spec_size(diagram_topology.generate(tiers(100, 10), None, False)) == (201, 100 + 100 * 100)
+
+@pytest.mark.parametrize('group', [
+    {'id': 'web', 'type': 'aws.compute.EC2', 'count': 0},
+    {'id': 'web', 'type': 'aws.compute.EC2', 'count': 2, 'subnets': 3},
+    {'id': 'alb', 'type': 'aws.compute.EC2', 'count': 2},
+])
+def test_invalid_group(group):
+    topology = dict(tiers(3), groups=[group], clusters=[], edges=[])
+    with pytest.raises(ValueError):
+        diagram_topology.generate(topology)
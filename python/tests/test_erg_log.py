@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+import io
+
+import pytest
+
+import erg_log
+from Concept2Split import Split
+
+CSV_LOG = '''athlete,distance,split
+ann,2000,2:00.0
+bob,2000,1:45.0
+ann,500,1:45
+bob,5000,not-a-split
+'''
+
+def test_zero_splits_are_skipped():
+    log = 'athlete,distance,split\nann,2000,2:00.0\nann,0,0:00\n'
+    summary = erg_log.LogSummary()
+    summary.add_rows(erg_log.read_rows(io.StringIO(log)))
+    assert summary.rows == 1 and summary.skipped == 1
+    assert summary.mean_watts() == pytest.approx(202.5)
+
+def test_read_csv_rows():
+    rows = list(erg_log.read_rows(io.StringIO(CSV_LOG)))
+    assert len(rows) == 4
+    assert rows[0] == {'athlete': 'ann', 'distance': '2000', 'split': '2:00.0'}
+
+def test_read_jsonl_rows():
+    log = '{"athlete": "ann", "distance": 2000, "split": "2:00.0"}\n\n{"athlete": "bob", "distance": 500, "split": "1:45"}\n'
+    rows = list(erg_log.read_rows(io.StringIO(log), 'jsonl'))
+    assert [row['athlete'] for row in rows] == ['ann', 'bob']
+
+def test_corrupt_jsonl_lines_are_skipped():
+    log = '{"athlete": "ann", "distance": 2000, "split": "2:00.0"}\n{"athlete": "bob", "dist\n[1, 2]\n{"athlete": "bob", "distance": [2000], "split": "2:00.0"}\n{"athlete": ["bob"], "distance": 2000, "split": "2:00.0"}\n{"athlete": "bob", "distance": 500, "split": "1:45"}\n'
+    summary = erg_log.LogSummary()
+    summary.add_rows(erg_log.read_rows(io.StringIO(log), 'jsonl'))
+    assert summary.rows == 2 and summary.skipped == 4
+    assert summary.best_splits == {'ann': 120.0, 'bob': 105.0}
+
+def test_summary():
+    summary = erg_log.LogSummary()
+    summary.add_rows(erg_log.read_rows(io.StringIO(CSV_LOG)), chunk_size=2)
+    assert summary.rows == 3 and summary.skipped == 1
+    assert summary.mean_watts() == pytest.approx((202.5 + 302.3 + 302.3) / 3)
+    assert summary.percentile_watts(50) == 302.3
+    assert summary.percentile_watts(1) == 202.5
+    assert summary.distance_times == {2000: 480.0 + 420.0, 500: 105.0}
+    assert summary.best_splits == {'ann': 105.0, 'bob': 105.0}
+
+def test_watts_match_split():
+    splits = [95.0, 105.0, 110.5, 120.0, 180.0]
+    assert list(erg_log.watts(splits)) == [Split.seconds(s).watts for s in splits]
+
+def test_format_duration():
+    assert erg_log.format_duration(3725.5) == '1:02:05.5'
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+import asyncio
+import io
+
+import pytest
+
+import erg_table_writers
+from Concept2Split import Split, SplitTable
+from erg_table_service import ErgTableService, TableGrid, normalize
+
+DISTANCES = ['2000', '5000']
+
+def test_normalize():
+    assert normalize('') == (1350, 1050, 10, (), 'text')
+    assert normalize('high=2:00.0&low=1:50&increment=0.50&distance=2000,5000') == (1200, 1100, 5, (2000, 5000), 'text')
+    # Equivalent arguments share a cache key
+    assert normalize('distance=2000&distance=5000&format=csv') == normalize('distance=2000,5000&format=csv&increment=1.0')
+
+@pytest.mark.parametrize('query', ['high=2.15', 'increment=0.05', 'increment=nan', 'distance=-1', 'format=xml'])
+def test_normalize_invalid(query):
+    with pytest.raises(ValueError):
+        normalize(query)
+
+def test_grid_matches_split_table():
+    grid = TableGrid()
+    output = io.BytesIO()
+    erg_table_writers.write_table(grid.chunks(1350, 1050, 10, DISTANCES, size=7), output, 'text', DISTANCES)
+    table = SplitTable.range(135.0, 105.0, 1.0, DISTANCES)
+    assert output.getvalue().decode() == '\n'.join([Split.get_header_row(DISTANCES)] + list(table.rows())) + '\n'
+
+def test_grid_slice():
+    rows = [table.splits[i] for table in TableGrid().chunks(1205, 1200, 2) for i in range(len(table))]
+    assert rows == [120.5, 120.3, 120.1]
+    with pytest.raises(ValueError):
+        list(TableGrid().chunks(3100, 1200, 1))
+
+def request(service, *targets):
+    async def fetch():
+        responses = []
+        for target in targets:
+            responses.append(await service.respond('GET', target))
+        return responses
+    return asyncio.run(fetch())
+
+def test_service_cache():
+    service = ErgTableService(TableGrid(), cache_size=1)
+    try:
+        first, second, third, stats = request(service, '/table?distance=2000', '/table?distance=2000', '/table?format=csv', '/stats')
+        assert first == second
+        assert first[0] == 200 and first[2].decode().startswith(Split.get_header_row(['2000']))
+        assert third[:2] == (200, 'text/csv; charset=utf-8')
+        assert (service.hits, service.misses, service.evictions) == (1, 2, 1)
+        assert stats[0] == 200
+    finally:
+        service.close()
+
+def test_service_errors():
+    service = ErgTableService(TableGrid())
+    try:
+        statuses = [response[0] for response in request(service, '/table?high=9:00', '/table?format=xml', '/missing')]
+        assert statuses == [400, 400, 404]
+    finally:
+        service.close()
+
+def test_concurrent_requests_share_rendering():
+    service = ErgTableService(TableGrid())
+
+    async def fetch():
+        return await asyncio.gather(*[service.table(normalize('increment=0.1')) for _ in range(8)])
+    try:
+        bodies = asyncio.run(fetch())
+        assert len(set(bodies)) == 1
+        assert service.misses == 8 and len(service.cache) == 1 and not service.pending
+    finally:
+        service.close()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+import io
+import json
+
+import pytest
+
+import erg_table_writers
+from Concept2Split import Split, SplitTable
+
+DISTANCES = ['2000', '5000']
+
+def write(output_format, high=120.0, low=105.0, increment=1.0, size=4):
+    output = io.BytesIO()
+    chunks = SplitTable.chunks(high, low, increment, DISTANCES, size)
+    erg_table_writers.write_table(chunks, output, output_format, DISTANCES)
+    return output.getvalue()
+
+def test_chunks_match_range():
+    table = SplitTable.range(180.0, 80.0, 0.1, DISTANCES)
+    chunks = list(SplitTable.chunks(180.0, 80.0, 0.1, DISTANCES, 64))
+    assert max(len(chunk) for chunk in chunks) == 64
+    assert [row for chunk in chunks for row in chunk.rows()] == list(table.rows())
+
+def test_text_matches_joined_table():
+    table = SplitTable.range(120.0, 105.0, 1.0, DISTANCES)
+    expected = '\n'.join([Split.get_header_row(DISTANCES)] + list(table.rows())) + '\n'
+    assert write('text').decode() == expected
+
+def test_csv():
+    lines = write('csv').decode().splitlines()
+    assert lines[0] == 'Split,Watts,2000m,5000m'
+    assert lines[1] == '2:00.0,202.5,8:00.0,20:00.0'
+    assert len(lines) == 17
+
+def test_markdown():
+    lines = write('markdown').decode().splitlines()
+    assert lines[0] == '| Split | Watts | 2000m | 5000m |'
+    assert lines[-1] == '| 1:45.0 | 302.3 | 7:00.0 | 17:30.0 |'
+
+def test_json():
+    rows = json.loads(write('json'))
+    assert len(rows) == 16
+    assert rows[0] == {'split': '2:00.0', 'seconds': 120.0, 'watts': 202.5, 'times': {'2000': 480.0, '5000': 1200.0}}
+
+def test_binary_round_trip():
+    names, rows = erg_table_writers.read_binary(io.BytesIO(write('binary')))
+    rows = list(rows)
+    assert names == ['seconds', 'watts', '2000m', '5000m']
+    assert len(rows) == 16
+    assert rows[-1] == (105.0, 302.3, 420.0, 1050.0)
+
+def test_empty_table():
+    assert write('text', high=100.0, low=105.0).decode() == Split.get_header_row(DISTANCES) + '\n'
+    assert json.loads(write('json', high=100.0, low=105.0)) == []
+
+def test_invalid_format():
+    with pytest.raises(ValueError):
+        write('xml')
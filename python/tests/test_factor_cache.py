@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+import pytest
+
+import prime_factors
+from factor_cache import FactorCache
+
+def test_miss_then_hit():
+    cache = FactorCache()
+    assert cache.get(12) is None
+    cache.put(12, (2, 2, 3))
+    assert cache.get(12) == (2, 2, 3)
+    assert cache.hits == 1 and cache.misses == 1
+
+def test_least_recently_used_is_evicted():
+    cache = FactorCache(max_size=2)
+    cache.put(4, (2, 2))
+    cache.put(6, (2, 3))
+    cache.get(4)
+    cache.put(9, (3, 3))
+    assert 4 in cache and 9 in cache and 6 not in cache
+    assert cache.evictions == 1
+
+def test_invalid_size():
+    with pytest.raises(ValueError):
+        FactorCache(max_size=0)
+
+def test_cofactor_is_reused():
+    cache = FactorCache()
+    prime_factors.prime_factors(12, cache=cache)
+    hits = cache.hits
+    assert prime_factors.prime_factors(24, cache=cache) == (2, 2, 2, 3)
+    assert cache.hits == hits + 1
+
+def test_cofactor_lookups_are_not_misses():
+    cache = FactorCache()
+    prime_factors.prime_factors(2 * 3 * 5 * 7 * 11, 'trial', cache)
+    prime_factors.prime_factors(2 ** 64 + 1, 'rho', cache)
+    assert cache.misses == 2
+
+def test_prime_is_cached():
+    cache = FactorCache()
+    assert prime_factors.prime_factors(67, cache=cache) == ()
+    assert cache.get(67) == (67,)
+    assert prime_factors.prime_factors(67, cache=cache) == ()
+
+@pytest.mark.parametrize('method', prime_factors.METHODS)
+def test_cached_results_match_uncached(method):
+    cache = FactorCache(max_size=100)
+    for n in range(2, 2000):
+        assert prime_factors.prime_factors(n, method, cache) == prime_factors.prime_factors(n, method)
+
+def test_persistent_store(tmp_path):
+    path = str(tmp_path / 'factors.sqlite')
+    with FactorCache(path=path) as cache:
+        prime_factors.prime_factors(2 ** 64 + 1, cache=cache)
+    with FactorCache(path=path) as cache:
+        assert cache.get(2 ** 64 + 1) == (274177, 67280421310721)
+        assert cache.misses == 0
@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
+import math
+
 import pytest
 
 import factorial_loop
+import fast_factorial
 import factorial_recursion
 
 
@@ -33,4 +36,50 @@ def test_factorial_zero_recursion():
 def test_negative_factorial_recursion():
     n = -3
     with pytest.raises(ValueError):
-        factorial_recursion.factorial(n)
\ No newline at end of file
+        factorial_recursion.factorial(n)
+
+@pytest.mark.parametrize('method', factorial_loop.METHODS)
+def test_methods_match_math_factorial(method):
+    for n in list(range(0, 100)) + [1000, 4321]:
+        assert factorial_loop.factorial_by_method(n, method) == math.factorial(n)
+
+@pytest.mark.parametrize('method', factorial_loop.METHODS)
+def test_negative_factorial_by_method(method):
+    with pytest.raises(ValueError):
+        factorial_loop.factorial_by_method(-3, method)
+
+def test_invalid_method():
+    with pytest.raises(ValueError):
+        factorial_loop.factorial_by_method(3, 'foo')
+
+def test_swing():
+    # swing(n) = n! / (floor(n/2)!)^2
+    for n in range(0, 200):
+        assert fast_factorial.swing(n) == math.factorial(n) // math.factorial(n // 2) ** 2
+
+def test_large_factorial_recursion():
+    n = 5000 # well beyond the default recursion limit
+    factorial_recursion.clear_memo()
+    assert factorial_recursion.factorial(n) == math.factorial(n)
+
+def test_increasing_factorials_recursion():
+    factorial_recursion.clear_memo()
+    for n in range(2000, 2100):
+        assert factorial_recursion.factorial(n) == math.factorial(n)
+
+def test_memo_is_bounded_recursion():
+    factorial_recursion.clear_memo()
+    for n in range(2, 10 * factorial_recursion.MEMO_SIZE):
+        factorial_recursion.factorial(n)
+    assert len(factorial_recursion._memo) <= factorial_recursion.MEMO_SIZE
+    assert factorial_recursion.factorial(7) == 5040
+
+def test_memo_forgets_least_recently_used_recursion():
+    factorial_recursion.clear_memo()
+    for n in range(2, factorial_recursion.MEMO_SIZE):
+        factorial_recursion.factorial(n)
+    # 2! is the oldest entry, but using it keeps it remembered when the memo overflows
+    factorial_recursion.factorial(2)
+    factorial_recursion.factorial(1000)
+    assert 2 in factorial_recursion._memo
+    assert 3 not in factorial_recursion._memo
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+import math
+
+import pytest
+
+import factorial_modular
+import prime_engine
+
+@pytest.mark.parametrize('m', [1, 2, 7, 10, 97, 100, 1009])
+def test_factorial_mod(m):
+    for n in range(0, 1100, 7):
+        assert factorial_modular.factorial_mod(n, m) == math.factorial(n) % m
+
+def test_factorial_mod_wilson():
+    p = 1000003
+    assert factorial_modular.factorial_mod(p - 1, p) == p - 1
+    assert factorial_modular.factorial_mod(p - 2, p) == 1
+
+def test_factorial_mod_invalid():
+    with pytest.raises(ValueError):
+        factorial_modular.factorial_mod(-1, 7)
+    with pytest.raises(ValueError):
+        factorial_modular.factorial_mod(5, 0)
+
+def test_binomial():
+    assert factorial_modular.binomial(10, 3) == 120
+    assert factorial_modular.binomial(10, 11) == 0
+    assert factorial_modular.binomial(10, -1) == 0
+
+@pytest.mark.parametrize('m', [2, 3, 13, 12, 1000, 10 ** 9 + 7])
+def test_binomial_mod(m):
+    for n in range(0, 120, 3):
+        for k in range(0, n + 1, 5):
+            assert factorial_modular.binomial(n, k, m) == math.comb(n, k) % m
+
+def test_binomial_mod_leaves_the_shared_sieve():
+    limit = prime_engine.DEFAULT_SIEVE.limit
+    n = 4 * limit + 1
+    assert factorial_modular.binomial(n, 100, 10 ** 9) == math.comb(n, 100) % 10 ** 9
+    assert prime_engine.DEFAULT_SIEVE.limit == limit
+
+def test_factorial_trailing_zeros():
+    for n in range(0, 300):
+        digits = str(math.factorial(n))
+        assert factorial_modular.factorial_trailing_zeros(n) == len(digits) - len(digits.rstrip('0'))
+
+def test_factorial_trailing_zeros_other_bases():
+    # 10! = 2^8 * 3^4 * 5^2 * 7
+    assert factorial_modular.factorial_trailing_zeros(10, 2) == 8
+    assert factorial_modular.factorial_trailing_zeros(10, 12) == 4
+    assert factorial_modular.factorial_trailing_zeros(10, 49) == 0
+    assert factorial_modular.factorial_trailing_zeros(10 ** 9) == 249999998
+
+def test_factorial_digits():
+    for n in range(0, 1000):
+        assert factorial_modular.factorial_digits(n) == len(str(math.factorial(n)))
+
+def test_factorial_digits_powers_of_ten():
+    # OEIS A061010 - the number of digits of (10^n)!
+    expected_digits = [2568, 35660, 456574, 5565709, 65657060, 756570557, 8565705523]
+    assert [factorial_modular.factorial_digits(10 ** e) for e in range(3, 10)] == expected_digits
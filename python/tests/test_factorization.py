@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+import math
+import pickle
+
+import pytest
+
+import prime_factors
+from factorization import Factorization
+
+def brute_divisors(n):
+    return [d for d in range(1, n + 1) if n % d == 0]
+
+def test_pairs_and_flat_view():
+    f = Factorization.from_factors((5, 2, 3, 2, 3, 2))
+    assert f.pairs == ((2, 3), (3, 2), (5, 1))
+    assert f.factors == (2, 2, 2, 3, 3, 5)
+    assert f.number == 360
+    assert len(f) == 3
+    assert Factorization().number == 1 and Factorization().factors == ()
+
+def test_factorize():
+    assert prime_factors.factorize(360) == Factorization([(2, 3), (3, 2), (5, 1)])
+    assert prime_factors.factorize(97).is_prime
+    assert prime_factors.factorize(1) == Factorization()
+    assert prime_factors.factorize(2 ** 1000).pairs == ((2, 1000),)
+    with pytest.raises(ValueError):
+        prime_factors.factorize(0)
+
+@pytest.mark.parametrize('n', [1, 2, 12, 97, 360, 1024, 9991, 30030])
+def test_derived_arithmetic(n):
+    f = prime_factors.factorize(n)
+    divisors = brute_divisors(n)
+    assert f.divisors() == divisors
+    assert f.divisor_count() == len(divisors)
+    assert f.divisor_sum() == sum(divisors)
+    assert f.divisor_sum(2) == sum(d * d for d in divisors)
+    assert f.divisor_sum(0) == len(divisors)
+    assert f.totient() == sum(1 for k in range(1, n + 1) if math.gcd(k, n) == 1)
+
+def test_gcd_lcm_and_product():
+    a, b = prime_factors.factorize(360), prime_factors.factorize(1050)
+    assert a.gcd(b).number == math.gcd(360, 1050)
+    assert a.lcm(b).number == math.lcm(360, 1050)
+    assert (a * b).number == 360 * 1050
+    assert (a ** 3).number == 360 ** 3
+    assert a.gcd(Factorization()).number == 1
+
+def test_render():
+    f = prime_factors.factorize(360)
+    assert f.render() == str(f) == '2^3 * 3^2 * 5'
+    assert f.render(colour=True).count('\x1b[') > 0
+    assert repr(prime_factors.factorize(1)) == 'Factorization(1 = 1)'
+    assert prime_factors.output_string((2, 2, 3), colour=False) == '2^2 * 3'
+
+def test_immutable_and_hashable():
+    f = prime_factors.factorize(360)
+    with pytest.raises(AttributeError):
+        f.pairs = ()
+    assert pickle.loads(pickle.dumps(f)) == f
+    assert len({f, prime_factors.factorize(360)}) == 1
+
+def test_invalid_pairs():
+    with pytest.raises(ValueError):
+        Factorization([(1, 2)])
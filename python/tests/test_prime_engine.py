@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+import pytest
+
+import prime_engine
+from prime_engine import PrimeSieve
+
+def test_small_primes():
+    expected_primes = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29]
+    assert list(prime_engine.primes(stop=30)) == expected_primes
+
+def test_primes_from_start():
+    expected_primes = [101, 103, 107, 109, 113]
+    assert list(prime_engine.primes(start=100, stop=114)) == expected_primes
+
+def test_non_primes():
+    for n in (-7, 0, 1, 4, 51, 65535):
+        assert not prime_engine.is_prime(n)
+
+def test_prime_beyond_sieve():
+    n = 1000000007
+    assert prime_engine.is_prime(n)
+
+def test_composite_beyond_sieve():
+    n = 999983 * 1000003
+    assert not prime_engine.is_prime(n)
+
+def test_sieve_grows_lazily():
+    sieve = PrimeSieve()
+    initial_limit = sieve.limit
+    primes = sieve.primes(start=initial_limit)
+    assert next(primes) == 65537
+    assert sieve.limit > initial_limit
+
+def test_segmented_sieve_matches_simple_sieve():
+    limit = 300000
+    sieve = PrimeSieve(limit)
+    flags = [True] * limit
+    flags[0] = flags[1] = False
+    for p in range(2, int(limit ** 0.5) + 1):
+        if flags[p]:
+            for multiple in range(p * p, limit, p):
+                flags[multiple] = False
+    assert list(sieve.primes(stop=limit)) == [n for n in range(limit) if flags[n]]
+
+def test_miller_rabin_primes():
+    for n in (2, 3, 37, 65537, 2 ** 61 - 1, 2 ** 89 - 1, 2 ** 127 - 1):
+        assert prime_engine.miller_rabin(n)
+
+def test_miller_rabin_composites():
+    # Includes Carmichael numbers and strong pseudoprimes to the smallest bases
+    for n in (1, 4, 561, 41041, 3215031751, 3825123056546413051, (2 ** 61 - 1) * (2 ** 89 - 1)):
+        assert not prime_engine.miller_rabin(n)
+
+def test_pollard_brent():
+    n = 1000003 * 999983
+    factor = prime_engine.pollard_brent(n)
+    assert factor in (1000003, 999983)
+
+@pytest.mark.parametrize('x, count', [(-1, 0), (1, 0), (2, 1), (100, 25), (65536, 6542), (10 ** 6, 78498),
+                                      (10 ** 8, 5761455), (10 ** 9, 50847534)])
+def test_prime_pi(x, count):
+    assert prime_engine.prime_pi(x) == count
+
+def test_prime_pi_matches_sieve():
+    for x in range(60000, 200000, 1237):
+        assert prime_engine.prime_pi(x) == sum(1 for _ in prime_engine.primes(stop=x + 1))
+
+@pytest.mark.parametrize('n, prime', [(1, 2), (10, 29), (6542, 65521), (6543, 65537), (10 ** 6, 15485863),
+                                      (10 ** 7, 179424673)])
+def test_nth_prime(n, prime):
+    assert prime_engine.nth_prime(n) == prime
+
+def test_nth_prime_invalid():
+    with pytest.raises(ValueError):
+        prime_engine.nth_prime(0)
+
+def test_primes_in_range():
+    assert list(prime_engine.primes_in_range(100, 114)) == [101, 103, 107, 109, 113]
+    assert list(prime_engine.primes_in_range(65500, 65600)) == [65519, 65521, 65537, 65539, 65543, 65551, 65557, 65563, 65579, 65581, 65587, 65599]
+    low = 10 ** 12
+    assert list(prime_engine.primes_in_range(low, low + 1000)) == [n for n in range(low, low + 1000) if prime_engine.miller_rabin(n)]
+    assert list(prime_engine.primes_in_range(10, 10)) == []
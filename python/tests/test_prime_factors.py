@@ -1,4 +1,7 @@
 #!/usr/bin/env python3
+import io
+import json
+
 import pytest
 
 import prime_factors
@@ -31,3 +34,90 @@ def test_factoring_exponent():
     n = 1024 # 2^10
     factors = prime_factors.prime_factors(n)
     assert len(factors) == 10 and factors.count(2) == 10
+
+@pytest.mark.parametrize('method', prime_factors.METHODS)
+def test_methods_agree(method):
+    for n in (2, 45, 255, 1024, 9991, 2 ** 16 + 1, 600851475143):
+        assert prime_factors.prime_factors(n, method) == prime_factors.prime_factors(n, 'trial')
+
+@pytest.mark.parametrize('method', ['rho', 'auto'])
+def test_factoring_64_bit_semiprime(method):
+    n = 4294967291 * 4294967279 # the two largest 32-bit primes
+    factors = prime_factors.prime_factors(n, method)
+    assert factors == (4294967279, 4294967291)
+
+@pytest.mark.parametrize('method', ['rho', 'auto'])
+def test_factoring_large_prime(method):
+    n = 2 ** 61 - 1 # a Mersenne prime
+    factors = prime_factors.prime_factors(n, method)
+    assert not factors
+
+def test_invalid_method():
+    with pytest.raises(ValueError):
+        prime_factors.prime_factors(45, 'foo')
+
+def test_read_numbers_skips_invalid_lines():
+    stream = io.StringIO('45\n\nfoo\n 67 \n')
+    assert list(prime_factors.read_numbers(stream)) == [45, 67]
+
+def test_read_numbers_skips_numbers_below_two(caplog):
+    stream = io.StringIO('0\n1\n-12\n2\n45\n')
+    assert list(prime_factors.read_numbers(stream)) == [2, 45]
+    assert len(caplog.records) == 3
+
+def test_factorize_stream_is_lazy():
+    numbers = iter([45, 67, 1024])
+    results = prime_factors.factorize_stream(numbers)
+    assert next(results) == (45, (3, 3, 5))
+    assert next(numbers) == 67
+
+def test_write_results_plain():
+    output = io.StringIO()
+    prime_factors.write_results([(45, (3, 3, 5)), (67, ())], output)
+    assert output.getvalue() == '45: 3 3 5\n67: prime\n'
+
+def test_write_results_jsonl():
+    output = io.StringIO()
+    prime_factors.write_results(prime_factors.factorize_stream([255]), output, 'jsonl')
+    assert json.loads(output.getvalue()) == {'number': 255, 'prime': False, 'factors': [3, 5, 17]}
+
+def test_write_results_csv():
+    output = io.StringIO()
+    prime_factors.write_results([(255, (3, 5, 17)), (67, ())], output, 'csv')
+    assert output.getvalue() == 'number,prime,factors\n255,0,3 5 17\n67,1,\n'
+
+def test_chunks_are_larger_for_small_numbers():
+    small_chunks = list(prime_factors.chunk_numbers(range(2, 10000)))
+    large_chunks = list(prime_factors.chunk_numbers(range(2 ** 60, 2 ** 60 + 10000)))
+    assert len(small_chunks) < len(large_chunks)
+    assert [n for chunk in small_chunks for n in chunk] == list(range(2, 10000))
+
+def test_parallel_matches_serial():
+    numbers = list(range(2, 3000)) + [600851475143, 4294967291 * 4294967279]
+    serial = list(prime_factors.factorize_stream(numbers))
+    assert list(prime_factors.factorize_parallel(numbers, workers=2)) == serial
+
+def test_parallel_unordered_matches_serial():
+    numbers = list(range(2, 3000))
+    serial = list(prime_factors.factorize_stream(numbers))
+    assert sorted(prime_factors.factorize_parallel(numbers, workers=2, ordered=False)) == serial
+
+def test_unordered_needs_workers():
+    with pytest.raises(SystemExit):
+        prime_factors.parse_args(['-u', '-i', '-'])
+    assert prime_factors.parse_args(['-u', '-w', '2', '-i', '-']).unordered
+
+@pytest.mark.parametrize('cache_size', ['-1', '0'])
+def test_invalid_cache_size(cache_size):
+    with pytest.raises(SystemExit):
+        prime_factors.parse_args(['--cache-size', cache_size, '-w', '2', '-i', '-'])
+
+def test_parallel_main_does_not_open_the_parent_cache(tmp_path, caplog, capsys):
+    numbers = tmp_path / 'numbers.txt'
+    numbers.write_text('45\n67\n')
+    cache_file = tmp_path / 'factors.sqlite'
+    caplog.set_level('INFO')
+    assert prime_factors.main(['-w', '2', '-i', str(numbers), '-c', str(cache_file)]) == 0
+    assert capsys.readouterr().out == '45: 3 3 5\n67: prime\n'
+    assert not cache_file.exists()
+    assert not any(record.getMessage().startswith('Cache:') for record in caplog.records)
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+import sys
+
+import pytest
+
+import prime_factors
+from utils import cli, startup
+
+@pytest.fixture(autouse=True)
+def argv(monkeypatch):
+    monkeypatch.setattr(sys, 'argv', ['utils'])
+
+def test_usage(capsys):
+    assert cli.main(['--help']) == 0
+    assert 'factorial' in capsys.readouterr().out
+    assert cli.main([]) == 2
+
+def test_unknown_command(capsys):
+    assert cli.main(['nope']) == 2
+    assert 'unknown command "nope"' in capsys.readouterr().err
+
+def test_dispatch(capsys):
+    assert cli.main(['factorial', '-q', '10']) == 0
+    assert cli.main(['factors', '-q', '360']) == 0
+    assert cli.main(['factors', '-q', '1']) == 1
+    assert capsys.readouterr().out.splitlines() == ['10! = 3628800', 'The prime factors of 360 are: 2^3 * 3^2 * 5']
+
+def test_output_string_colour():
+    assert prime_factors.output_string([2, 2, 3], colour=False) == '2^2 * 3'
+    assert '\x1b[' in prime_factors.output_string([2, 2, 3], colour=True)
+
+@pytest.mark.parametrize('command', startup.COMMANDS, ids=lambda command: command[0])
+def test_startup_budget(command):
+    modules, total = startup.import_times(command)
+    assert not [name for name in startup.DEFERRED_MODULES if name in modules]
+    assert total / 1000 < startup.STARTUP_BUDGET_MS
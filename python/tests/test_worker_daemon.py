@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+import asyncio
+import math
+import os
+import socket
+
+import pytest
+
+import factorial_loop
+import prime_factors
+import worker_client
+from worker_daemon import INLINE_FACTORIAL, WorkerDaemon, serve
+
+CLIENT_TIMEOUT = 60
+
+def run_daemon(tmp_path, client):
+    # Serves on a socket in tmp_path while the blocking client function runs in a thread
+    path = str(tmp_path / 'daemon.sock')
+    daemon = WorkerDaemon(cache_size=64, workers=2)
+
+    async def run():
+        stop = asyncio.Event()
+        serving = asyncio.create_task(serve(daemon, path, stop))
+        while not os.path.exists(path):
+            await asyncio.sleep(0.01)
+        try:
+            # A request that never completes fails the test rather than hanging it
+            return await asyncio.wait_for(asyncio.to_thread(client, path), CLIENT_TIMEOUT)
+        finally:
+            stop.set()
+            await serving
+
+    try:
+        return asyncio.run(run()), daemon
+    finally:
+        daemon.close()
+
+def test_no_daemon(tmp_path):
+    assert worker_client.request({'op': 'ping'}, str(tmp_path / 'missing.sock')) is None
+
+def test_requests_are_answered_in_order(tmp_path):
+    big = (2 ** 61 - 1) * 1000003
+    messages = [
+        {'op': 'factors', 'number': 360},
+        {'op': 'factors', 'number': big, 'method': 'rho'},
+        {'op': 'factors', 'number': 97},
+        {'op': 'factorial', 'number': INLINE_FACTORIAL + 500, 'method': 'swing'},
+        {'op': 'factorial', 'number': 20},
+        {'op': 'ping', 'id': 'last'},
+    ]
+    responses, daemon = run_daemon(tmp_path, lambda path: worker_client.request_all(messages, path))
+    assert [response['id'] for response in responses] == [1, 2, 3, 4, 5, 'last']
+    assert all(response['ok'] for response in responses)
+    assert responses[0]['factors'] == [2, 2, 2, 3, 3, 5] and not responses[0]['prime']
+    assert responses[1]['factors'] == [1000003, 2 ** 61 - 1]
+    assert responses[2] == {'id': 3, 'ok': True, 'number': 97, 'prime': True, 'factors': []}
+    assert int(responses[3]['result']) == math.factorial(INLINE_FACTORIAL + 500)
+    assert responses[4]['result'] == '2432902008176640000'
+    assert daemon.counts['offloaded'] == 2 and daemon.counts['requests'] == 6
+
+@pytest.mark.parametrize('message, error', [
+    ({'op': 'nope'}, 'Unknown op'),
+    ({'op': 'factors', 'number': 0}, 'Invalid number'),
+    ({'op': 'factors', 'number': '12'}, 'Invalid number'),
+    ({'op': 'factorial', 'number': -1}, 'Invalid number'),
+    ({'op': 'factorial', 'number': 5, 'method': 'guess'}, 'Invalid method'),
+])
+def test_invalid_requests(tmp_path, message, error):
+    response, daemon = run_daemon(tmp_path, lambda path: worker_client.request(message, path))
+    assert not response['ok'] and error in response['error']
+    assert daemon.counts['errors'] == 1
+
+def test_invalid_json(tmp_path):
+    def send(path):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.connect(path)
+            connection.sendall(b'not json\n{"op": "ping", "id": 7}\n')
+            connection.shutdown(socket.SHUT_WR)
+            return connection.makefile('r').read().splitlines()
+
+    lines, _ = run_daemon(tmp_path, send)
+    assert len(lines) == 2 and '"ok": false' in lines[0] and '"id": 7' in lines[1]
+
+def test_scripts_use_the_daemon(tmp_path, monkeypatch, capsys):
+    def run_scripts(path):
+        monkeypatch.setenv(worker_client.SOCKET_ENVIRONMENT_VARIABLE, path)
+        prime_factors.main(['-q', '360'])
+        prime_factors.main(['-q', '97'])
+        factorial_loop.main(['-q', '20'])
+        # Computed here, not by the daemon
+        prime_factors.main(['-q', '--no-daemon', '360'])
+        factorial_loop.main(['-q', '--no-daemon', '20'])
+        return worker_client.request({'op': 'stats'}, path)['stats']
+
+    stats, _ = run_daemon(tmp_path, run_scripts)
+    # The three script requests and the stats request itself
+    assert stats['requests'] == 4
+    assert capsys.readouterr().out.splitlines() == [
+        'The prime factors of 360 are: 2^3 * 3^2 * 5', 'No factors found: 97 is a prime number', '20! = 2432902008176640000',
+        'The prime factors of 360 are: 2^3 * 3^2 * 5', '20! = 2432902008176640000']
+
+def test_stale_and_live_sockets(tmp_path):
+    path = str(tmp_path / 'daemon.sock')
+    # A socket file left by a daemon that did not shut down cleanly is replaced
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+        stale.bind(path)
+    response, _ = run_daemon(tmp_path, lambda path: worker_client.request({'op': 'ping'}, path))
+    assert response['pid'] == os.getpid()
+
+    def second_daemon(path):
+        daemon = WorkerDaemon(cache_size=0, workers=1)
+        try:
+            with pytest.raises(RuntimeError):
+                asyncio.run(serve(daemon, path, asyncio.Event()))
+        finally:
+            daemon.close()
+        return os.path.exists(path)
+
+    assert run_daemon(tmp_path, second_daemon)[0]
+
+def test_private_socket(tmp_path, monkeypatch):
+    monkeypatch.delenv(worker_client.SOCKET_ENVIRONMENT_VARIABLE, raising=False)
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+    assert worker_client.socket_path() == str(tmp_path / worker_client.SOCKET_NAME)
+
+    def socket_mode(path):
+        return os.stat(path).st_mode & 0o777
+
+    mode, _ = run_daemon(tmp_path, socket_mode)
+    assert mode == 0o600
+
+def test_socket_in_a_shared_directory_is_not_used(tmp_path):
+    shared = tmp_path / 'shared'
+    shared.mkdir()
+    shared.chmod(0o777)
+    path = str(shared / 'daemon.sock')
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+        listener.bind(path)
+        listener.listen()
+        with pytest.raises(PermissionError):
+            worker_client.check_private(path)
+        assert worker_client.request({'op': 'ping'}, path) is None
+    daemon = WorkerDaemon(cache_size=0, workers=1)
+    try:
+        with pytest.raises(RuntimeError):
+            asyncio.run(serve(daemon, str(shared / 'other.sock'), asyncio.Event()))
+    finally:
+        daemon.close()
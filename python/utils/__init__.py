@@ -0,0 +1,6 @@
+"""
+A single command line entry point for the python/ scripts - e.g.
+    python -m utils factors 360
+    python -m utils factorial -m swing 1000
+Only the module of the command that is run is imported, so startup stays fast.
+"""
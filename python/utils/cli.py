@@ -0,0 +1,42 @@
+"""
+Dispatches a subcommand to the main function of its script. The scripts (and so
+argparse, logging and anything heavier) are only imported once the command is known,
+and the command list is printed without importing any of them.
+"""
+
+import importlib
+import sys
+
+# Command: (module, description)
+COMMANDS = {
+    'factors': ('prime_factors', 'prime factors of a number or a stream of numbers'),
+    'factorial': ('factorial_loop', 'the factorial of a number'),
+    'birthday': ('birthday-paradox', 'people needed for a shared birthday'),
+    'erg': ('concept2_erg_stats', 'Concept 2 split, watts and distance time tables'),
+    'daemon': ('worker_daemon', 'a resident worker that answers factors and factorial'),
+}
+
+
+def usage():
+    lines = ['usage: utils COMMAND [ARGS...]', '', 'commands:']
+    lines.extend('  %-10s %s' % (name, description) for name, (_, description) in COMMANDS.items())
+    lines.append('')
+    lines.append('"utils COMMAND --help" describes the arguments of a command')
+    return '\n'.join(lines) + '\n'
+
+
+def main(argv = None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ('-h', '--help'):
+        sys.stdout.write(usage())
+        return 0 if argv else 2
+
+    command = COMMANDS.get(argv[0])
+    if command is None:
+        sys.stderr.write('utils: unknown command "%s"\n\n%s' % (argv[0], usage()))
+        return 2
+
+    module = importlib.import_module(command[0])
+    # The scripts' own argument parsers name the program after the command
+    sys.argv[0] = 'utils %s' % argv[0]
+    return module.main(argv[1:]) or 0
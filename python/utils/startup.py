@@ -0,0 +1,42 @@
+"""
+Measures the startup cost of the utils commands with "python -X importtime". The
+command import time is the cumulative time of every module imported from the utils
+package onwards - the interpreter's own startup (site, encodings etc.) is excluded.
+"""
+
+import os
+import subprocess
+import sys
+
+# Generous, so that a slow machine passes but an eagerly imported heavy dependency does not
+STARTUP_BUDGET_MS = 150
+# Modules that the commands below must only import when they are needed
+DEFERRED_MODULES = ('colorama', 'sqlite3', 'multiprocessing', 'concurrent.futures.process', 'statistics')
+COMMANDS = (
+    ('factors', '-q', '360'),
+    ('factorial', '-q', '20'),
+    ('birthday', '-q'),
+    ('erg', '-q', '-f', 'csv', '2000'),
+)
+PYTHON_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(args):
+    # Runs "python -m utils args" and returns ({module: cumulative import time in us}, command import time in us)
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-m', 'utils'] + list(args),
+                             cwd=PYTHON_DIRECTORY, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                             text=True, check=True)
+    modules = {}
+    total = 0
+    counting = False
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        package = name.strip()
+        modules[package] = int(cumulative)
+        # Only top-level imports are added to the total - nested ones are in their cumulative time
+        counting = counting or package == 'utils'
+        if counting and not name[1:].startswith(' '):
+            total += int(cumulative)
+    return modules, total
@@ -0,0 +1,98 @@
+"""
+The client of worker_daemon.py - sends a request to the daemon over its Unix domain
+socket and returns the response, or None if no daemon is listening so that the caller
+computes the answer itself. It only imports small standard modules, so a script that
+asks the daemon first starts as quickly as one that does not. A socket is only used if
+it is in a directory private to the user and is served by a process of the same user.
+
+The protocol is newline-delimited JSON - one request object per line, answered by one
+response object per line, in order:
+    {"id": 1, "op": "factors", "number": 360, "method": "auto"}
+    {"id": 1, "ok": true, "number": 360, "prime": false, "factors": [2, 2, 2, 3, 3, 5]}
+    {"id": 2, "op": "factorial", "number": 20, "method": "swing"}
+    {"id": 2, "ok": true, "number": 20, "result": "2432902008176640000"}
+    {"id": 3, "op": "nope"}
+    {"id": 3, "ok": false, "error": "Unknown op \"nope\" - must be one of ..."}
+"""
+
+import json
+import logging
+import os
+import socket
+import stat
+import struct
+
+# The daemon's socket, unless UTILS_DAEMON_SOCKET names another
+SOCKET_ENVIRONMENT_VARIABLE = 'UTILS_DAEMON_SOCKET'
+SOCKET_NAME = 'utils-daemon.sock'
+# A daemon that does not accept a connection this quickly is treated as not running
+CONNECT_TIMEOUT = 1.0
+
+
+def socket_path():
+    path = os.environ.get(SOCKET_ENVIRONMENT_VARIABLE)
+    if path:
+        return path
+    # One daemon per user, in a directory that only the user can read or write - the
+    # runtime directory if there is one, otherwise a directory the daemon makes in /tmp
+    directory = os.environ.get('XDG_RUNTIME_DIR') or os.path.join('/tmp', 'utils-daemon-%d' % os.getuid())
+    return os.path.join(directory, SOCKET_NAME)
+
+
+def check_private(path):
+    # Raises PermissionError unless the socket and its directory belong to this user and
+    # no one else can write to the directory - so another user cannot plant a socket there
+    directory = os.stat(os.path.dirname(os.path.abspath(path)))
+    if directory.st_uid != os.getuid() or directory.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError('The directory of %s is not private to this user' % path)
+    if os.lstat(path).st_uid != os.getuid():
+        raise PermissionError('%s belongs to another user' % path)
+
+
+def peer_uid(connection):
+    # The user of the process at the other end of a Unix socket, where the platform says
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return None
+    credentials = connection.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+    return struct.unpack('3i', credentials)[1]
+
+
+def request(message, path = None):
+    # Returns the daemon's response to one request, or None if the daemon is not running
+    responses = request_all([message], path)
+    return responses[0] if responses else None
+
+
+def request_all(messages, path = None):
+    # Sends every request before reading the responses - returns them in order, or None if the daemon is not running
+    path = path or socket_path()
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.settimeout(CONNECT_TIMEOUT)
+        try:
+            check_private(path)
+            connection.connect(path)
+        except (FileNotFoundError, ConnectionRefusedError, socket.timeout):
+            return None
+        except PermissionError as e:
+            # Not trusted with the numbers, or to answer them honestly
+            logging.warning('Not using the worker daemon: %s' % e)
+            return None
+        uid = peer_uid(connection)
+        if uid is not None and uid != os.getuid():
+            logging.warning('Not using the worker daemon: %s is served by another user' % path)
+            return None
+        # Once connected, a request takes as long as it takes
+        connection.settimeout(None)
+        lines = ''.join(json.dumps(dict(message, id=message.get('id', index))) + '\n'
+                        for index, message in enumerate(messages, 1))
+        connection.sendall(lines.encode())
+        connection.shutdown(socket.SHUT_WR)
+        with connection.makefile('r', encoding='utf-8') as replies:
+            responses = [json.loads(line) for line in replies]
+    except (ConnectionError, ValueError):
+        # The daemon went away or replied with something other than JSON
+        return None
+    finally:
+        connection.close()
+    return responses if len(responses) == len(messages) else None
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+
+"""
+A resident worker for prime_factors.py and factorial_loop.py. A shell pipeline that
+runs a script once per value spends most of its time starting Python and importing
+modules - the daemon pays for that once and keeps the prime sieve and factor caches
+warm. It listens on a Unix domain socket and speaks newline-delimited JSON (see
+worker_client.py), and the scripts ask it first, computing locally if it is not running.
+
+Clients are served concurrently by asyncio. Cheap requests (small numbers) are answered
+on the event loop from the daemon's own cache; anything heavier is sent to a pool of
+worker processes, each with its own warm sieve and cache, so that one large factorial
+does not hold up every other client. A connection's requests are worked on together
+and answered in order.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import stat
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+import factorial_loop
+import prime_factors
+import worker_client
+
+from factor_cache import DEFAULT_MAX_SIZE, FactorCache
+
+OPS = ('factors', 'factorial', 'ping', 'stats')
+# Numbers of up to this many bits are factored on the event loop - Pollard's rho takes milliseconds
+INLINE_FACTOR_BITS = 40
+# Factorials of numbers up to this are calculated on the event loop
+INLINE_FACTORIAL = 1000
+# Requests of one connection that are worked on at the same time
+MAX_PIPELINED = 64
+
+
+def parse_args(argv = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-s', '--socket', metavar='PATH', help='Unix domain socket to listen on [$%s or %s]' % (
+        worker_client.SOCKET_ENVIRONMENT_VARIABLE, worker_client.socket_path()))
+    parser.add_argument('-w', '--workers', metavar='N', help='Worker processes for heavy requests [one per CPU]', type=int)
+    parser.add_argument('--cache-size', metavar='N', help='Factorizations held in memory by the daemon and by each worker [%d]' % DEFAULT_MAX_SIZE,
+                        type=int, default=DEFAULT_MAX_SIZE)
+    parser.add_argument('-q', '--quiet', help='Quiet mode', action='store_true')
+    parser.add_argument('-v', '--verbose', help='Verbose mode', action='store_true')
+    return parser.parse_args(argv)
+
+
+def configure_logging(args):
+    log_level = logging.INFO
+    if args.quiet:
+        log_level = logging.WARNING
+    elif args.verbose:
+        log_level = logging.DEBUG
+
+    logging.basicConfig(level=log_level, format='%(levelname)s: %(message)s')
+
+
+def _init_worker(cache_size):
+    prime_factors._init_worker_cache(cache_size)
+
+
+def factor_number(number, method = prime_factors.DEFAULT_METHOD):
+    # Runs in a worker process, with its own cache
+    return prime_factors.factorize_chunk([number], method)[0][1]
+
+
+def factorial_digits(number, method = factorial_loop.DEFAULT_METHOD):
+    # The decimal digits are worked out where the factorial is - converting a large one takes a while
+    if hasattr(sys, 'set_int_max_str_digits'):
+        sys.set_int_max_str_digits(0)
+    return '%d' % factorial_loop.factorial_by_method(number, method)
+
+
+class WorkerDaemon(object):
+
+    def __init__(self, cache_size = DEFAULT_MAX_SIZE, workers = None):
+        self.cache = FactorCache(cache_size) if cache_size else None
+        # Workers are not forked from the daemon, whose event loop and threads may hold locks at the time
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('forkserver'),
+                                            initializer=_init_worker, initargs=(cache_size,))
+        self.started = time.monotonic()
+        self.counts = {'connections': 0, 'requests': 0, 'inline': 0, 'offloaded': 0, 'errors': 0}
+
+    def stats(self):
+        stats = dict(self.counts, pid=os.getpid(), uptime=round(time.monotonic() - self.started, 3))
+        if self.cache is not None:
+            stats['cache'] = self.cache.stats()
+        return stats
+
+    async def respond(self, message):
+        # Returns the response to a request - an invalid request is answered with an error, not raised
+        self.counts['requests'] += 1
+        response = {'id': message.get('id')} if isinstance(message, dict) else {'id': None}
+        try:
+            response.update(await self._answer(message))
+            response['ok'] = True
+        except ValueError as e:
+            self.counts['errors'] += 1
+            response.update(ok=False, error=str(e))
+        except Exception as e:
+            # e.g. a worker process died - the client computes the answer itself
+            logging.exception('Failed to answer %s' % json.dumps(message))
+            self.counts['errors'] += 1
+            response.update(ok=False, error='%s: %s' % (type(e).__name__, e))
+        return response
+
+    async def _answer(self, message):
+        if not isinstance(message, dict):
+            raise ValueError('A request must be a JSON object')
+        op = message.get('op')
+        if op not in OPS:
+            raise ValueError('Unknown op "%s" - must be one of %s' % (op, ', '.join(OPS)))
+        if op == 'ping':
+            return {'pid': os.getpid()}
+        if op == 'stats':
+            return {'stats': self.stats()}
+
+        number = message.get('number')
+        if not isinstance(number, int) or isinstance(number, bool) or number < (1 if op == 'factors' else 0):
+            raise ValueError('Invalid number %s for %s' % (json.dumps(number), op))
+
+        if op == 'factors':
+            method = message.get('method', prime_factors.DEFAULT_METHOD)
+            if method not in prime_factors.METHODS:
+                raise ValueError('Invalid method "%s" - must be one of %s' % (method, ', '.join(prime_factors.METHODS)))
+            if number.bit_length() <= INLINE_FACTOR_BITS:
+                self.counts['inline'] += 1
+                factors = prime_factors.prime_factors(number, method, self.cache)
+            else:
+                factors = await self._offload(factor_number, number, method)
+            return {'number': number, 'prime': number > 1 and not factors, 'factors': list(factors)}
+
+        method = message.get('method', factorial_loop.DEFAULT_METHOD)
+        if method not in factorial_loop.METHODS:
+            raise ValueError('Invalid method "%s" - must be one of %s' % (method, ', '.join(factorial_loop.METHODS)))
+        if number <= INLINE_FACTORIAL:
+            self.counts['inline'] += 1
+            result = factorial_digits(number, method)
+        else:
+            result = await self._offload(factorial_digits, number, method)
+        return {'number': number, 'result': result}
+
+    async def _offload(self, function, *args):
+        self.counts['offloaded'] += 1
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def _respond_to_line(self, line):
+        try:
+            message = json.loads(line)
+        except ValueError:
+            self.counts['requests'] += 1
+            self.counts['errors'] += 1
+            return {'id': None, 'ok': False, 'error': 'A request must be one line of JSON'}
+        return await self.respond(message)
+
+    async def handle(self, reader, writer):
+        # Each request is started as soon as it is read, and the responses are written in request order
+        self.counts['connections'] += 1
+        pending = asyncio.Queue(MAX_PIPELINED)
+
+        async def write_responses():
+            while True:
+                task = await pending.get()
+                if task is None:
+                    return
+                writer.write((json.dumps(await task) + '\n').encode())
+                await writer.drain()
+
+        writing = asyncio.create_task(write_responses())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    if not line:
+                        break
+                    continue
+                await pending.put(asyncio.create_task(self._respond_to_line(line)))
+            await pending.put(None)
+            await writing
+        except (ConnectionError, ValueError) as e:
+            # A client that disconnects early, or sends a line longer than the stream limit
+            logging.debug('Connection closed: %s' % e)
+            writing.cancel()
+        finally:
+            writer.close()
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+        if self.cache is not None:
+            self.cache.close()
+
+
+def make_private_directory(path):
+    # Makes the socket's directory (mode 0700) if need be - it must belong to this user and be closed to others
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise RuntimeError('%s must be a directory that only this user can use (mode 0700)' % directory)
+
+
+async def serve(daemon, path, stop = None):
+    # Serves until the stop event is set - or, without one, until SIGINT or SIGTERM
+    make_private_directory(path)
+    if os.path.exists(path):
+        if worker_client.request({'op': 'ping'}, path) is not None:
+            raise RuntimeError('A daemon is already listening on %s' % path)
+        # Left behind by a daemon that did not shut down cleanly
+        os.remove(path)
+
+    if stop is None:
+        stop = asyncio.Event()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            asyncio.get_running_loop().add_signal_handler(signal_number, stop.set)
+
+    # The socket is created readable and writable by this user alone - there is no moment when others can connect
+    umask = os.umask(0o177)
+    try:
+        server = await asyncio.start_unix_server(daemon.handle, path)
+    finally:
+        os.umask(umask)
+    logging.info('Listening on %s' % path)
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+    logging.info('Stopped after %(requests)d requests from %(connections)d connections' % daemon.counts)
+
+
+def main(argv = None):
+    args = parse_args(argv)
+    configure_logging(args)
+
+    daemon = WorkerDaemon(args.cache_size, args.workers)
+    try:
+        asyncio.run(serve(daemon, args.socket or worker_client.socket_path()))
+    except RuntimeError as e:
+        logging.error(str(e))
+        return 1
+    finally:
+        daemon.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())